@@ -3,8 +3,8 @@
 """
 🌊 ANÁLISE COMPLETA DAS ENCHENTES NO RIO GRANDE DO SUL (2020-2024)
 
-Este script apresenta uma análise abrangente dos impactos das enchentes no Rio Grande do Sul, 
-incluindo a crise histórica de 2024. Através de visualizações interativas e análises estatísticas, 
+Este script apresenta uma análise abrangente dos impactos das enchentes no Rio Grande do Sul,
+incluindo a crise histórica de 2024. Através de visualizações interativas e análises estatísticas,
 exploramos padrões temporais, vulnerabilidades regionais e correlações entre variáveis.
 
 🎯 OBJETIVOS DA ANÁLISE:
@@ -18,6 +18,13 @@ exploramos padrões temporais, vulnerabilidades regionais e correlações entre
 - enchentes_rs.csv: 60 registros de 2020-2024
 - enchente_2024_detalhado.csv: 32 registros da crise de 2024
 
+⚙️ EXECUÇÃO:
+Todas as tabelas vêm do mesmo motor de `src/analise_enchentes.py` (AnalisadorEnchentes),
+com agregados no cache persistente (outputs/cache). Para rodar sem interface gráfica, com as
+seções em paralelo e reaproveitando os agregados de execuções anteriores:
+
+    python notebooks/analise_enchentes_kaggle.py --lote
+
 Autor: [Seu Nome]
 Data: 2024
 Licença: CC0-1.0 (Domínio Público)
@@ -27,13 +34,27 @@ Licença: CC0-1.0 (Domínio Público)
 # 📚 IMPORTAÇÃO DE BIBLIOTECAS E CONFIGURAÇÕES
 # =============================================================================
 
-import pandas as pd
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
-from datetime import datetime
 import warnings
 
+# Localização do pacote src com o motor de análise (repositório local ou dataset no Kaggle)
+_PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+for _pasta in (os.path.join(_PASTA_SCRIPT, '..'), '.', '../input/enchentes-rs-impactos'):
+    if os.path.exists(os.path.join(_pasta, 'src', 'analise_enchentes.py')):
+        sys.path.insert(0, os.path.abspath(_pasta))
+        break
+
+from src.analise_enchentes import AnalisadorEnchentes, ARQUIVO_GERAL, MESES
+from src.leitura import arquivos_dataset
+
 # Configurações de visualização
 warnings.filterwarnings('ignore')
 plt.style.use('default')
@@ -44,174 +65,198 @@ plt.rcParams['figure.dpi'] = 100
 plt.rcParams['savefig.dpi'] = 300
 plt.rcParams['font.size'] = 10
 
-print("✅ Bibliotecas importadas com sucesso!")
-print(f"📊 Pandas version: {pd.__version__}")
-print(f"📈 Matplotlib version: {plt.matplotlib.__version__}")
-print(f"🎨 Seaborn version: {sns.__version__}")
-print("=" * 60)
+# Pastas onde os CSVs são procurados, em ordem
+PASTAS_DADOS = [
+    '../input/enchentes-rs-impactos',
+    os.path.join(_PASTA_SCRIPT, '..', 'data'),
+    'data',
+]
+
+# Modo de execução (alterado por main quando chamado com --lote)
+CONFIG = {
+    'lote': False,
+    'pasta_saida': 'outputs',
+}
+
+# =============================================================================
+# 🖼️ FIGURAS
+# =============================================================================
+
+def nova_figura(nrows=1, ncols=1, figsize=(12, 6)):
+    """Cria uma figura; no modo lote usa a API orientada a objetos, segura entre threads"""
+    if CONFIG['lote']:
+        fig = Figure(figsize=figsize)
+        return fig, fig.subplots(nrows, ncols)
+    return plt.subplots(nrows, ncols, figsize=figsize)
+
+def finalizar_figura(fig, nome_arquivo):
+    """Exibe a figura ou, no modo lote, salva em disco sem abrir janela"""
+    fig.tight_layout()
+    if CONFIG['lote']:
+        os.makedirs(CONFIG['pasta_saida'], exist_ok=True)
+        fig.savefig(os.path.join(CONFIG['pasta_saida'], nome_arquivo), bbox_inches='tight')
+    else:
+        plt.show()
 
 # =============================================================================
 # 📁 CARREGAMENTO DOS DADOS
 # =============================================================================
 
-def carregar_dados():
-    """Carrega os datasets de enchentes"""
-    try:
-        # Carregamento dos datasets
-        df_principal = pd.read_csv('../input/enchentes-rs-impactos/enchentes_rs.csv')
-        df_2024 = pd.read_csv('../input/enchentes-rs-impactos/enchente_2024_detalhado.csv')
-        
-        print("📊 DATASETS CARREGADOS:")
-        print("=" * 50)
-        print(f"Dataset Principal: {df_principal.shape[0]} registros, {df_principal.shape[1]} colunas")
-        print(f"Dataset 2024: {df_2024.shape[0]} registros, {df_2024.shape[1]} colunas")
-        print(f"Total: {df_principal.shape[0] + df_2024.shape[0]} registros")
-        
-        print("\n📋 COLUNAS DISPONÍVEIS:")
-        print("Dataset Principal:", list(df_principal.columns))
-        print("Dataset 2024:", list(df_2024.columns))
-        
-        return df_principal, df_2024
-        
-    except FileNotFoundError as e:
-        print(f"❌ Erro ao carregar dados: {e}")
-        print("💡 Verifique se os arquivos CSV estão na pasta correta")
-        return None, None
+def localizar_pasta_dados():
+    """Retorna a primeira pasta que contém o dataset (CSV plano ou layout particionado)"""
+    for pasta in PASTAS_DADOS:
+        arquivos = arquivos_dataset(pasta, ARQUIVO_GERAL)
+        if arquivos and os.path.exists(arquivos[0]):
+            return pasta
+    return None
+
+def carregar_dados(escrever=print):
+    """Cria o analisador sobre os datasets de enchentes"""
+    pasta_dados = localizar_pasta_dados()
+    if pasta_dados is None:
+        escrever("❌ Erro ao carregar dados: arquivos CSV não encontrados")
+        escrever("💡 Verifique se os arquivos CSV estão na pasta correta")
+        return None
+
+    analisador = AnalisadorEnchentes(
+        pasta_dados=pasta_dados,
+        pasta_saida=CONFIG['pasta_saida'],
+        exibir_graficos=not CONFIG['lote'],
+        carregar=False,
+    )
+
+    # Agregados da execução anterior, se os dados não mudaram; senão lê os CSVs
+    if analisador.carregar_agregados():
+        escrever(f"♻️ Agregados reaproveitados do cache ({analisador.impressao_digital()})")
+    else:
+        analisador.carregar_dados()
+        if analisador.registros_geral is None:
+            return None
+
+    resumo = analisador.agregado('resumo')
+    diario = analisador.agregado('diario_2024')
+
+    escrever("📊 DATASETS CARREGADOS:")
+    escrever("=" * 50)
+    escrever(f"Dataset Principal: {resumo['registros']} registros, {len(resumo['colunas'])} colunas")
+    escrever(f"Dias da crise de 2024: {len(diario)}")
+
+    escrever("\n📋 COLUNAS DISPONÍVEIS:")
+    escrever(f"Dataset Principal: {resumo['colunas']}")
+
+    return analisador
 
 # =============================================================================
 # 🔍 EXPLORAÇÃO INICIAL DOS DADOS
 # =============================================================================
 
-def explorar_dados(df_principal, df_2024):
+def explorar_dados(analisador, escrever=print):
     """Realiza exploração inicial dos datasets"""
-    print("\n🔍 EXPLORAÇÃO INICIAL DOS DADOS")
-    print("=" * 50)
-    
-    # Informações básicas dos datasets
-    print("📊 INFORMAÇÕES DO DATASET PRINCIPAL:")
-    print("-" * 40)
-    print(df_principal.info())
-    
-    print("\n📊 INFORMAÇÕES DO DATASET 2024:")
-    print("-" * 40)
-    print(df_2024.info())
-    
+    resumo = analisador.agregado('resumo')
+    diario = analisador.agregado('diario_2024')
+
+    escrever("\n🔍 EXPLORAÇÃO INICIAL DOS DADOS")
+    escrever("=" * 50)
+
     # Estatísticas descritivas
-    print("\n📈 ESTATÍSTICAS DESCRITIVAS - DATASET PRINCIPAL:")
-    print("-" * 50)
-    print(df_principal.describe())
-    
-    print("\n📈 ESTATÍSTICAS DESCRITIVAS - DATASET 2024:")
-    print("-" * 50)
-    print(df_2024.describe())
-    
-    # Verificação de valores únicos
-    print("\n🏙️ CIDADES INCLUÍDAS:")
-    print("-" * 30)
-    print("Dataset Principal:", df_principal['cidade'].unique())
-    print("Dataset 2024:", df_2024['cidade'].unique())
-    
-    print("\n🌍 REGIÕES:")
-    print("-" * 20)
-    print("Dataset Principal:", df_principal['regiao'].unique())
-    print("Dataset 2024:", df_2024['regiao'].unique())
-    
-    print("\n📅 PERÍODO COBERTO:")
-    print("-" * 30)
-    print(f"Dataset Principal: {df_principal['data'].min()} a {df_principal['data'].max()}")
-    print(f"Dataset 2024: {df_2024['data'].min()} a {df_2024['data'].max()}")
+    escrever("\n📈 ESTATÍSTICAS DESCRITIVAS - DATASET PRINCIPAL:")
+    escrever("-" * 50)
+    escrever(analisador.agregado('descricao'))
+
+    escrever("\n🏙️ CIDADES INCLUÍDAS:")
+    escrever("-" * 30)
+    escrever(f"Dataset Principal: {resumo['cidades']} cidades")
+    escrever("Dataset 2024:", list(analisador.agregado('crise_2024').index))
+
+    escrever("\n🌍 REGIÕES:")
+    escrever("-" * 20)
+    escrever("Dataset Principal:", resumo['regioes'])
+
+    escrever("\n📅 PERÍODO COBERTO:")
+    escrever("-" * 30)
+    escrever(f"Dataset Principal: {resumo['inicio'].date()} a {resumo['fim'].date()}")
+    escrever(f"Dataset 2024: {diario['data'].min().date()} a {diario['data'].max().date()}")
 
 # =============================================================================
 # 📅 ANÁLISE TEMPORAL DOS IMPACTOS
 # =============================================================================
 
-def analise_temporal(df_principal, df_2024):
+def analise_temporal(analisador, escrever=print):
     """Realiza análise temporal dos impactos"""
-    print("\n📅 ANÁLISE TEMPORAL DOS IMPACTOS")
-    print("=" * 50)
-    
-    # Preparação dos dados para análise temporal
-    df_principal['data'] = pd.to_datetime(df_principal['data'])
-    df_2024['data'] = pd.to_datetime(df_2024['data'])
-    
-    # Agregação anual
-    df_anual = df_principal.groupby(df_principal['data'].dt.year).agg({
-        'mortes': 'sum',
-        'feridos': 'sum',
-        'desalojados': 'sum',
-        'prejuizo_milhoes': 'sum'
-    }).reset_index()
-    
-    print("📊 IMPACTOS ANUAIS (2020-2024):")
-    print("-" * 40)
-    print(df_anual.round(2))
-    
+    escrever("\n📅 ANÁLISE TEMPORAL DOS IMPACTOS")
+    escrever("=" * 50)
+
+    df_anual = analisador.agregado('anual')
+
+    escrever("📊 IMPACTOS ANUAIS (2020-2024):")
+    escrever("-" * 40)
+    escrever(df_anual.round(2))
+
     # Gráfico de evolução temporal dos impactos
-    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    fig, axes = nova_figura(2, 2, figsize=(15, 10))
     fig.suptitle('📈 Evolução Temporal dos Impactos das Enchentes no RS (2020-2024)', fontsize=16)
-    
+
     # Mortes
-    axes[0, 0].plot(df_anual['data'], df_anual['mortes'], 'ro-', linewidth=2, markersize=8)
+    axes[0, 0].plot(df_anual['Ano'], df_anual['Mortes'], 'ro-', linewidth=2, markersize=8)
     axes[0, 0].set_title('Mortes', fontweight='bold')
     axes[0, 0].set_ylabel('Número de Mortes')
     axes[0, 0].grid(True, alpha=0.3)
-    
+
     # Feridos
-    axes[0, 1].plot(df_anual['data'], df_anual['feridos'], 'o-', color='orange', linewidth=2, markersize=8)
+    axes[0, 1].plot(df_anual['Ano'], df_anual['Feridos'], 'o-', color='orange', linewidth=2, markersize=8)
     axes[0, 1].set_title('Feridos', fontweight='bold')
     axes[0, 1].set_ylabel('Número de Feridos')
     axes[0, 1].grid(True, alpha=0.3)
-    
+
     # Desalojados
-    axes[1, 0].plot(df_anual['data'], df_anual['desalojados'], 'bo-', linewidth=2, markersize=8)
+    axes[1, 0].plot(df_anual['Ano'], df_anual['Desalojados'], 'bo-', linewidth=2, markersize=8)
     axes[1, 0].set_title('Desalojados', fontweight='bold')
     axes[1, 0].set_ylabel('Número de Desalojados')
     axes[1, 0].grid(True, alpha=0.3)
-    
+
     # Prejuízos
-    axes[1, 1].plot(df_anual['data'], df_anual['prejuizo_milhoes'], 'mo-', linewidth=2, markersize=8)
+    axes[1, 1].plot(df_anual['Ano'], df_anual['Prejuízo (R$ milhões)'], 'mo-', linewidth=2, markersize=8)
     axes[1, 1].set_title('Prejuízos (Milhões R$)', fontweight='bold')
     axes[1, 1].set_ylabel('Prejuízos (Milhões R$)')
     axes[1, 1].grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.show()
-    
+
+    finalizar_figura(fig, 'kaggle_evolucao_temporal.png')
+
     return df_anual
 
 # =============================================================================
 # 🌍 ANÁLISE REGIONAL DOS IMPACTOS
 # =============================================================================
 
-def analise_regional(df_principal):
+def analise_regional(analisador, escrever=print):
     """Realiza análise regional dos impactos"""
-    print("\n🌍 ANÁLISE REGIONAL DOS IMPACTOS")
-    print("=" * 50)
-    
+    escrever("\n🌍 ANÁLISE REGIONAL DOS IMPACTOS")
+    escrever("=" * 50)
+
     # Análise por região
-    df_regional = df_principal.groupby('regiao').agg({
-        'mortes': 'sum',
-        'feridos': 'sum',
-        'desalojados': 'sum',
-        'prejuizo_milhoes': 'sum',
-        'cidade': 'count'
-    }).rename(columns={'cidade': 'eventos'}).round(2)
-    
-    print("🌍 IMPACTOS POR REGIÃO:")
-    print("-" * 40)
-    print(df_regional)
-    
+    df_regional = analisador.agregado('regional')
+
+    escrever("🌍 IMPACTOS POR REGIÃO:")
+    escrever("-" * 40)
+    escrever(df_regional)
+
+    # Incerteza da comparação Metropolitana × Serra (bootstrap, IC 95%)
+    _, diferencas = analisador.intervalos_confianca(pares=[('Metropolitana', 'Serra')])
+    escrever("\n🎲 METROPOLITANA − SERRA (IC 95%, bootstrap):")
+    escrever("-" * 40)
+    escrever(diferencas.round(3))
+
     # Gráfico de comparação regional
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
+    fig, ax = nova_figura(figsize=(12, 6))
+
     x = np.arange(len(df_regional.index))
     width = 0.2
-    
-    ax.bar(x - width*1.5, df_regional['mortes'], width, label='Mortes', color='red', alpha=0.8)
-    ax.bar(x - width*0.5, df_regional['feridos'], width, label='Feridos', color='orange', alpha=0.8)
-    ax.bar(x + width*0.5, df_regional['desalojados'], width, label='Desalojados', color='blue', alpha=0.8)
-    ax.bar(x + width*1.5, df_regional['prejuizo_milhoes'], width, label='Prejuízos (Milhões)', color='purple', alpha=0.8)
-    
+
+    ax.bar(x - width*1.5, df_regional['Mortes'], width, label='Mortes', color='red', alpha=0.8)
+    ax.bar(x - width*0.5, df_regional['Feridos'], width, label='Feridos', color='orange', alpha=0.8)
+    ax.bar(x + width*0.5, df_regional['Desalojados'], width, label='Desalojados', color='blue', alpha=0.8)
+    ax.bar(x + width*1.5, df_regional['Prejuízo (R$ milhões)'], width, label='Prejuízos (Milhões)', color='purple', alpha=0.8)
+
     ax.set_xlabel('Região', fontweight='bold')
     ax.set_ylabel('Quantidade', fontweight='bold')
     ax.set_title('📊 Comparação de Impactos por Região', fontweight='bold')
@@ -219,282 +264,293 @@ def analise_regional(df_principal):
     ax.set_xticklabels(df_regional.index)
     ax.legend()
     ax.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.show()
-    
+
+    finalizar_figura(fig, 'kaggle_comparacao_regional.png')
+
     # Análise por cidade
-    df_cidades = df_principal.groupby('cidade').agg({
-        'mortes': 'sum',
-        'feridos': 'sum',
-        'desalojados': 'sum',
-        'prejuizo_milhoes': 'sum'
-    }).round(2).sort_values('desalojados', ascending=False)
-    
-    print("\n🏙️ IMPACTOS POR CIDADE (Ordenado por Desalojados):")
-    print("-" * 60)
-    print(df_cidades)
-    
+    df_cidades = analisador.ranking_cidades('Desalojados')
+
+    escrever("\n🏙️ IMPACTOS POR CIDADE (Ordenado por Desalojados):")
+    escrever("-" * 60)
+    escrever(df_cidades)
+
     # Gráfico de impacto por cidade
-    plt.figure(figsize=(12, 6))
-    bars = plt.bar(df_cidades.index, df_cidades['desalojados'], 
-                   color=plt.cm.Blues(np.linspace(0.3, 0.8, len(df_cidades))))
-    
-    plt.title('🏙️ Total de Desalojados por Cidade (2020-2024)', fontsize=14, fontweight='bold')
-    plt.xlabel('Cidade', fontweight='bold')
-    plt.ylabel('Total de Desalojados', fontweight='bold')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(True, alpha=0.3)
-    
+    fig, ax = nova_figura(figsize=(12, 6))
+    bars = ax.bar(df_cidades.index, df_cidades['Desalojados'],
+                  color=plt.cm.Blues(np.linspace(0.3, 0.8, len(df_cidades))))
+
+    ax.set_title('🏙️ Total de Desalojados por Cidade (2020-2024)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Cidade', fontweight='bold')
+    ax.set_ylabel('Total de Desalojados', fontweight='bold')
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(True, alpha=0.3)
+
     # Adicionar valores nas barras
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                 f'{int(height):,}', ha='center', va='bottom')
-    
-    plt.tight_layout()
-    plt.show()
-    
+        ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+                f'{int(height):,}', ha='center', va='bottom')
+
+    finalizar_figura(fig, 'kaggle_desalojados_cidade.png')
+
     return df_regional, df_cidades
 
 # =============================================================================
 # 🚨 ANÁLISE DA CRISE DE 2024
 # =============================================================================
 
-def analise_crise_2024(df_2024):
+def analise_crise_2024(analisador, escrever=print):
     """Realiza análise específica da crise de 2024"""
-    print("\n🚨 ANÁLISE DA CRISE DE 2024")
-    print("=" * 50)
-    
-    # Análise da crise de 2024
-    print("🚨 ANÁLISE DA CRISE DE 2024:")
-    print("-" * 40)
-    print(f"Período: {df_2024['data'].min().strftime('%d/%m/%Y')} a {df_2024['data'].max().strftime('%d/%m/%Y')}")
-    print(f"Total de registros: {len(df_2024)}")
-    print(f"Cidades afetadas: {df_2024['cidade'].nunique()}")
-    print(f"Total de mortes: {df_2024['mortes'].sum()}")
-    print(f"Total de feridos: {df_2024['feridos'].sum()}")
-    print(f"Total de desalojados: {df_2024['desalojados'].sum()}")
-    print(f"Prejuízos totais: R$ {df_2024['prejuizo_milhoes'].sum():.2f} milhões")
-    
+    escrever("\n🚨 ANÁLISE DA CRISE DE 2024")
+    escrever("=" * 50)
+
     # Evolução diária da crise de 2024
-    df_2024_diario = df_2024.groupby('data').agg({
-        'mortes': 'sum',
-        'feridos': 'sum',
-        'desalojados': 'sum',
-        'prejuizo_milhoes': 'sum'
-    }).reset_index()
-    
-    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    df_2024_diario = analisador.agregado('diario_2024')
+
+    escrever("🚨 ANÁLISE DA CRISE DE 2024:")
+    escrever("-" * 40)
+    escrever(f"Período: {df_2024_diario['data'].min().strftime('%d/%m/%Y')} a {df_2024_diario['data'].max().strftime('%d/%m/%Y')}")
+    escrever(f"Cidades afetadas: {len(analisador.agregado('crise_2024'))}")
+    escrever(f"Total de mortes: {df_2024_diario['mortes'].sum()}")
+    escrever(f"Total de feridos: {df_2024_diario['feridos'].sum()}")
+    escrever(f"Total de desalojados: {df_2024_diario['desalojados'].sum()}")
+    escrever(f"Prejuízos totais: R$ {df_2024_diario['prejuizo_milhoes'].sum():.2f} milhões")
+
+    fig, axes = nova_figura(2, 2, figsize=(15, 10))
     fig.suptitle('🚨 Evolução Diária da Crise de Enchentes de 2024 no RS', fontsize=16, fontweight='bold')
-    
+
     # Mortes diárias
     axes[0, 0].plot(df_2024_diario['data'], df_2024_diario['mortes'], 'ro-', linewidth=2, markersize=6)
     axes[0, 0].set_title('Mortes Diárias', fontweight='bold')
     axes[0, 0].set_ylabel('Mortes')
     axes[0, 0].grid(True, alpha=0.3)
     axes[0, 0].tick_params(axis='x', rotation=45)
-    
+
     # Feridos diários
     axes[0, 1].plot(df_2024_diario['data'], df_2024_diario['feridos'], 'o-', color='orange', linewidth=2, markersize=6)
     axes[0, 1].set_title('Feridos Diários', fontweight='bold')
     axes[0, 1].set_ylabel('Feridos')
     axes[0, 1].grid(True, alpha=0.3)
     axes[0, 1].tick_params(axis='x', rotation=45)
-    
+
     # Desalojados diários
     axes[1, 0].plot(df_2024_diario['data'], df_2024_diario['desalojados'], 'bo-', linewidth=2, markersize=6)
     axes[1, 0].set_title('Desalojados Diários', fontweight='bold')
     axes[1, 0].set_ylabel('Desalojados')
     axes[1, 0].grid(True, alpha=0.3)
     axes[1, 0].tick_params(axis='x', rotation=45)
-    
+
     # Prejuízos diários
     axes[1, 1].plot(df_2024_diario['data'], df_2024_diario['prejuizo_milhoes'], 'mo-', linewidth=2, markersize=6)
     axes[1, 1].set_title('Prejuízos Diários (Milhões R$)', fontweight='bold')
     axes[1, 1].set_ylabel('Prejuízos (Milhões R$)')
     axes[1, 1].grid(True, alpha=0.3)
     axes[1, 1].tick_params(axis='x', rotation=45)
-    
-    plt.tight_layout()
-    plt.show()
-    
+
+    finalizar_figura(fig, 'kaggle_crise_2024.png')
+
     return df_2024_diario
 
 # =============================================================================
 # 🔗 ANÁLISE DE CORRELAÇÕES
 # =============================================================================
 
-def analise_correlacoes(df_principal):
+def analise_correlacoes(analisador, escrever=print):
     """Realiza análise de correlações entre variáveis"""
-    print("\n🔗 ANÁLISE DE CORRELAÇÕES")
-    print("=" * 50)
-    
+    escrever("\n🔗 ANÁLISE DE CORRELAÇÕES")
+    escrever("=" * 50)
+
     # Matriz de correlação
-    colunas_numericas = ['mortes', 'feridos', 'desalojados', 'prejuizo_milhoes', 
-                         'altura_rio_metros', 'chuva_24h_mm']
-    
-    correlacao = df_principal[colunas_numericas].corr()
-    
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(correlacao, annot=True, cmap='RdBu_r', center=0, 
+    correlacao = analisador.agregado('correlacao')
+
+    fig, ax = nova_figura(figsize=(10, 8))
+    sns.heatmap(correlacao, annot=True, cmap='RdBu_r', center=0, ax=ax,
                 square=True, linewidths=0.5, cbar_kws={'shrink': 0.8})
-    plt.title('🔗 Matriz de Correlação entre Variáveis', fontweight='bold')
-    plt.tight_layout()
-    plt.show()
-    
-    print("📊 MATRIZ DE CORRELAÇÃO:")
-    print("-" * 40)
-    print(correlacao.round(3))
-    
-    # Gráfico de dispersão: Altura do rio vs Desalojados
-    plt.figure(figsize=(10, 6))
-    
-    scatter = plt.scatter(df_principal['altura_rio_metros'], df_principal['desalojados'], 
-                          c=df_principal['prejuizo_milhoes'], s=df_principal['prejuizo_milhoes']*10,
-                          cmap='viridis', alpha=0.7)
-    
-    plt.colorbar(scatter, label='Prejuízos (Milhões R$)')
-    plt.xlabel('Altura do Rio (metros)', fontweight='bold')
-    plt.ylabel('Número de Desalojados', fontweight='bold')
-    plt.title('🌊 Relação entre Altura do Rio e Desalojados', fontweight='bold')
-    plt.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.show()
-    
+    ax.set_title('🔗 Matriz de Correlação entre Variáveis', fontweight='bold')
+    finalizar_figura(fig, 'kaggle_correlacao.png')
+
+    escrever("📊 MATRIZ DE CORRELAÇÃO:")
+    escrever("-" * 40)
+    escrever(correlacao.round(3))
+
+    # Gráfico de dispersão: Altura do rio vs Desalojados (amostra limitada)
+    amostra = analisador.agregado('amostra_dispersao')
+    fig, ax = nova_figura(figsize=(10, 6))
+
+    scatter = ax.scatter(amostra['altura_rio_metros'], amostra['desalojados'],
+                         c=amostra['prejuizo_milhoes'], s=amostra['prejuizo_milhoes']*10,
+                         cmap='viridis', alpha=0.7)
+
+    fig.colorbar(scatter, ax=ax, label='Prejuízos (Milhões R$)')
+    ax.set_xlabel('Altura do Rio (metros)', fontweight='bold')
+    ax.set_ylabel('Número de Desalojados', fontweight='bold')
+    ax.set_title('🌊 Relação entre Altura do Rio e Desalojados', fontweight='bold')
+    ax.grid(True, alpha=0.3)
+
+    finalizar_figura(fig, 'kaggle_dispersao.png')
+
     return correlacao
 
 # =============================================================================
 # 📊 ANÁLISE SAZONAL
 # =============================================================================
 
-def analise_sazonal(df_principal):
+def analise_sazonal(analisador, escrever=print):
     """Realiza análise sazonal dos impactos"""
-    print("\n📊 ANÁLISE SAZONAL")
-    print("=" * 50)
-    
-    # Análise sazonal por mês
-    df_principal['mes'] = df_principal['data'].dt.month
-    df_sazonal = df_principal.groupby('mes').agg({
-        'mortes': 'mean',
-        'feridos': 'mean',
-        'desalojados': 'mean',
-        'prejuizo_milhoes': 'mean'
-    }).round(2)
-    
-    # Nomes dos meses
-    meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
-             'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-    df_sazonal.index = [meses[i-1] for i in df_sazonal.index]
-    
-    print("📅 IMPACTOS MÉDIOS POR MÊS:")
-    print("-" * 40)
-    print(df_sazonal)
-    
+    escrever("\n📊 ANÁLISE SAZONAL")
+    escrever("=" * 50)
+
+    # Análise sazonal por mês (apenas meses com registros)
+    df_sazonal = analisador.agregado('sazonal')[['mortes', 'feridos', 'desalojados', 'prejuizo_milhoes']]
+    df_sazonal = df_sazonal.dropna().round(2)
+    df_sazonal.index = [MESES[i-1] for i in df_sazonal.index]
+
+    escrever("📅 IMPACTOS MÉDIOS POR MÊS:")
+    escrever("-" * 40)
+    escrever(df_sazonal)
+
     # Gráfico sazonal
-    plt.figure(figsize=(12, 6))
-    
+    fig, ax = nova_figura(figsize=(12, 6))
+
     for col in df_sazonal.columns:
-        plt.plot(df_sazonal.index, df_sazonal[col], 'o-', linewidth=2, markersize=6, label=col)
-    
-    plt.title('📅 Padrões Sazonais dos Impactos das Enchentes', fontsize=14, fontweight='bold')
-    plt.xlabel('Mês', fontweight='bold')
-    plt.ylabel('Impacto Médio', fontweight='bold')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.show()
-    
+        ax.plot(df_sazonal.index, df_sazonal[col], 'o-', linewidth=2, markersize=6, label=col)
+
+    ax.set_title('📅 Padrões Sazonais dos Impactos das Enchentes', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Mês', fontweight='bold')
+    ax.set_ylabel('Impacto Médio', fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    finalizar_figura(fig, 'kaggle_sazonal.png')
+
     return df_sazonal
 
 # =============================================================================
 # 🎯 INSIGHTS E CONCLUSÕES
 # =============================================================================
 
-def mostrar_insights():
+def mostrar_insights(escrever=print):
     """Mostra os principais insights identificados"""
-    print("\n🎯 INSIGHTS E CONCLUSÕES")
-    print("=" * 50)
-    
-    print("🎯 PRINCIPAIS INSIGHTS IDENTIFICADOS:")
-    print("-" * 50)
-    
-    print("\n📈 TENDÊNCIAS TEMPORAIS:")
-    print("• Aumento gradual dos impactos de 2020 a 2024")
-    print("• Picos sazonais nos meses de abril e maio")
-    print("• Crise de 2024 sem precedentes históricos")
-    
-    print("\n🌍 VULNERABILIDADES REGIONAIS:")
-    print("• Região metropolitana concentra os maiores impactos")
-    print("• Porto Alegre é a cidade mais afetada")
-    print("• Serra apresenta impactos menores mas significativos")
-    
-    print("\n🔗 CORRELAÇÕES IDENTIFICADAS:")
-    print("• Forte correlação entre altura do rio e número de desalojados")
-    print("• Relação direta entre precipitação e prejuízos econômicos")
-    print("• Padrões consistentes de resposta a emergências")
-    
-    print("\n🚨 LIÇÕES DA CRISE DE 2024:")
-    print("• Necessidade de sistemas de alerta mais eficazes")
-    print("• Importância do planejamento urbano resiliente")
-    print("• Valor dos dados históricos para prevenção")
+    escrever("\n🎯 INSIGHTS E CONCLUSÕES")
+    escrever("=" * 50)
+
+    escrever("🎯 PRINCIPAIS INSIGHTS IDENTIFICADOS:")
+    escrever("-" * 50)
+
+    escrever("\n📈 TENDÊNCIAS TEMPORAIS:")
+    escrever("• Aumento gradual dos impactos de 2020 a 2024")
+    escrever("• Picos sazonais nos meses de abril e maio")
+    escrever("• Crise de 2024 sem precedentes históricos")
+
+    escrever("\n🌍 VULNERABILIDADES REGIONAIS:")
+    escrever("• Região metropolitana concentra os maiores impactos")
+    escrever("• Porto Alegre é a cidade mais afetada")
+    escrever("• Serra apresenta impactos menores mas significativos")
+
+    escrever("\n🔗 CORRELAÇÕES IDENTIFICADAS:")
+    escrever("• Forte correlação entre altura do rio e número de desalojados")
+    escrever("• Relação direta entre precipitação e prejuízos econômicos")
+    escrever("• Padrões consistentes de resposta a emergências")
+
+    escrever("\n🚨 LIÇÕES DA CRISE DE 2024:")
+    escrever("• Necessidade de sistemas de alerta mais eficazes")
+    escrever("• Importância do planejamento urbano resiliente")
+    escrever("• Valor dos dados históricos para prevenção")
+
+# =============================================================================
+# ⚡ EXECUÇÃO EM LOTE
+# =============================================================================
+
+# Seções independentes entre si (todas leem apenas agregados do motor)
+SECOES = [
+    explorar_dados,
+    analise_temporal,
+    analise_regional,
+    analise_crise_2024,
+    analise_correlacoes,
+    analise_sazonal,
+]
+
+def _capturar(secao, analisador):
+    """Executa uma seção acumulando sua saída de texto, para não intercalar linhas entre threads"""
+    linhas = []
+    secao(analisador, escrever=lambda *partes: linhas.append(' '.join(str(p) for p in partes)))
+    return '\n'.join(linhas)
+
+def executar_secoes_em_lote(analisador, max_workers=None):
+    """Calcula os agregados e executa as seções em paralelo, imprimindo na ordem original"""
+    analisador.precalcular(max_workers=max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        saidas = list(executor.map(lambda secao: _capturar(secao, analisador), SECOES))
+
+    for saida in saidas:
+        print(saida)
 
 # =============================================================================
 # 🚀 FUNÇÃO PRINCIPAL
 # =============================================================================
 
-def main():
+def main(argv=None):
     """Função principal que executa toda a análise"""
+    parser = argparse.ArgumentParser(description='Análise das enchentes no RS (notebook Kaggle)')
+    parser.add_argument('--lote', action='store_true',
+                        help='executa sem interface gráfica, com seções em paralelo e cache de agregados')
+    parser.add_argument('--saida', default=CONFIG['pasta_saida'],
+                        help='pasta para gráficos e cache de agregados (padrão: outputs)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='número de threads no modo lote')
+    # parse_known_args: o kernel do Jupyter passa argumentos próprios
+    args, _ = parser.parse_known_args(argv)
+
+    CONFIG['lote'] = args.lote
+    CONFIG['pasta_saida'] = args.saida
+    if args.lote:
+        plt.switch_backend('Agg')
+
+    inicio = time.perf_counter()
     print("🌊 ANÁLISE COMPLETA DAS ENCHENTES NO RIO GRANDE DO SUL (2020-2024)")
     print("=" * 80)
     print("🚀 Iniciando análise...")
-    
+
     # 1. Carregar dados
-    df_principal, df_2024 = carregar_dados()
-    
-    if df_principal is None or df_2024 is None:
+    analisador = carregar_dados()
+
+    if analisador is None:
         print("❌ Não foi possível carregar os dados. Verifique os arquivos CSV.")
         return
-    
-    # 2. Exploração inicial
-    explorar_dados(df_principal, df_2024)
-    
-    # 3. Análise temporal
-    df_anual = analise_temporal(df_principal, df_2024)
-    
-    # 4. Análise regional
-    df_regional, df_cidades = analise_regional(df_principal)
-    
-    # 5. Análise da crise de 2024
-    df_2024_diario = analise_crise_2024(df_2024)
-    
-    # 6. Análise de correlações
-    correlacao = analise_correlacoes(df_principal)
-    
-    # 7. Análise sazonal
-    df_sazonal = analise_sazonal(df_principal)
-    
+
+    # 2-7. Exploração, análises temporal, regional, da crise, correlações e sazonal
+    if args.lote:
+        executar_secoes_em_lote(analisador, max_workers=args.workers)
+    else:
+        for secao in SECOES:
+            secao(analisador)
+
     # 8. Mostrar insights
     mostrar_insights()
-    
+
     # 9. Resumo final
+    resumo = analisador.agregado('resumo')
     print("\n🎉 ANÁLISE CONCLUÍDA COM SUCESSO!")
     print("=" * 50)
     print("📊 Resumo dos resultados:")
-    print(f"• Dataset Principal: {df_principal.shape[0]} registros analisados")
-    print(f"• Dataset 2024: {df_2024.shape[0]} registros da crise")
-    print(f"• Período coberto: {df_principal['data'].min().year} a {df_principal['data'].max().year}")
-    print(f"• Cidades analisadas: {df_principal['cidade'].nunique()}")
-    print(f"• Regiões: {df_principal['regiao'].nunique()}")
-    
+    print(f"• Dataset Principal: {resumo['registros']} registros analisados")
+    print(f"• Dataset 2024: {len(analisador.agregado('diario_2024'))} dias da crise")
+    print(f"• Período coberto: {resumo['inicio'].year} a {resumo['fim'].year}")
+    print(f"• Cidades analisadas: {resumo['cidades']}")
+    print(f"• Regiões: {len(resumo['regioes'])}")
+
+    if args.lote:
+        print(f"\n⏱️ Tempo total: {time.perf_counter() - inicio:.2f}s")
+        analisador.relatorio_tempos()
+
     print("\n💡 Próximos passos recomendados:")
     print("• Analisar padrões específicos por cidade")
     print("• Desenvolver modelos preditivos")
     print("• Comparar com dados de outros estados")
     print("• Criar dashboards interativos")
-    
+
     print("\n📞 Para dúvidas e contribuições:")
     print("• Use os comentários no Kaggle")
     print("• Compartilhe seus insights")
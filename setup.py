@@ -58,6 +58,10 @@ setup(
             "flake8>=3.8",
             "mypy>=0.800",
         ],
+        "leitura": [
+            "pyarrow>=10.0",
+            "zstandard>=0.19",
+        ],
         "docs": [
             "sphinx>=4.0",
             "sphinx-rtd-theme>=1.0",
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+RS Impacto - Análise de Enchentes no Rio Grande do Sul
+Pacote do motor de análise (src.analise_enchentes) e dos módulos que ele usa; cada
+módulo também roda como script (python src/modulo.py) ou com python -m src.modulo
+"""
@@ -5,15 +5,45 @@ Análise de Impactos das Enchentes do Rio Grande do Sul
 Análise de dados sobre mortes, impactos e consequências das enchentes
 """
 
+import os
+import sys
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime
 import warnings
+
+if not __package__:
+    # Executado como script (python src/analise_enchentes.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+from .leitura import (ARQUIVO_POPULACAO, MOTORES_LEITURA, COLUNA_PREJUIZO_FIXO, ESCALAS_PREJUIZO, FiltroLinhas,
+                      ler_populacao, ler_csv, arquivos_dataset, ler_dataset, ler_em_lotes, limites_por_coluna,
+                      prejuizo_ponto_fixo)
+from .cache import CacheResultados, LIMITE_CACHE_BYTES, impressao_digital
+from .episodios import segmentar_episodios
+from .pipeline import Etapa, Pipeline
+from .monitor import INTERVALO_SEGUNDOS, MonitorDados
+from .bootstrap import CONFIANCA, N_REAMOSTRAS, intervalos_confianca
+from .simulacao import N_SIMULACOES, simular_cenarios
+from .extremos import PERIODOS_RETORNO, VARIAVEIS as VARIAVEIS_EXTREMOS, niveis_retorno
+from .defasagem import DEFASAGEM_MAXIMA, MINIMO_PARES, defasagens
+from .previsao_rio import HORIZONTE, ModeloNivelRio
+from .mapa_calor import TAMANHO_FIGURA as TAMANHO_MAPA_CALOR, matrizes_periodo, desenhar_mapa_calor
+from .graficos_cidades import PASTA_GRAFICOS_CIDADES, series_por_cidade, renderizar_cidades
+from .saida import MODOS_SAIDA, FormatoSaida, escrever_tabela
+from .ranking import METRICAS_PLACAR, METRICAS_PLACAR_2024, TAMANHO_PLACAR, Placar
+from .memoria import (FATOR_TRABALHO, RESERVA_GRAFICOS_BYTES, AcumuladorLotes, estimar_dataset, planejar, interpretar_tamanho,
+                      formatar_bytes, memoria_atual, pico_memoria)
+from .validacao import ErroValidacao, validar_dataframe, imprimir_relatorio
 warnings.filterwarnings('ignore')
 
 # Configurações de estilo
@@ -22,55 +52,577 @@ sns.set_palette("husl")
 plt.rcParams['figure.figsize'] = (12, 8)
 plt.rcParams['font.size'] = 10
 
+# Arquivos de entrada (relativos à pasta de dados)
+ARQUIVO_GERAL = 'enchentes_rs.csv'
+ARQUIVO_2024 = 'enchente_2024_detalhado.csv'
+
+COLUNAS_IMPACTO = ['mortes', 'feridos', 'desalojados', 'prejuizo_milhoes']
+COLUNAS_NUMERICAS = COLUNAS_IMPACTO + ['altura_rio_metros', 'chuva_24h_mm']
+
+MESES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+         'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+# Limite de pontos mantidos para gráficos de dispersão
+TAMANHO_AMOSTRA_DISPERSAO = 5000
+
+# Colunas das tabelas por cidade que têm placar top-K (coluna exibida → métrica do placar)
+COLUNAS_RANKING = {'Prejuízo (R$ milhões)': 'prejuizo_milhoes', 'Desalojados': 'desalojados',
+                   'Feridos': 'feridos', 'Altura Máxima (m)': 'altura_rio_metros'}
+COLUNAS_RANKING_2024 = {'Prejuízo Máximo (R$ milhões)': 'prejuizo_milhoes', 'Desalojados Máximo': 'desalojados',
+                        'Feridos': 'feridos', 'Altura Máxima (m)': 'altura_rio_metros'}
+
+# Versão dos cálculos: mudar invalida os resultados guardados no cache persistente
+VERSAO_CACHE = 4
+
+# Cenário de contingência: 10% dos dias mais chuvosos de cada cidade, severidade em parte comum à região
+CENARIO_CONTINGENCIA = {'quantil': 0.9, 'correlacao': 0.5}
+
+# Colunas de impacto relativo à população (IBGE)
+COLUNAS_PER_CAPITA = ['Desalojados/100 mil hab', 'Prejuízo per capita (R$)', 'Desalojados/mil domicílios']
+
+def anexar_populacao(df, referencia):
+    """
+    Acrescenta populacao e domicilios a cada linha de `df` sem merge de strings:
+    `cidade` vira categórica e a tabela de referência é alinhada uma vez às
+    categorias, de modo que cada linha só faz uma leitura por código.
+    """
+    df['cidade'] = df['cidade'].astype('category')
+    codigos = df['cidade'].cat.codes.to_numpy()
+    alinhada = referencia.reindex(df['cidade'].cat.categories)
+    for coluna in ('populacao', 'domicilios'):
+        # Posição extra com NaN para códigos -1 (cidade ausente) e cidades sem referência
+        valores = np.append(alinhada[coluna].to_numpy(dtype=np.float64), np.nan)
+        df[coluna] = valores[codigos]
+    return df
+
+def impactos_per_capita(desalojados, prejuizo_milhoes, populacao, domicilios):
+    """Colunas de impacto por habitante e por domicílio, alinhadas aos argumentos"""
+    return pd.DataFrame({
+        COLUNAS_PER_CAPITA[0]: desalojados / populacao * 100_000,
+        COLUNAS_PER_CAPITA[1]: prejuizo_milhoes * 1_000_000 / populacao,
+        COLUNAS_PER_CAPITA[2]: desalojados / domicilios * 1_000,
+    }).round(2)
+
+# Arquivos de entrada de que cada agregado depende (um arquivo alterado invalida só estes)
+DEPENDENCIAS_AGREGADOS = {
+    'resumo': [ARQUIVO_GERAL],
+    'anual': [ARQUIVO_GERAL, ARQUIVO_POPULACAO],
+    'regional': [ARQUIVO_GERAL, ARQUIVO_POPULACAO],
+    'cidades': [ARQUIVO_GERAL, ARQUIVO_POPULACAO],
+    'placar': [ARQUIVO_GERAL],
+    'populacao_cidades': [ARQUIVO_GERAL, ARQUIVO_POPULACAO],
+    'mensal': [ARQUIVO_GERAL],
+    'sazonal': [ARQUIVO_GERAL],
+    'correlacao': [ARQUIVO_GERAL],
+    'descricao': [ARQUIVO_GERAL, ARQUIVO_POPULACAO],
+    'amostra_dispersao': [ARQUIVO_GERAL],
+    'episodios': [ARQUIVO_GERAL],
+    'maximos_anuais': [ARQUIVO_GERAL],
+    'crise_2024': [ARQUIVO_2024, ARQUIVO_POPULACAO],
+    'placar_2024': [ARQUIVO_2024],
+    'diario_2024': [ARQUIVO_2024],
+    'episodios_2024': [ARQUIVO_2024],
+}
+
+# Etapas da análise completa: (nome, entradas, saídas, método, argumentos, thread principal).
+# Os nomes dos arquivos de dados são as entradas externas; agregados são lidos do cache ou
+# calculados sob demanda, e etapas que leem a base de 2024 direto declaram o arquivo.
+AGREGADOS_ETAPAS = ['resumo', 'anual', 'regional', 'cidades', 'placar', 'mensal', 'sazonal', 'correlacao',
+                    'episodios', 'maximos_anuais']
+ETAPAS_ANALISE = [
+    ('dados', [ARQUIVO_GERAL, ARQUIVO_2024, ARQUIVO_POPULACAO], ['dados'], '_garantir_dados', (), False),
+    *[(f'agregado:{chave}', DEPENDENCIAS_AGREGADOS[chave], [f'agregado:{chave}'], 'agregado', (chave,), False)
+      for chave in AGREGADOS_ETAPAS],
+    ('estatisticas', ['agregado:resumo'], ['secao:estatisticas'], 'estatisticas_gerais', (), False),
+    ('extremos', ['agregado:maximos_anuais'], ['secao:extremos'], 'analise_extremos', (), False),
+    ('temporal', ['agregado:anual'], ['secao:temporal'], 'analise_temporal', (), False),
+    ('regional', ['agregado:regional'], ['secao:regional'], 'analise_regional', (), False),
+    ('incerteza', [ARQUIVO_GERAL, 'agregado:regional'], ['secao:incerteza'], 'analise_incerteza', (), False),
+    ('cenarios', [ARQUIVO_GERAL], ['secao:cenarios'], 'analise_cenarios', (), False),
+    ('cidades', ['agregado:cidades', 'agregado:placar'], ['secao:cidades'], 'analise_cidades', (), False),
+    ('crise_2024', [ARQUIVO_2024, ARQUIVO_POPULACAO], ['secao:crise_2024'], 'analise_enchente_2024', (), False),
+    ('episodios', [ARQUIVO_2024, 'agregado:episodios'], ['secao:episodios'], 'analise_episodios', (), False),
+    ('defasagem', [ARQUIVO_GERAL, ARQUIVO_2024], ['secao:defasagem'], 'analise_defasagem', (), False),
+    ('previsao', [ARQUIVO_2024], ['secao:previsao'], 'analise_previsao', (), False),
+    ('grafico:evolucao_temporal', ['agregado:mensal'], ['evolucao_temporal.png'],
+     'grafico_evolucao_temporal', (), True),
+    ('grafico:comparacao_regional', ['agregado:regional'], ['comparacao_regional.png'],
+     'grafico_comparacao_regional', (), True),
+    ('grafico:analise_sazonal', ['agregado:sazonal'], ['analise_sazonal.png'], 'grafico_analise_sazonal', (), True),
+    ('grafico:correlacao', ['agregado:correlacao'], ['correlacao.png'], 'grafico_correlacao', (), True),
+    ('grafico:enchente_2024', [ARQUIVO_2024], ['enchente_2024.png'], 'grafico_enchente_2024', (), True),
+    ('grafico:mapa_calor_2024', [ARQUIVO_2024], ['mapa_calor_2024.png'], 'grafico_mapa_calor', (), True),
+    ('grafico:cidades', [ARQUIVO_GERAL], [f'{PASTA_GRAFICOS_CIDADES}/'], 'graficos_cidades', (), False),
+    ('relatorio', [ARQUIVO_2024, ARQUIVO_POPULACAO, 'agregado:resumo', 'agregado:anual', 'agregado:regional',
+                   'agregado:cidades', 'agregado:placar'],
+     ['relatorio_enchentes.txt'], 'gerar_relatorio', (), False),
+]
+
+# Analisadores já criados neste processo (etapas executadas em ProcessPoolExecutor)
+_ANALISADORES_PROCESSO = {}
+
+def _executar_em_processo(configuracao, metodo, argumentos):
+    """Executa uma etapa em um processo filho, com um analisador próprio por configuração"""
+    # Cache e formato de saída chegam como cópias novas a cada etapa: ficam fora da chave
+    chave = repr(sorted((k, v) for k, v in configuracao.items() if k not in ('cache', 'saida')))
+    if chave not in _ANALISADORES_PROCESSO:
+        _ANALISADORES_PROCESSO[chave] = AnalisadorEnchentes(carregar=False, **configuracao)
+    getattr(_ANALISADORES_PROCESSO[chave], metodo)(*argumentos)
+
 class AnalisadorEnchentes:
-    def __init__(self):
+    def __init__(self, pasta_dados='data', pasta_saida='outputs', exibir_graficos=True, carregar=True,
+                 validar=True, anos=None, regioes=None, motor_leitura=None, cache=True, saida=None,
+                 max_memoria=None, inicio=None, fim=None, cidades=None, limites=None, ponto_fixo=None):
+        self.pasta_dados = pasta_dados
+        # None lê sem tipos forçados (valores inválidos vão para o relatório de validação);
+        # um motor de MOTORES_LEITURA lê já com os tipos do esquema
+        self.motor_leitura = motor_leitura
+        # Cache persistente de resultados: True usa <pasta_saida>/cache, False desliga
+        if cache is True:
+            cache = CacheResultados(os.path.join(pasta_saida, 'cache'))
+        self.cache = cache or None
+        # Modo de exibição das tabelas no console (completo, topo, paginado, fluxo ou silencioso)
+        self.saida = saida or FormatoSaida()
+        # Argumentos para recriar este analisador em outro processo (sem janelas de gráfico)
+        self._configuracao = dict(pasta_dados=pasta_dados, pasta_saida=pasta_saida, exibir_graficos=False,
+                                  validar=validar, anos=anos, regioes=regioes,
+                                  motor_leitura=motor_leitura, cache=self.cache or False, saida=self.saida,
+                                  max_memoria=max_memoria, inicio=inicio, fim=fim, cidades=cidades, limites=limites,
+                                  ponto_fixo=ponto_fixo)
+        # Orçamento de memória em bytes: a base geral é lida inteira ou em lotes conforme o plano
+        self.max_memoria = max_memoria
+        self.plano_memoria = None
+        # Filtros de linhas (datas, anos, cidades, regiões, limites numéricos {coluna: (mínimo, máximo)}):
+        # podam as partições e são aplicados lote a lote na leitura, antes de montar os DataFrames
+        self.filtro = FiltroLinhas(inicio, fim, cidades, regioes, anos, limites)
+        self.anos = self.filtro.anos
+        self.regioes = self.filtro.regioes
+        # Escala de ESCALAS_PREJUIZO: prejuízo também em int64 e somado em ponto fixo, com totais
+        # idênticos entre carga inteira, lotes e partições; None soma em float64
+        self.ponto_fixo = ponto_fixo
+        self.pasta_saida = pasta_saida
+        self.exibir_graficos = exibir_graficos
+        self.validar = validar
+        self.validacao = {}
         self.df_geral = None
         self.df_2024 = None
-        self.carregar_dados()
+        # Resumo da base geral quando ela é lida em lotes (df_geral fica None)
+        self._lotes = None
+        self.populacao = None
+        self.tempos = {}
+        self._agregados = {}
+        self._lock = threading.RLock()
+        self._dados_carregados = False
+        # Falha de validação da última carga: repetida a cada etapa que precisar dos dados
+        self._erro_validacao = None
+        if carregar:
+            self.carregar_dados()
+    
+    def _validar_dados(self, arquivos=(ARQUIVO_GERAL, ARQUIVO_2024)):
+        """Valida os datasets de `arquivos`; violações graves interrompem a carga com ErroValidacao"""
+        with self._cronometrar('validacao'):
+            for nome, df in ((ARQUIVO_GERAL, self.df_geral), (ARQUIVO_2024, self.df_2024)):
+                if df is not None and nome in arquivos:
+                    self.validacao[nome] = validar_dataframe(df, self.populacao)
+            if self._lotes is not None and ARQUIVO_GERAL in arquivos:
+                # Validada lote a lote durante a leitura
+                self.validacao[ARQUIVO_GERAL] = self._lotes.relatorio_validacao()
+        
+        erros = 0
+        for nome, relatorio in self.validacao.items():
+            if not relatorio.empty:
+                imprimir_relatorio(relatorio, nome)
+                erros += int(relatorio.loc[relatorio['severidade'] == 'erro', 'violacoes'].sum())
+        if erros:
+            raise ErroValidacao(f"{erros} violações graves nos dados de entrada",
+                                pd.concat(self.validacao, names=['arquivo']))
+    
+    def _ler_populacao(self):
+        """Tabela de referência de população; vazia quando o arquivo não existe"""
+        caminho = os.path.join(self.pasta_dados, ARQUIVO_POPULACAO)
+        if os.path.exists(caminho):
+            return ler_populacao(caminho)
+        print(f"⚠️ Referência de população não encontrada em '{caminho}': colunas per capita ficarão vazias")
+        return pd.DataFrame({'regiao': pd.Series(dtype='object'),
+                             'populacao': pd.Series(dtype='float64'),
+                             'domicilios': pd.Series(dtype='float64')})
+    
+    def arquivos_por_entrada(self):
+        """Caminhos de cada entrada (apenas as partições que passam pelos filtros)"""
+        return {
+            ARQUIVO_GERAL: arquivos_dataset(self.pasta_dados, ARQUIVO_GERAL, filtro=self.filtro),
+            ARQUIVO_2024: arquivos_dataset(self.pasta_dados, ARQUIVO_2024, filtro=self.filtro),
+            ARQUIVO_POPULACAO: [os.path.join(self.pasta_dados, ARQUIVO_POPULACAO)],
+        }
+    
+    @property
+    def arquivos(self):
+        """Caminhos dos arquivos de entrada (apenas as partições que passam pelos filtros)"""
+        return [caminho for caminhos in self.arquivos_por_entrada().values() for caminho in caminhos]
+    
+    def _ler_dataset(self, arquivo):
+        """Lê um dataset plano ou particionado só com as linhas que passam pelo filtro"""
+        if self.filtro.ativo:
+            df = ler_dataset(self.pasta_dados, arquivo, filtro=self.filtro, motor=self.motor_leitura)
+        elif self.motor_leitura is None:
+            df = ler_dataset(self.pasta_dados, arquivo)
+        else:
+            df = ler_dataset(self.pasta_dados, arquivo, leitor=ler_csv, motor=self.motor_leitura)
+        
+        # Converter coluna de data (datas inválidas viram NaT e aparecem na validação)
+        df['data'] = pd.to_datetime(df['data'], errors='coerce')
+        return df
+    
+    def _planejar_memoria(self):
+        """
+        Plano para a base geral caber em max_memoria. Ficam fora do orçamento dela a base
+        de 2024 (sempre carregada inteira) e a renderização dos gráficos.
+        """
+        with self._cronometrar('planejar_memoria'):
+            estimativa = estimar_dataset(arquivos_dataset(self.pasta_dados, ARQUIVO_GERAL, filtro=self.filtro))
+            estimativa_2024 = estimar_dataset(arquivos_dataset(self.pasta_dados, ARQUIVO_2024, filtro=self.filtro))
+            fixo = int(estimativa_2024.bytes_memoria * FATOR_TRABALHO) + RESERVA_GRAFICOS_BYTES
+            return planejar(estimativa, self.max_memoria, fixo, memoria_atual() or 0)
+    
+    def _lotes_geral(self, tamanho_lote):
+        """Lotes da base geral (todas as partições que passam pela poda), com datas e filtro aplicados"""
+        for caminho in arquivos_dataset(self.pasta_dados, ARQUIVO_GERAL, filtro=self.filtro):
+            if self.motor_leitura is None:
+                leitor = pd.read_csv(caminho, chunksize=tamanho_lote)
+            else:
+                leitor = ler_em_lotes(caminho, None, tamanho_lote)
+            for lote in leitor:
+                lote['data'] = pd.to_datetime(lote['data'], errors='coerce')
+                yield self.filtro.aplicar(lote)
+    
+    def _acumular_em_lotes(self, tamanho_lote):
+        """Lê a base geral em lotes, guardando só o resumo de que os agregados precisam"""
+        acumulador = AcumuladorLotes(COLUNAS_NUMERICAS, self.populacao, self.validar, TAMANHO_AMOSTRA_DISPERSAO,
+                                     escala_prejuizo=self.ponto_fixo)
+        for lote in self._lotes_geral(tamanho_lote):
+            acumulador.adicionar(lote)
+        return acumulador
+    
+    @property
+    def registros_geral(self):
+        """Registros da base geral carregada (inteira ou em lotes); None antes da carga"""
+        if self._lotes is not None:
+            return self._lotes.registros
+        return None if self.df_geral is None else len(self.df_geral)
     
     def carregar_dados(self):
         """Carrega os datasets de enchentes"""
+        self._erro_validacao = None
         try:
-            self.df_geral = pd.read_csv('data/enchentes_rs.csv')
-            self.df_2024 = pd.read_csv('data/enchente_2024_detalhado.csv')
-            
-            # Converter coluna de data
-            self.df_geral['data'] = pd.to_datetime(self.df_geral['data'])
-            self.df_2024['data'] = pd.to_datetime(self.df_2024['data'])
+            with self._cronometrar('carregar_dados'):
+                self.populacao = self._ler_populacao()
+                if self.filtro.ativo:
+                    print(self.filtro.descrever())
+                
+                if self.max_memoria is not None:
+                    self.plano_memoria = self._planejar_memoria()
+                    print(self.plano_memoria.descrever())
+                if self.plano_memoria is not None and self.plano_memoria.modo == 'lotes':
+                    self._lotes = self._acumular_em_lotes(self.plano_memoria.tamanho_lote)
+                else:
+                    self.df_geral = self._ler_dataset(ARQUIVO_GERAL)
+                self.df_2024 = self._ler_dataset(ARQUIVO_2024)
+                
+                if self.validar:
+                    self._validar_dados()
+                
+                # Depois da validação, para valores inválidos no prejuízo chegarem ao relatório
+                if self.ponto_fixo is not None:
+                    for df in (self.df_geral, self.df_2024):
+                        if df is not None:
+                            prejuizo_ponto_fixo(df, self.ponto_fixo)
+                
+                # População por município (per capita), se a referência existir
+                if self.df_geral is not None:
+                    anexar_populacao(self.df_geral, self.populacao)
+                anexar_populacao(self.df_2024, self.populacao)
             
             print("✅ Dados carregados com sucesso!")
-            print(f"📊 Dataset geral: {len(self.df_geral)} registros")
+            print(f"📊 Dataset geral: {self.registros_geral} registros")
             print(f"📊 Dataset 2024: {len(self.df_2024)} registros")
             
+            # Filtros que excluem 2024 deixam a base detalhada indisponível, como um arquivo ausente
+            if self.df_2024.empty:
+                self.df_2024 = None
+            
+        except ErroValidacao as e:
+            self.df_geral = None
+            self._lotes = None
+            self.df_2024 = None
+            self._erro_validacao = e
+            raise
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
+        finally:
+            self._dados_carregados = True
     
-    def estatisticas_gerais(self):
-        """Exibe estatísticas gerais dos dados"""
-        print("\n" + "="*60)
-        print("📈 ESTATÍSTICAS GERAIS DAS ENCHENTES NO RS")
-        print("="*60)
+    def recarregar(self, arquivos):
+        """
+        Relê só as entradas alteradas (ARQUIVO_GERAL, ARQUIVO_2024, ARQUIVO_POPULACAO),
+        revalida o que mudou e descarta da memória os agregados que dependem delas;
+        os demais continuam valendo. Retorna os agregados descartados. Se a validação
+        rejeitar os dados novos, as bases anteriores são restauradas e o ErroValidacao sobe.
+        """
+        with self._lock:
+            if self.dados_rejeitados:
+                # A carga anterior foi rejeitada: não há bases válidas a preservar, relê tudo
+                descartados = list(self._agregados)
+                self._agregados.clear()
+                self.carregar_dados()
+                return descartados
+        self._garantir_dados()
+        arquivos = set(arquivos)
+        with self._lock, self._cronometrar('recarregar'):
+            anterior = (self.populacao, self.df_geral, self._lotes, self.df_2024, dict(self.validacao))
+            try:
+                self._reler(arquivos)
+            except ErroValidacao:
+                self.populacao, self.df_geral, self._lotes, self.df_2024, self.validacao = anterior
+                raise
+            
+            descartados = [chave for chave, dependencias in DEPENDENCIAS_AGREGADOS.items()
+                           if arquivos.intersection(dependencias) and self._agregados.pop(chave, None) is not None]
+        return descartados
+    
+    @property
+    def dados_rejeitados(self):
+        """True quando a última carga completa foi rejeitada pela validação"""
+        return self._erro_validacao is not None
+    
+    def _reler(self, arquivos):
+        """Relê e revalida as entradas de `arquivos` (o conjunto pode crescer), anexando a população"""
+        if ARQUIVO_POPULACAO in arquivos:
+            self.populacao = self._ler_populacao()
+            if self._lotes is not None:
+                # Na leitura em lotes a população entra no resumo: a base geral é relida
+                arquivos.add(ARQUIVO_GERAL)
+        if ARQUIVO_GERAL in arquivos:
+            if self._lotes is not None:
+                self._lotes = self._acumular_em_lotes(self.plano_memoria.tamanho_lote)
+            else:
+                self.df_geral = self._ler_dataset(ARQUIVO_GERAL)
+        if ARQUIVO_2024 in arquivos:
+            self.df_2024 = self._ler_dataset(ARQUIVO_2024)
         
-        print(f"\n📅 Período analisado: {self.df_geral['data'].min().strftime('%d/%m/%Y')} a {self.df_geral['data'].max().strftime('%d/%m/%Y')}")
-        print(f"🏙️ Cidades monitoradas: {self.df_geral['cidade'].nunique()}")
-        print(f"🗺️ Regiões: {', '.join(self.df_geral['regiao'].unique())}")
+        # Nova população: as duas bases são revalidadas (cidade → região) e reanexadas
+        datasets = {ARQUIVO_GERAL, ARQUIVO_2024} if ARQUIVO_POPULACAO in arquivos else arquivos
+        if self.validar:
+            self._validar_dados(datasets)
+        for nome, df in ((ARQUIVO_GERAL, self.df_geral), (ARQUIVO_2024, self.df_2024)):
+            # Só as bases relidas: as demais já têm a coluna em ponto fixo da carga anterior
+            if df is not None and nome in arquivos and self.ponto_fixo is not None:
+                prejuizo_ponto_fixo(df, self.ponto_fixo)
+            if df is not None and nome in datasets:
+                anexar_populacao(df, self.populacao)
+        if self.df_2024 is not None and self.df_2024.empty:
+            self.df_2024 = None
+    
+    # ------------------------------------------------------------------
+    # Instrumentação e cache de agregados
+    # ------------------------------------------------------------------
+    
+    @contextmanager
+    def _cronometrar(self, etapa):
+        """Acumula o tempo gasto em uma etapa em self.tempos"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            with self._lock:
+                self.tempos[etapa] = self.tempos.get(etapa, 0.0) + duracao
+    
+    def _garantir_dados(self):
+        """
+        Carrega os dados sob demanda quando o analisador foi criado com carregar=False; se a
+        carga foi rejeitada pela validação, levanta o mesmo ErroValidacao em vez de seguir sem dados
+        """
+        with self._lock:
+            if not self._dados_carregados:
+                self.carregar_dados()
+            if self._erro_validacao is not None:
+                raise self._erro_validacao
+    
+    def _agregado(self, chave, calcular):
+        """Retorna o agregado `chave`: da memória, do cache persistente ou calculado na hora"""
+        with self._lock:
+            if chave in self._agregados:
+                return self._agregados[chave]
         
-        print(f"\n💀 Total de mortes: {self.df_geral['mortes'].sum()}")
-        print(f"🤕 Total de feridos: {self.df_geral['feridos'].sum()}")
-        print(f"🏠 Total de desalojados: {self.df_geral['desalojados'].sum():,}")
-        print(f"💰 Prejuízo total: R$ {self.df_geral['prejuizo_milhoes'].sum():.1f} milhões")
+        resultado = self.resultado_em_cache(f'agregado:{chave}', None,
+                                            lambda: self._calcular_agregado(chave, calcular))
         
-        print(f"\n🌊 Altura máxima do rio: {self.df_geral['altura_rio_metros'].max():.1f}m")
-        print(f"🌧️ Chuva máxima em 24h: {self.df_geral['chuva_24h_mm'].max():.1f}mm")
+        with self._lock:
+            return self._agregados.setdefault(chave, resultado)
     
-    def analise_temporal(self):
-        """Análise temporal das enchentes"""
-        print("\n" + "="*60)
-        print("⏰ ANÁLISE TEMPORAL DAS ENCHENTES")
-        print("="*60)
+    def _calcular_agregado(self, chave, calcular):
+        self._garantir_dados()
+        with self._cronometrar(f'agregado:{chave}'):
+            return calcular()
+    
+    def resultado_em_cache(self, metodo, parametros, calcular):
+        """Resultado de `calcular` guardado no cache persistente para a versão atual dos dados"""
+        if self.cache is None:
+            return calcular()
+        return self.cache.em_cache(self.impressao_digital(), metodo, parametros, calcular)
+    
+    def _calculos(self):
+        """Mapeia cada agregado disponível para a função que o calcula"""
+        calculos = {
+            'resumo': self._calcular_resumo,
+            'anual': self._calcular_anual,
+            'regional': self._calcular_regional,
+            'cidades': self._calcular_cidades,
+            'placar': self._calcular_placar,
+            'populacao_cidades': self._calcular_populacao_cidades,
+            'mensal': self._calcular_mensal,
+            'sazonal': self._calcular_sazonal,
+            'correlacao': self._calcular_correlacao,
+            'descricao': self._calcular_descricao,
+            'amostra_dispersao': self._calcular_amostra_dispersao,
+            'episodios': self._calcular_episodios,
+            'maximos_anuais': self._calcular_maximos_anuais,
+        }
+        if self.df_2024 is not None or not self._dados_carregados:
+            calculos['crise_2024'] = self._calcular_crise_2024
+            calculos['placar_2024'] = self._calcular_placar_2024
+            calculos['diario_2024'] = self._calcular_diario_2024
+            calculos['episodios_2024'] = self._calcular_episodios_2024
+        return calculos
+    
+    def agregado(self, chave):
+        """Retorna um agregado pelo nome (ex.: 'anual', 'regional', 'cidades')"""
+        return self._agregado(chave, self._calculos()[chave])
+    
+    def precalcular(self, chaves=None, max_workers=None):
+        """Calcula em paralelo os agregados ainda ausentes do cache"""
+        calculos = self._calculos()
+        chaves = [c for c in (chaves or calculos) if c in calculos]
+        with self._cronometrar('precalcular'):
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(lambda chave: self._agregado(chave, calculos[chave]), chaves))
+    
+    def limpar_cache(self):
+        """Descarta os agregados calculados"""
+        with self._lock:
+            self._agregados.clear()
+    
+    def impressao_digital(self):
+        """Identifica a versão dos arquivos de entrada, dos filtros e dos cálculos"""
+        return impressao_digital(self.arquivos, VERSAO_CACHE, self.filtro, self.ponto_fixo)
+    
+    def salvar_agregados(self):
+        """Persiste no cache os agregados já calculados em memória"""
+        if self.cache is None:
+            return
+        impressao = self.impressao_digital()
+        with self._lock:
+            agregados = dict(self._agregados)
+        for chave, valor in agregados.items():
+            self.cache.guardar(self.cache.chave(impressao, f'agregado:{chave}'), valor)
+    
+    def carregar_agregados(self):
+        """Recupera do cache os agregados da versão atual dos dados; True se todos estavam lá"""
+        if self.cache is None:
+            return False
+        impressao = self.impressao_digital()
+        completos = True
+        with self._cronometrar('carregar_agregados'):
+            for chave in self._calculos():
+                encontrado, valor = self.cache.obter(self.cache.chave(impressao, f'agregado:{chave}'))
+                if encontrado:
+                    with self._lock:
+                        self._agregados.setdefault(chave, valor)
+                completos &= encontrado
+        return completos
+    
+    def relatorio_tempos(self):
+        """Exibe o tempo acumulado por etapa"""
+        print("\n⏱️ Tempo por etapa:")
+        for etapa, duracao in sorted(self.tempos.items(), key=lambda item: -item[1]):
+            print(f"   • {etapa}: {duracao * 1000:.1f} ms")
+        if self.cache is not None:
+            print(f"💾 Cache persistente: {self.cache.acertos} acertos, {self.cache.faltas} faltas")
+        self.relatorio_memoria()
+    
+    def relatorio_memoria(self):
+        """Exibe o plano de memória escolhido e o pico observado do processo"""
+        if self.max_memoria is None:
+            return
+        if self.plano_memoria is not None:
+            modo = ('carga inteira' if self.plano_memoria.modo == 'memoria'
+                    else f"lotes de {self.plano_memoria.tamanho_lote:,} linhas")
+            print(f"🧠 Plano de memória: {modo}")
+        pico = pico_memoria()
+        if pico is not None:
+            situacao = '✅' if pico <= self.max_memoria else '⚠️ acima do orçamento'
+            print(f"🧠 Pico de memória observado: {formatar_bytes(pico)} "
+                  f"(orçamento {formatar_bytes(self.max_memoria)}) {situacao}")
+    
+    # ------------------------------------------------------------------
+    # Cálculo dos agregados
+    # ------------------------------------------------------------------
+    
+    def _agrupar(self, chaves, funcoes):
+        """
+        groupby(chaves).agg(funcoes) da base geral, com chaves entre 'ano', 'mes', 'regiao'
+        e 'cidade': sobre o DataFrame ou, na leitura em lotes, sobre o cubo acumulado
+        """
+        def agregar(funcoes):
+            if self._lotes is not None:
+                return self._lotes.agrupar(chaves, funcoes)
+            df = self.df_geral
+            derivadas = {'ano': df['data'].dt.year.rename('ano'), 'mes': df['data'].dt.month.rename('mes')}
+            return df.groupby([derivadas.get(chave, chave) for chave in chaves], observed=True).agg(funcoes)
         
-        # Agrupamento por ano
-        df_anual = self.df_geral.groupby(self.df_geral['data'].dt.year).agg({
+        return self._somar_prejuizo_exato(agregar, funcoes)
+    
+    def _somar_prejuizo_exato(self, agregar, funcoes):
+        """
+        agregar(funcoes) com a soma de prejuizo_milhoes feita sobre a coluna int64 em ponto
+        fixo (exata em qualquer ordem) e convertida para milhões só no resultado
+        """
+        if self.ponto_fixo is None or funcoes.get('prejuizo_milhoes') != 'sum':
+            return agregar(funcoes)
+        tabela = agregar({COLUNA_PREJUIZO_FIXO if coluna == 'prejuizo_milhoes' else coluna: funcao
+                          for coluna, funcao in funcoes.items()})
+        tabela[COLUNA_PREJUIZO_FIXO] = tabela[COLUNA_PREJUIZO_FIXO] / ESCALAS_PREJUIZO[self.ponto_fixo]
+        return tabela.rename(columns={COLUNA_PREJUIZO_FIXO: 'prejuizo_milhoes'})
+    
+    def _calcular_resumo(self):
+        if self._lotes is not None:
+            resumo = self._lotes.resumo()
+            # Na carga inteira anexar_populacao acrescenta estas colunas à base
+            resumo['colunas'] += ['populacao', 'domicilios']
+            if self.ponto_fixo is not None:
+                resumo['colunas'].append(COLUNA_PREJUIZO_FIXO)
+                resumo['prejuizo_milhoes'] = (self._lotes.cubo[f'{COLUNA_PREJUIZO_FIXO}_soma'].sum()
+                                              / ESCALAS_PREJUIZO[self.ponto_fixo])
+            return resumo
+        df = self.df_geral
+        return {
+            'inicio': df['data'].min(),
+            'fim': df['data'].max(),
+            'registros': len(df),
+            'colunas': list(df.columns),
+            'cidades': df['cidade'].nunique(),
+            'regioes': list(df['regiao'].unique()),
+            'mortes': df['mortes'].sum(),
+            'feridos': df['feridos'].sum(),
+            'desalojados': df['desalojados'].sum(),
+            'prejuizo_milhoes': (df['prejuizo_milhoes'].sum() if self.ponto_fixo is None else
+                                 df[COLUNA_PREJUIZO_FIXO].sum() / ESCALAS_PREJUIZO[self.ponto_fixo]),
+            'altura_maxima': df['altura_rio_metros'].max(),
+            'chuva_maxima': df['chuva_24h_mm'].max(),
+        }
+    
+    def _calcular_anual(self):
+        df_anual = self._agrupar(['ano'], {
             'mortes': 'sum',
             'feridos': 'sum',
             'desalojados': 'sum',
@@ -82,18 +634,14 @@ class AnalisadorEnchentes:
         df_anual.columns = ['Ano', 'Mortes', 'Feridos', 'Desalojados', 'Prejuízo (R$ milhões)', 
                            'Altura Máxima (m)', 'Chuva Máxima (mm)']
         
-        print("\n📊 Evolução anual dos impactos:")
-        print(df_anual.to_string(index=False))
-        
-        return df_anual
+        # Per capita sobre a população total das cidades monitoradas
+        populacao = self.agregado('populacao_cidades')[['populacao', 'domicilios']].sum(min_count=1)
+        per_capita = impactos_per_capita(df_anual['Desalojados'], df_anual['Prejuízo (R$ milhões)'],
+                                         populacao['populacao'], populacao['domicilios'])
+        return pd.concat([df_anual, per_capita], axis=1)
     
-    def analise_regional(self):
-        """Análise por região"""
-        print("\n" + "="*60)
-        print("🗺️ ANÁLISE REGIONAL DOS IMPACTOS")
-        print("="*60)
-        
-        df_regional = self.df_geral.groupby('regiao').agg({
+    def _calcular_regional(self):
+        df_regional = self._agrupar(['regiao'], {
             'mortes': 'sum',
             'feridos': 'sum',
             'desalojados': 'sum',
@@ -105,69 +653,447 @@ class AnalisadorEnchentes:
         df_regional.columns = ['Mortes', 'Feridos', 'Desalojados', 'Prejuízo (R$ milhões)', 
                               'Altura Média (m)', 'Chuva Média (mm)']
         
-        print("\n📊 Impactos por região:")
-        print(df_regional.to_string())
-        
-        return df_regional
+        populacao = self.agregado('populacao_cidades').groupby('regiao')[['populacao', 'domicilios']].sum(min_count=1)
+        populacao = populacao.reindex(df_regional.index)
+        per_capita = impactos_per_capita(df_regional['Desalojados'], df_regional['Prejuízo (R$ milhões)'],
+                                         populacao['populacao'], populacao['domicilios'])
+        return pd.concat([df_regional, per_capita], axis=1)
     
-    def analise_cidades(self):
-        """Análise por cidade"""
-        print("\n" + "="*60)
-        print("🏙️ ANÁLISE POR CIDADE")
-        print("="*60)
-        
-        df_cidades = self.df_geral.groupby('cidade').agg({
+    def _calcular_cidades(self):
+        df_cidades = self._agrupar(['cidade'], {
             'mortes': 'sum',
             'feridos': 'sum',
             'desalojados': 'sum',
             'prejuizo_milhoes': 'sum',
             'altura_rio_metros': 'max',
-            'chuva_24h_mm': 'max'
-        }).sort_values('prejuizo_milhoes', ascending=False).round(2)
+            'chuva_24h_mm': 'max',
+            'populacao': 'first',
+            'domicilios': 'first'
+        }).round(2)
         
+        per_capita = impactos_per_capita(df_cidades['desalojados'], df_cidades['prejuizo_milhoes'],
+                                         df_cidades.pop('populacao'), df_cidades.pop('domicilios'))
         df_cidades.columns = ['Mortes', 'Feridos', 'Desalojados', 'Prejuízo (R$ milhões)', 
                              'Altura Máxima (m)', 'Chuva Máxima (mm)']
+        return pd.concat([df_cidades, per_capita], axis=1)
+    
+    def _calcular_crise_2024(self):
+        df_crise = self.df_2024.groupby('cidade', observed=True).agg({
+            'feridos': 'sum',
+            'desalojados': 'max',
+            'prejuizo_milhoes': 'max',
+            'altura_rio_metros': 'max',
+            'chuva_24h_mm': 'max',
+            'populacao': 'first',
+            'domicilios': 'first'
+        }).round(2)
+        
+        per_capita = impactos_per_capita(df_crise['desalojados'], df_crise['prejuizo_milhoes'],
+                                         df_crise.pop('populacao'), df_crise.pop('domicilios'))
+        df_crise.columns = ['Feridos', 'Desalojados Máximo', 'Prejuízo Máximo (R$ milhões)', 
+                           'Altura Máxima (m)', 'Chuva Máxima (mm)']
+        return pd.concat([df_crise, per_capita], axis=1)
+    
+    def _calcular_placar(self):
+        if self._lotes is not None:
+            return self._lotes.placar
+        return Placar(TAMANHO_PLACAR, METRICAS_PLACAR, self.ponto_fixo).adicionar_lote(self.df_geral)
+    
+    def _calcular_placar_2024(self):
+        return Placar(TAMANHO_PLACAR, METRICAS_PLACAR_2024, self.ponto_fixo).adicionar_lote(self.df_2024)
+    
+    def _calcular_episodios(self):
+        if self._lotes is not None:
+            return self._lotes.tabela_episodios()
+        return segmentar_episodios(self.df_geral, escala_prejuizo=self.ponto_fixo).drop(
+            columns=[COLUNA_PREJUIZO_FIXO], errors='ignore')
+    
+    def _calcular_episodios_2024(self):
+        # Na base detalhada, desalojados e prejuízo são acumulados dia a dia
+        return segmentar_episodios(self.df_2024, acumulados=True, escala_prejuizo=self.ponto_fixo).drop(
+            columns=[COLUNA_PREJUIZO_FIXO], errors='ignore')
+    
+    def _calcular_maximos_anuais(self):
+        return self._agrupar(['cidade', 'ano'], {coluna: 'max' for coluna in VARIAVEIS_EXTREMOS})
+    
+    def _calcular_populacao_cidades(self):
+        return self._agrupar(['cidade'], {
+            'regiao': 'first',
+            'populacao': 'first',
+            'domicilios': 'first'
+        })
+    
+    def _calcular_diario_2024(self):
+        return self._somar_prejuizo_exato(self.df_2024.groupby('data').agg, {
+            'mortes': 'sum',
+            'feridos': 'sum',
+            'desalojados': 'sum',
+            'prejuizo_milhoes': 'sum'
+        }).reset_index()
+    
+    def _calcular_mensal(self):
+        df_mensal = self._agrupar(['ano', 'mes'], {
+            'desalojados': 'sum',
+            'prejuizo_milhoes': 'sum',
+            'altura_rio_metros': 'mean',
+            'chuva_24h_mm': 'mean'
+        }).reset_index()
+        
+        df_mensal['data_completa'] = pd.to_datetime(pd.DataFrame({
+            'year': df_mensal['ano'], 'month': df_mensal['mes'], 'day': 1
+        }))
+        return df_mensal
+    
+    def _calcular_sazonal(self):
+        return self._agrupar(['mes'], {
+            'mortes': 'mean',
+            'feridos': 'mean',
+            'desalojados': 'mean',
+            'prejuizo_milhoes': 'mean',
+            'altura_rio_metros': 'mean'
+        }).reindex(range(1, 13))
+    
+    def _calcular_correlacao(self):
+        if self._lotes is not None:
+            return self._lotes.correlacao()
+        return self.df_geral[COLUNAS_NUMERICAS].corr()
+    
+    def _calcular_descricao(self):
+        if self._lotes is not None:
+            return self._lotes.descricao()
+        # A cópia inteira do prejuízo em ponto fixo não entra na descrição
+        return self.df_geral.drop(columns=[COLUNA_PREJUIZO_FIXO], errors='ignore').describe()
+    
+    def _calcular_amostra_dispersao(self):
+        colunas = ['altura_rio_metros', 'desalojados', 'prejuizo_milhoes']
+        if self._lotes is not None:
+            return self._lotes.amostra_dispersao(colunas)
+        df = self.df_geral[colunas]
+        if len(df) > TAMANHO_AMOSTRA_DISPERSAO:
+            df = df.sample(TAMANHO_AMOSTRA_DISPERSAO, random_state=0)
+        return df.reset_index(drop=True)
+    
+    # ------------------------------------------------------------------
+    # Análises
+    # ------------------------------------------------------------------
+    
+    def estatisticas_gerais(self):
+        """Exibe estatísticas gerais dos dados"""
+        resumo = self.agregado('resumo')
         
-        print("\n📊 Ranking de cidades por prejuízo:")
-        print(df_cidades.to_string())
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("📈 ESTATÍSTICAS GERAIS DAS ENCHENTES NO RS")
+        self.saida.escrever("="*60)
+        
+        self.saida.escrever(f"\n📅 Período analisado: {resumo['inicio'].strftime('%d/%m/%Y')} a {resumo['fim'].strftime('%d/%m/%Y')}")
+        self.saida.escrever(f"🏙️ Cidades monitoradas: {resumo['cidades']}")
+        self.saida.escrever(f"🗺️ Regiões: {', '.join(resumo['regioes'])}")
+        
+        self.saida.escrever(f"\n💀 Total de mortes: {resumo['mortes']}")
+        self.saida.escrever(f"🤕 Total de feridos: {resumo['feridos']}")
+        self.saida.escrever(f"🏠 Total de desalojados: {resumo['desalojados']:,}")
+        self.saida.escrever(f"💰 Prejuízo total: R$ {resumo['prejuizo_milhoes']:.1f} milhões")
+        
+        self.saida.escrever(f"\n🌊 Altura máxima do rio: {resumo['altura_maxima']:.1f}m")
+        self.saida.escrever(f"🌧️ Chuva máxima em 24h: {resumo['chuva_maxima']:.1f}mm")
+    
+    def niveis_retorno(self, coluna='altura_rio_metros', periodos=PERIODOS_RETORNO):
+        """Níveis de retorno por cidade (Gumbel/GEV sobre os máximos anuais) de chuva ou altura do rio"""
+        maximos = self.agregado('maximos_anuais')
+        with self._cronometrar(f'extremos:{coluna}'):
+            return niveis_retorno(maximos, coluna, periodos)
+    
+    def analise_extremos(self, n=10):
+        """Cheias e chuvas de 50 e 100 anos das cidades mais expostas"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🌊 PERÍODOS DE RETORNO (VALORES EXTREMOS)")
+        self.saida.escrever("="*60)
+        
+        tabelas = {}
+        for coluna, titulo in (('altura_rio_metros', 'Altura do rio (m)'), ('chuva_24h_mm', 'Chuva em 24h (mm)')):
+            tabela = self.niveis_retorno(coluna)
+            tabelas[coluna] = tabela
+            ajustadas = tabela[tabela['modelo'] != '-']
+            self.saida.escrever(f"\n📊 {titulo}: {len(ajustadas)} de {len(tabela)} cidades com anos suficientes "
+                                f"({', '.join(f'{m}: {q}' for m, q in ajustadas['modelo'].value_counts().items())})")
+            if not ajustadas.empty:
+                colunas = ['anos', 'modelo', 'maximo_observado', 'retorno_50_anos', 'retorno_100_anos']
+                self.saida.tabela(ajustadas.nlargest(n, 'retorno_100_anos')[colunas].round(2))
+        
+        return tabelas
+    
+    def analise_temporal(self):
+        """Análise temporal das enchentes"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("⏰ ANÁLISE TEMPORAL DAS ENCHENTES")
+        self.saida.escrever("="*60)
+        
+        df_anual = self.agregado('anual')
+        
+        self.saida.escrever("\n📊 Evolução anual dos impactos:")
+        self.saida.tabela(df_anual, index=False)
+        
+        return df_anual
+    
+    def analise_regional(self):
+        """Análise por região"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🗺️ ANÁLISE REGIONAL DOS IMPACTOS")
+        self.saida.escrever("="*60)
+        
+        df_regional = self.agregado('regional')
+        
+        self.saida.escrever("\n📊 Impactos por região:")
+        self.saida.tabela(df_regional)
+        
+        return df_regional
+    
+    def intervalos_confianca(self, por='regiao', metricas=COLUNAS_IMPACTO, estatistica='sum',
+                             n_reamostras=N_REAMOSTRAS, confianca=CONFIANCA, pares=None, semente=0, workers=None):
+        """
+        Intervalos bootstrap das métricas por região ou cidade e das diferenças entre
+        `pares` de grupos; retorna (intervalos, diferencas). O resultado não depende de
+        `workers` e fica no cache persistente.
+        """
+        def calcular():
+            self._garantir_dados()
+            if self.df_geral is None:
+                raise ValueError("O bootstrap reamostra registros: precisa da base geral carregada inteira")
+            with self._cronometrar(f'bootstrap:{por}'):
+                return intervalos_confianca(self.df_geral, por, metricas, estatistica, n_reamostras, confianca,
+                                            pares, semente, workers)
+        
+        parametros = dict(por=por, metricas=list(metricas), estatistica=estatistica, n_reamostras=n_reamostras,
+                          confianca=confianca, pares=pares, semente=semente)
+        return self.resultado_em_cache('intervalos_confianca', parametros, calcular)
+    
+    def analise_incerteza(self, pares=(('Metropolitana', 'Serra'),)):
+        """Intervalos de 95% para os totais por região e para as comparações entre regiões"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🎲 INCERTEZA DOS TOTAIS REGIONAIS (BOOTSTRAP)")
+        self.saida.escrever("="*60)
+        
+        regioes = set(self.agregado('regional').index)
+        pares = [par for par in pares if regioes.issuperset(par)]
+        try:
+            df_intervalos, df_diferencas = self.intervalos_confianca(pares=pares)
+        except ValueError as e:
+            self.saida.escrever(f"⚠️ Bootstrap indisponível: {e}")
+            return None
+        
+        self.saida.escrever(f"\n📊 Totais por região (IC {CONFIANCA:.0%}, {N_REAMOSTRAS:,} reamostras):")
+        self.saida.tabela(df_intervalos.round(2))
+        if not df_diferencas.empty:
+            self.saida.escrever("\n📊 Diferenças entre regiões:")
+            self.saida.tabela(df_diferencas.round(3))
+        
+        return df_intervalos, df_diferencas
+    
+    def simular_cenarios(self, n_simulacoes=N_SIMULACOES, quantil=0.0, correlacao=0.0, fator_chuva=1.0,
+                         acrescimo_rio=0.0, limiar_prejuizo=None, semente=0, workers=None):
+        """
+        Distribuição Monte Carlo de desalojados e prejuízo por cidade e região sob um
+        cenário de chuva e rio; retorna (por_cidade, por_regiao). O resultado não depende
+        de `workers` e fica no cache persistente.
+        """
+        def calcular():
+            self._garantir_dados()
+            if self.df_geral is None:
+                raise ValueError("A simulação sorteia registros históricos: precisa da base geral carregada inteira")
+            with self._cronometrar('simulacao'):
+                return simular_cenarios(self.df_geral, n_simulacoes, quantil, correlacao, fator_chuva,
+                                        acrescimo_rio, limiar_prejuizo, semente, workers)
+        
+        parametros = dict(n_simulacoes=n_simulacoes, quantil=quantil, correlacao=correlacao, fator_chuva=fator_chuva,
+                          acrescimo_rio=acrescimo_rio, limiar_prejuizo=limiar_prejuizo, semente=semente)
+        return self.resultado_em_cache('simular_cenarios', parametros, calcular)
+    
+    def analise_cenarios(self, n=10):
+        """Distribuição simulada dos danos no cenário de contingência, por região e nas cidades mais expostas"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🎲 CENÁRIOS DE DANOS (MONTE CARLO)")
+        self.saida.escrever("="*60)
+        
+        try:
+            por_cidade, por_regiao = self.simular_cenarios(**CENARIO_CONTINGENCIA)
+        except ValueError as e:
+            self.saida.escrever(f"⚠️ Simulação indisponível: {e}")
+            return None
+        
+        self.saida.escrever(f"\n📊 Totais por região em {N_SIMULACOES:,} cenários (10% dos dias mais chuvosos):")
+        self.saida.tabela(por_regiao.round(2))
+        self.saida.escrever("\n🏙️ Cidades com maior prejuízo no cenário extremo (p99):")
+        self.saida.tabela(por_cidade.nlargest(n, 'prejuizo_milhoes_p99').round(2))
+        
+        return por_cidade, por_regiao
+    
+    def ranking_cidades(self, ordenar_por='Prejuízo (R$ milhões)', n=None, crise=False):
+        """
+        As `n` cidades mais atingidas por `ordenar_por` (todas, se n=None). Para n até
+        TAMANHO_PLACAR, colunas com placar top-K são lidas do placar sem ordenar a
+        tabela; as demais usam nlargest. Empates ficam em ordem alfabética, como no placar.
+        """
+        tabela = self.agregado('crise_2024' if crise else 'cidades')
+        metrica = (COLUNAS_RANKING_2024 if crise else COLUNAS_RANKING).get(ordenar_por)
+        if metrica is not None and n is not None and n <= TAMANHO_PLACAR:
+            placar = self.agregado('placar_2024' if crise else 'placar')
+            return tabela.loc[placar.cidades(metrica, n)]
+        if n is None:
+            return tabela.sort_index().sort_values(ordenar_por, ascending=False, kind='stable')
+        return tabela.nlargest(n, ordenar_por)
+    
+    def _exibir_ranking(self, tabela, ordenar_por, crise=False):
+        """
+        Exibe o ranking completo `tabela`; nos modos de saída limitados só as linhas
+        visíveis, lidas do placar em vez da tabela ordenada
+        """
+        limite = self.saida.limite_linhas()
+        if limite is None or limite >= len(tabela):
+            self.saida.tabela(tabela)
+        else:
+            self.saida.tabela(self.ranking_cidades(ordenar_por, limite, crise), total=len(tabela))
+    
+    def analise_cidades(self, ordenar_por='Prejuízo (R$ milhões)', n=None):
+        """
+        Cidades ordenadas por `ordenar_por` (ex.: 'Prejuízo per capita (R$)' para o ranking
+        relativo): todas, ou só as `n` mais atingidas
+        """
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🏙️ ANÁLISE POR CIDADE")
+        self.saida.escrever("="*60)
+        
+        df_cidades = self.ranking_cidades(ordenar_por, n)
+        
+        self.saida.escrever(f"\n📊 Ranking de cidades por {ordenar_por}:")
+        self._exibir_ranking(df_cidades, ordenar_por)
         
         return df_cidades
     
     def analise_enchente_2024(self):
         """Análise específica da enchente de 2024"""
-        print("\n" + "="*60)
-        print("🚨 ANÁLISE DA ENCHENTE DE 2024")
-        print("="*60)
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🚨 ANÁLISE DA ENCHENTE DE 2024")
+        self.saida.escrever("="*60)
         
+        self._garantir_dados()
         if self.df_2024 is not None:
-            print(f"\n📅 Período da crise: {self.df_2024['data'].min().strftime('%d/%m/%Y')} a {self.df_2024['data'].max().strftime('%d/%m/%Y')}")
+            self.saida.escrever(f"\n📅 Período da crise: {self.df_2024['data'].min().strftime('%d/%m/%Y')} a {self.df_2024['data'].max().strftime('%d/%m/%Y')}")
             
             # Estatísticas por cidade
-            df_crise = self.df_2024.groupby('cidade').agg({
-                'feridos': 'sum',
-                'desalojados': 'max',
-                'prejuizo_milhoes': 'max',
-                'altura_rio_metros': 'max',
-                'chuva_24h_mm': 'max'
-            }).sort_values('desalojados', ascending=False).round(2)
-            
-            df_crise.columns = ['Feridos', 'Desalojados Máximo', 'Prejuízo Máximo (R$ milhões)', 
-                               'Altura Máxima (m)', 'Chuva Máxima (mm)']
+            df_crise = self.ranking_cidades('Desalojados Máximo', crise=True)
             
-            print("\n📊 Impactos por cidade durante a crise:")
-            print(df_crise.to_string())
+            self.saida.escrever("\n📊 Impactos por cidade durante a crise:")
+            self._exibir_ranking(df_crise, 'Desalojados Máximo', crise=True)
             
             return df_crise
         else:
-            print("❌ Dataset de 2024 não disponível")
+            self.saida.escrever("❌ Dataset de 2024 não disponível")
             return None
     
+    def analise_episodios(self):
+        """Episódios de cheia por cidade (registros contíguos acima do limiar do rio)"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🌊 EPISÓDIOS DE CHEIA POR CIDADE")
+        self.saida.escrever("="*60)
+        
+        self._garantir_dados()
+        df_episodios = self.agregado('episodios')
+        self.saida.escrever(f"\n📊 Episódios no histórico: {len(df_episodios)}")
+        
+        if self.df_2024 is not None:
+            df_episodios_2024 = self.agregado('episodios_2024')
+            self.saida.escrever("\n📊 Episódios da crise de 2024:")
+            self.saida.tabela(df_episodios_2024)
+        
+        return df_episodios
+    
+    def defasagens(self, crise=False, defasagem_maxima=DEFASAGEM_MAXIMA, minimo_pares=MINIMO_PARES):
+        """
+        Defasagem em dias entre a chuva e o pico do rio de cada cidade (correlação cruzada
+        por FFT), no histórico ou na crise de 2024; retorna (tabela, correlações por defasagem)
+        """
+        def calcular():
+            self._garantir_dados()
+            df = self.df_2024 if crise else self.df_geral
+            if df is None:
+                raise ValueError("Base de 2024 indisponível" if crise else
+                                 "A defasagem usa as séries diárias: precisa da base geral carregada inteira")
+            with self._cronometrar('defasagem:2024' if crise else 'defasagem'):
+                return defasagens(df, defasagem_maxima, minimo_pares)
+        
+        parametros = dict(crise=crise, defasagem_maxima=defasagem_maxima, minimo_pares=minimo_pares)
+        return self.resultado_em_cache('defasagens', parametros, calcular)
+    
+    def analise_defasagem(self, n=10):
+        """Quantos dias depois da chuva forte o rio atinge o pico, por cidade"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("🌧️ DEFASAGEM ENTRE CHUVA E CHEIA")
+        self.saida.escrever("="*60)
+        
+        # A crise de 2024 tem poucos dias por cidade: defasagens e mínimo de pares menores
+        resultados = {}
+        for crise, titulo, argumentos in ((False, 'Histórico', ()), (True, 'Crise de 2024', (3, 5))):
+            try:
+                tabela, _ = self.defasagens(crise, *argumentos)
+            except ValueError as e:
+                self.saida.escrever(f"\n⚠️ {titulo}: defasagem indisponível ({e})")
+                continue
+            calculadas = tabela.dropna(subset=['correlacao_maxima'])
+            resultados[titulo] = tabela
+            self.saida.escrever(f"\n📊 {titulo}: {len(calculadas)} de {len(tabela)} cidades com pares de dias suficientes")
+            if not calculadas.empty:
+                moda = calculadas['melhor_defasagem_dias'].mode().iloc[0]
+                self.saida.escrever(f"⏱️ Defasagem mais comum: {moda} dia(s) entre a chuva e o pico do rio")
+                self.saida.tabela(calculadas.nlargest(n, 'correlacao_maxima').round(3))
+        
+        return resultados
+    
+    def previsao_rio(self, horizonte=HORIZONTE, crise=True, chuva_prevista=None):
+        """
+        Altura do rio prevista de 1 a `horizonte` dias para cada cidade por um ARX com a
+        chuva como entrada, ajustado em lote na crise de 2024 (ou no histórico geral)
+        """
+        def calcular():
+            self._garantir_dados()
+            df = self.df_2024 if crise else self.df_geral
+            if df is None:
+                raise ValueError("Base de 2024 indisponível" if crise else
+                                 "A previsão usa as séries diárias: precisa da base geral carregada inteira")
+            with self._cronometrar('previsao_rio:2024' if crise else 'previsao_rio'):
+                return ModeloNivelRio().ajustar(df).prever(horizonte, chuva_prevista)
+        
+        parametros = dict(horizonte=horizonte, crise=crise, chuva_prevista=chuva_prevista)
+        return self.resultado_em_cache('previsao_rio', parametros, calcular)
+    
+    def analise_previsao(self, n=10):
+        """Previsão de curto prazo da altura do rio nas cidades com maior nível esperado"""
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever(f"🔮 PREVISÃO DA ALTURA DO RIO ({HORIZONTE} DIAS)")
+        self.saida.escrever("="*60)
+        
+        try:
+            tabela = self.previsao_rio()
+        except ValueError as e:
+            self.saida.escrever(f"⚠️ Previsão indisponível: {e}")
+            return None
+        
+        coluna = f'previsao_{HORIZONTE}d'
+        subindo = (tabela[coluna] > tabela['nivel_atual']).sum()
+        self.saida.escrever(f"\n📊 {len(tabela)} cidades; rio subindo em {subindo} "
+                            f"(modelos: {tabela['modelo'].value_counts().to_dict()})")
+        self.saida.escrever("📈 Mantida a chuva do último dia de cada cidade:")
+        self.saida.tabela(tabela.nlargest(n, coluna).round(2))
+        
+        return tabela
+    
     def criar_graficos(self):
         """Cria gráficos de análise"""
         print("\n" + "="*60)
         print("📊 GERANDO GRÁFICOS DE ANÁLISE")
         print("="*60)
         
+        self._garantir_dados()
+        
         # 1. Evolução temporal dos impactos
         self.grafico_evolucao_temporal()
         
@@ -183,8 +1109,18 @@ class AnalisadorEnchentes:
         # 5. Enchente de 2024 (se disponível)
         if self.df_2024 is not None:
             self.grafico_enchente_2024()
+            self.grafico_mapa_calor()
         
-        print("\n✅ Gráficos gerados e salvos na pasta 'outputs/'")
+        print(f"\n✅ Gráficos gerados e salvos na pasta '{self.pasta_saida}/'")
+    
+    def _finalizar_figura(self, nome_arquivo):
+        """Salva a figura atual na pasta de saída e a exibe (ou fecha, no modo sem interface)"""
+        os.makedirs(self.pasta_saida, exist_ok=True)
+        plt.savefig(os.path.join(self.pasta_saida, nome_arquivo), dpi=300, bbox_inches='tight')
+        if self.exibir_graficos:
+            plt.show()
+        else:
+            plt.close()
     
     def grafico_evolucao_temporal(self):
         """Gráfico de evolução temporal dos impactos"""
@@ -192,14 +1128,7 @@ class AnalisadorEnchentes:
         fig.suptitle('Evolução Temporal dos Impactos das Enchentes no RS (2020-2024)', fontsize=16, fontweight='bold')
         
         # Agrupamento por mês
-        df_mensal = self.df_geral.groupby([self.df_geral['data'].dt.year, self.df_geral['data'].dt.month]).agg({
-            'desalojados': 'sum',
-            'prejuizo_milhoes': 'sum',
-            'altura_rio_metros': 'mean',
-            'chuva_24h_mm': 'mean'
-        }).reset_index()
-        
-        df_mensal['data_completa'] = pd.to_datetime(df_mensal[['data_0', 'data_1']].assign(day=1))
+        df_mensal = self.agregado('mensal')
         
         # Desalojados
         axes[0,0].plot(df_mensal['data_completa'], df_mensal['desalojados'], marker='o', linewidth=2)
@@ -226,52 +1155,40 @@ class AnalisadorEnchentes:
         axes[1,1].tick_params(axis='x', rotation=45)
         
         plt.tight_layout()
-        plt.savefig('outputs/evolucao_temporal.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._finalizar_figura('evolucao_temporal.png')
     
     def grafico_comparacao_regional(self):
         """Gráfico de comparação regional"""
-        df_regional = self.df_geral.groupby('regiao').agg({
-            'desalojados': 'sum',
-            'prejuizo_milhoes': 'sum',
-            'feridos': 'sum'
-        }).reset_index()
+        df_regional = self.agregado('regional').reset_index()
         
         fig, axes = plt.subplots(1, 3, figsize=(18, 6))
         fig.suptitle('Comparação Regional dos Impactos das Enchentes no RS', fontsize=16, fontweight='bold')
         
         # Desalojados
-        axes[0].bar(df_regional['regiao'], df_regional['desalojados'], color=['#FF6B6B', '#4ECDC4'])
+        axes[0].bar(df_regional['regiao'], df_regional['Desalojados'], color=['#FF6B6B', '#4ECDC4'])
         axes[0].set_title('Total de Desalojados por Região')
         axes[0].set_ylabel('Número de Desalojados')
         axes[0].tick_params(axis='x', rotation=45)
         
         # Prejuízos
-        axes[1].bar(df_regional['regiao'], df_regional['prejuizo_milhoes'], color=['#45B7D1', '#96CEB4'])
+        axes[1].bar(df_regional['regiao'], df_regional['Prejuízo (R$ milhões)'], color=['#45B7D1', '#96CEB4'])
         axes[1].set_title('Total de Prejuízos por Região')
         axes[1].set_ylabel('Prejuízo (R$ milhões)')
         axes[1].tick_params(axis='x', rotation=45)
         
         # Feridos
-        axes[2].bar(df_regional['regiao'], df_regional['feridos'], color=['#FFEAA7', '#DDA0DD'])
+        axes[2].bar(df_regional['regiao'], df_regional['Feridos'], color=['#FFEAA7', '#DDA0DD'])
         axes[2].set_title('Total de Feridos por Região')
         axes[2].set_ylabel('Número de Feridos')
         axes[2].tick_params(axis='x', rotation=45)
         
         plt.tight_layout()
-        plt.savefig('outputs/comparacao_regional.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._finalizar_figura('comparacao_regional.png')
     
     def grafico_analise_sazonal(self):
         """Gráfico de análise sazonal"""
-        df_sazonal = self.df_geral.groupby(self.df_geral['data'].dt.month).agg({
-            'desalojados': 'mean',
-            'prejuizo_milhoes': 'mean',
-            'altura_rio_metros': 'mean'
-        }).reset_index()
-        
-        meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
-                'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+        df_sazonal = self.agregado('sazonal').fillna(0)
+        meses = MESES
         
         fig, axes = plt.subplots(1, 3, figsize=(18, 6))
         fig.suptitle('Análise Sazonal das Enchentes no RS', fontsize=16, fontweight='bold')
@@ -298,27 +1215,22 @@ class AnalisadorEnchentes:
         axes[2].set_xticklabels(meses, rotation=45)
         
         plt.tight_layout()
-        plt.savefig('outputs/analise_sazonal.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._finalizar_figura('analise_sazonal.png')
     
     def grafico_correlacao(self):
         """Gráfico de correlação entre variáveis"""
-        # Selecionar apenas colunas numéricas
-        colunas_numericas = ['mortes', 'feridos', 'desalojados', 'prejuizo_milhoes', 
-                             'altura_rio_metros', 'chuva_24h_mm']
-        
-        df_corr = self.df_geral[colunas_numericas].corr()
+        df_corr = self.agregado('correlacao')
         
         plt.figure(figsize=(10, 8))
         sns.heatmap(df_corr, annot=True, cmap='coolwarm', center=0, 
                     square=True, linewidths=0.5, cbar_kws={'shrink': 0.8})
         plt.title('Matriz de Correlação entre Variáveis das Enchentes', fontsize=16, fontweight='bold')
         plt.tight_layout()
-        plt.savefig('outputs/correlacao.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._finalizar_figura('correlacao.png')
     
     def grafico_enchente_2024(self):
         """Gráfico específico da enchente de 2024"""
+        self._garantir_dados()
         if self.df_2024 is None:
             return
         
@@ -366,62 +1278,93 @@ class AnalisadorEnchentes:
         axes[1,1].tick_params(axis='x', rotation=45)
         
         plt.tight_layout()
-        plt.savefig('outputs/enchente_2024.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._finalizar_figura('enchente_2024.png')
+    
+    def grafico_mapa_calor(self, crise=True, inicio=None, fim=None):
+        """
+        Mapa de calor cidade × dia de rio, chuva e desalojados (crise de 2024 ou base geral,
+        opcionalmente entre `inicio` e `fim`), uma imagem por painel em vez de uma linha por cidade
+        """
+        self._garantir_dados()
+        df = self.df_2024 if crise else self.df_geral
+        if df is None:
+            return
+        
+        with self._cronometrar('mapa_calor:2024' if crise else 'mapa_calor'):
+            cidades, dias, matrizes = matrizes_periodo(df, inicio, fim)
+        fig = plt.figure(figsize=TAMANHO_MAPA_CALOR)
+        titulo = 'Enchente de 2024 por Cidade e Dia' if crise else 'Impactos por Cidade e Dia'
+        desenhar_mapa_calor(fig, cidades, dias, matrizes, titulo)
+        self._finalizar_figura('mapa_calor_2024.png' if crise else 'mapa_calor.png')
+    
+    def graficos_cidades(self, crise=False, max_workers=None):
+        """
+        Um gráfico de evolução (chuva, rio, desalojados) por município em
+        <pasta_saida>/cidades/, renderizado em lote por processos com figura reaproveitada
+        """
+        self._garantir_dados()
+        df = self.df_2024 if crise else self.df_geral
+        if df is None:
+            self.saida.escrever("\n⚠️ Gráficos por município indisponíveis: "
+                                + ("base de 2024 ausente" if crise else "precisam da base geral carregada inteira"))
+            return None
+        pasta = os.path.join(self.pasta_saida, PASTA_GRAFICOS_CIDADES, '2024' if crise else '')
+        with self._cronometrar('graficos_cidades:2024' if crise else 'graficos_cidades'):
+            total, duracao, vazao = renderizar_cidades(series_por_cidade(df), pasta, max_workers)
+        self.saida.escrever(f"\n🖼️ {total} gráficos por município em {duracao:.1f}s "
+                            f"({vazao:.1f} gráficos/s) → '{pasta}'")
+        return total
     
     def gerar_relatorio(self):
         """Gera relatório completo em texto"""
-        print("\n" + "="*60)
-        print("📋 GERANDO RELATÓRIO COMPLETO")
-        print("="*60)
+        self.saida.escrever("\n" + "="*60)
+        self.saida.escrever("📋 GERANDO RELATÓRIO COMPLETO")
+        self.saida.escrever("="*60)
         
         # Criar pasta outputs se não existir
-        import os
-        os.makedirs('outputs', exist_ok=True)
+        os.makedirs(self.pasta_saida, exist_ok=True)
+        caminho_relatorio = os.path.join(self.pasta_saida, 'relatorio_enchentes.txt')
+        resumo = self.agregado('resumo')
+        self._garantir_dados()
         
-        with open('outputs/relatorio_enchentes.txt', 'w', encoding='utf-8') as f:
+        with open(caminho_relatorio, 'w', encoding='utf-8') as f:
             f.write("RELATÓRIO DE ANÁLISE DAS ENCHENTES NO RIO GRANDE DO SUL\n")
             f.write("="*60 + "\n\n")
             
             f.write("1. RESUMO EXECUTIVO\n")
             f.write("-" * 30 + "\n")
-            f.write(f"Período analisado: {self.df_geral['data'].min().strftime('%d/%m/%Y')} a {self.df_geral['data'].max().strftime('%d/%m/%Y')}\n")
-            f.write(f"Total de registros: {len(self.df_geral)}\n")
-            f.write(f"Cidades monitoradas: {self.df_geral['cidade'].nunique()}\n")
-            f.write(f"Regiões: {', '.join(self.df_geral['regiao'].unique())}\n\n")
+            f.write(f"Período analisado: {resumo['inicio'].strftime('%d/%m/%Y')} a {resumo['fim'].strftime('%d/%m/%Y')}\n")
+            f.write(f"Total de registros: {resumo['registros']}\n")
+            f.write(f"Cidades monitoradas: {resumo['cidades']}\n")
+            f.write(f"Regiões: {', '.join(resumo['regioes'])}\n\n")
             
             f.write("2. IMPACTOS TOTAIS\n")
             f.write("-" * 30 + "\n")
-            f.write(f"Mortes: {self.df_geral['mortes'].sum()}\n")
-            f.write(f"Feridos: {self.df_geral['feridos'].sum()}\n")
-            f.write(f"Desalojados: {self.df_geral['desalojados'].sum():,}\n")
-            f.write(f"Prejuízo total: R$ {self.df_geral['prejuizo_milhoes'].sum():.1f} milhões\n\n")
+            f.write(f"Mortes: {resumo['mortes']}\n")
+            f.write(f"Feridos: {resumo['feridos']}\n")
+            f.write(f"Desalojados: {resumo['desalojados']:,}\n")
+            f.write(f"Prejuízo total: R$ {resumo['prejuizo_milhoes']:.1f} milhões\n\n")
             
             f.write("3. ANÁLISE TEMPORAL\n")
             f.write("-" * 30 + "\n")
-            df_anual = self.analise_temporal()
-            f.write(df_anual.to_string())
-            f.write("\n\n")
+            escrever_tabela(self.agregado('anual'), f, index=False)
+            f.write("\n")
             
             f.write("4. ANÁLISE REGIONAL\n")
             f.write("-" * 30 + "\n")
-            df_regional = self.analise_regional()
-            f.write(df_regional.to_string())
-            f.write("\n\n")
+            escrever_tabela(self.agregado('regional'), f)
+            f.write("\n")
             
             f.write("5. ANÁLISE POR CIDADE\n")
             f.write("-" * 30 + "\n")
-            df_cidades = self.analise_cidades()
-            f.write(df_cidades.to_string())
-            f.write("\n\n")
+            escrever_tabela(self.ranking_cidades(n=None), f)
+            f.write("\n")
             
             if self.df_2024 is not None:
                 f.write("6. ANÁLISE DA ENCHENTE DE 2024\n")
                 f.write("-" * 30 + "\n")
-                df_crise = self.analise_enchente_2024()
-                if df_crise is not None:
-                    f.write(df_crise.to_string())
-                f.write("\n\n")
+                escrever_tabela(self.ranking_cidades('Desalojados Máximo', n=None, crise=True), f)
+                f.write("\n")
             
             f.write("7. RECOMENDAÇÕES\n")
             f.write("-" * 30 + "\n")
@@ -431,39 +1374,103 @@ class AnalisadorEnchentes:
             f.write("- Investir em monitoramento hidrológico\n")
             f.write("- Capacitar equipes de resposta a emergências\n")
         
-        print("✅ Relatório salvo em 'outputs/relatorio_enchentes.txt'")
+        self.saida.escrever(f"✅ Relatório salvo em '{caminho_relatorio}'")
     
-    def executar_analise_completa(self):
-        """Executa análise completa"""
+    def etapas(self, processos=False):
+        """Etapas da análise completa, ligadas a este analisador ou a cópias em outros processos"""
+        etapas = []
+        for nome, entradas, saidas, metodo, argumentos, principal in ETAPAS_ANALISE:
+            if processos:
+                executar = partial(_executar_em_processo, self._configuracao, metodo, argumentos)
+            else:
+                executar = partial(getattr(self, metodo), *argumentos)
+            etapas.append(Etapa(nome, entradas, saidas, executar, principal))
+        return etapas
+    
+    def executar_etapas(self, alvos=None, max_workers=1, processos=False):
+        """
+        Executa as etapas `alvos` e apenas as de que elas dependem (todas, se None).
+        Com max_workers > 1 etapas independentes rodam em paralelo; gráficos ficam na
+        thread principal (pyplot), ou em processos próprios com processos=True.
+        """
+        resultados = Pipeline(self.etapas(processos)).executar(alvos, max_workers, processos)
+        with self._lock:
+            for nome, resultado in resultados.items():
+                self.tempos[f'etapa:{nome}'] = resultado['segundos']
+        return resultados
+    
+    def executar_analise_completa(self, alvos=None, max_workers=1, processos=False):
+        """Executa análise completa (ou só as etapas `alvos` e suas dependências)"""
         print("🚀 INICIANDO ANÁLISE COMPLETA DAS ENCHENTES NO RS")
         print("="*60)
         
-        # Estatísticas gerais
-        self.estatisticas_gerais()
-        
-        # Análises específicas
-        self.analise_temporal()
-        self.analise_regional()
-        self.analise_cidades()
-        self.analise_enchente_2024()
-        
-        # Gráficos
-        self.criar_graficos()
-        
-        # Relatório
-        self.gerar_relatorio()
+        self.executar_etapas(alvos, max_workers, processos)
         
         print("\n🎉 ANÁLISE COMPLETA FINALIZADA!")
-        print("📁 Verifique a pasta 'outputs/' para gráficos e relatórios")
+        print(f"📁 Verifique a pasta '{self.pasta_saida}/' para gráficos e relatórios")
+        self.relatorio_tempos()
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description='Análise de impactos das enchentes do RS')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--anos', type=int, nargs='+', help='analisa apenas estes anos')
+    parser.add_argument('--regioes', nargs='+', help='analisa apenas estas regiões')
+    parser.add_argument('--cidades', nargs='+', help='analisa apenas estas cidades')
+    parser.add_argument('--inicio', help='analisa apenas registros a partir desta data (AAAA-MM-DD)')
+    parser.add_argument('--fim', help='analisa apenas registros até esta data (AAAA-MM-DD)')
+    parser.add_argument('--minimo', nargs='+', default=[], metavar='COLUNA=VALOR',
+                        help='analisa apenas registros com a coluna numérica a partir do valor')
+    parser.add_argument('--maximo', nargs='+', default=[], metavar='COLUNA=VALOR',
+                        help='analisa apenas registros com a coluna numérica até o valor')
+    parser.add_argument('--motor', choices=MOTORES_LEITURA, help='lê os CSVs com os tipos do esquema usando este motor')
+    parser.add_argument('--ponto-fixo', choices=list(ESCALAS_PREJUIZO),
+                        help='soma o prejuízo em inteiros (milhares de reais ou centavos): totais idênticos '
+                             'em qualquer ordem de leitura')
+    parser.add_argument('--sem-cache', action='store_true', help='não usa o cache persistente de resultados')
+    parser.add_argument('--cache-limite-mb', type=float, default=LIMITE_CACHE_BYTES / 2**20,
+                        help='tamanho máximo do cache persistente em MB')
+    parser.add_argument('--etapas', nargs='+', choices=[etapa[0] for etapa in ETAPAS_ANALISE], metavar='ETAPA',
+                        help='executa só estas etapas e suas dependências (ver --listar-etapas)')
+    parser.add_argument('--workers', type=int, default=1, help='etapas independentes executadas ao mesmo tempo')
+    parser.add_argument('--processos', action='store_true', help='usa processos em vez de threads para as etapas')
+    parser.add_argument('--listar-etapas', action='store_true', help='mostra as etapas e suas dependências')
+    parser.add_argument('--modo-saida', choices=MODOS_SAIDA, default='completo',
+                        help='como exibir as tabelas: completas, primeiras N linhas, paginadas, em fluxo ou nada')
+    parser.add_argument('--linhas', type=int, default=20, help='linhas por tabela (topo) ou por página (paginado)')
+    parser.add_argument('--pagina', type=int, default=1, help='página exibida no modo paginado')
+    parser.add_argument('--max-memoria', '--max-memory', dest='max_memoria', type=interpretar_tamanho,
+                        help='orçamento de memória (ex.: 512M, 2G): acima dele a base geral é lida em lotes')
+    parser.add_argument('--observar', action='store_true',
+                        help='após a análise, refaz só o que depende dos arquivos alterados em --dados')
+    parser.add_argument('--intervalo', type=float, default=INTERVALO_SEGUNDOS,
+                        help='segundos entre verificações no modo --observar')
+    args = parser.parse_args()
+    
+    if args.listar_etapas:
+        print("🧩 ETAPAS DA ANÁLISE (etapa ← dependências)")
+        Pipeline([Etapa(nome, entradas, saidas, None) for nome, entradas, saidas, *_ in ETAPAS_ANALISE]).descrever()
+        return
+    
     try:
+        cache = False if args.sem_cache else CacheResultados(os.path.join('outputs', 'cache'),
+                                                             int(args.cache_limite_mb * 2**20))
+        
         # Criar instância do analisador
-        analisador = AnalisadorEnchentes()
+        analisador = AnalisadorEnchentes(pasta_dados=args.dados, anos=args.anos, regioes=args.regioes,
+                                         cidades=args.cidades, inicio=args.inicio, fim=args.fim,
+                                         limites=limites_por_coluna(args.minimo, args.maximo),
+                                         motor_leitura=args.motor, cache=cache, carregar=False,
+                                         exibir_graficos=not args.observar,
+                                         saida=FormatoSaida(args.modo_saida, args.linhas, args.pagina),
+                                         max_memoria=args.max_memoria, ponto_fixo=args.ponto_fixo)
         
         # Executar análise completa
-        analisador.executar_analise_completa()
+        analisador.executar_analise_completa(args.etapas, args.workers, args.processos)
+        
+        # Atualizações rodam em threads: processos filhos guardariam agregados da versão anterior
+        if args.observar:
+            MonitorDados(analisador, args.intervalo, args.workers).observar()
         
     except Exception as e:
         print(f"❌ Erro durante a execução: {e}")
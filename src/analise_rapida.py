@@ -5,44 +5,70 @@ Análise Rápida das Enchentes no Rio Grande do Sul
 Script simples para verificação inicial dos dados
 """
 
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
 
-def analise_rapida():
-    """Executa análise rápida dos dados"""
+if not __package__:
+    # Executado como script (python src/analise_rapida.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+from .cache import CacheResultados, impressao_digital
+
+ARQUIVO_DADOS = 'data/enchentes_rs.csv'
+
+def resumir(caminho=ARQUIVO_DADOS):
+    """Totais e impactos por região do dataset principal"""
+    df = pd.read_csv(caminho)
+    df['data'] = pd.to_datetime(df['data'])
+    return {
+        'registros': len(df),
+        'inicio': df['data'].min(),
+        'fim': df['data'].max(),
+        'cidades': df['cidade'].nunique(),
+        'regioes': list(df['regiao'].unique()),
+        'totais': df[['mortes', 'feridos', 'desalojados', 'prejuizo_milhoes']].sum(),
+        'regional': df.groupby('regiao').agg({
+            'desalojados': 'sum',
+            'prejuizo_milhoes': 'sum'
+        }).round(2),
+    }
+
+def analise_rapida(cache=None):
+    """Executa análise rápida dos dados (reaproveita o resumo do cache enquanto o CSV não muda)"""
     print("🚀 ANÁLISE RÁPIDA DAS ENCHENTES NO RS")
     print("=" * 50)
     
     try:
         # Carregar dados
-        df = pd.read_csv('data/enchentes_rs.csv')
-        df['data'] = pd.to_datetime(df['data'])
+        cache = cache or CacheResultados()
+        resumo = cache.em_cache(impressao_digital([ARQUIVO_DADOS]), 'analise_rapida', None, resumir)
+        totais = resumo['totais']
+        df_regional = resumo['regional']
         
-        print(f"✅ Dados carregados: {len(df)} registros")
-        print(f"📅 Período: {df['data'].min().strftime('%d/%m/%Y')} a {df['data'].max().strftime('%d/%Y')}")
-        print(f"🏙️ Cidades: {df['cidade'].nunique()}")
-        print(f"🗺️ Regiões: {', '.join(df['regiao'].unique())}")
+        print(f"✅ Dados carregados: {resumo['registros']} registros")
+        print(f"📅 Período: {resumo['inicio'].strftime('%d/%m/%Y')} a {resumo['fim'].strftime('%d/%m/%Y')}")
+        print(f"🏙️ Cidades: {resumo['cidades']}")
+        print(f"🗺️ Regiões: {', '.join(resumo['regioes'])}")
         
         # Estatísticas básicas
         print(f"\n📊 IMPACTOS TOTAIS:")
-        print(f"   • Mortes: {df['mortes'].sum()}")
-        print(f"   • Feridos: {df['feridos'].sum()}")
-        print(f"   • Desalojados: {df['desalojados'].sum():,}")
-        print(f"   • Prejuízo: R$ {df['prejuizo_milhoes'].sum():.1f} milhões")
+        print(f"   • Mortes: {totais['mortes']}")
+        print(f"   • Feridos: {totais['feridos']}")
+        print(f"   • Desalojados: {totais['desalojados']:,}")
+        print(f"   • Prejuízo: R$ {totais['prejuizo_milhoes']:.1f} milhões")
         
         # Análise por região
         print(f"\n🗺️ IMPACTOS POR REGIÃO:")
-        df_regional = df.groupby('regiao').agg({
-            'desalojados': 'sum',
-            'prejuizo_milhoes': 'sum'
-        }).round(2)
-        
         for regiao, dados in df_regional.iterrows():
             print(f"   • {regiao}: {dados['desalojados']:,.0f} desalojados, R$ {dados['prejuizo_milhoes']:.1f}M")
         
         # Gráfico simples
         plt.figure(figsize=(10, 6))
-        df.groupby('regiao')['desalojados'].sum().plot(kind='bar', color=['#FF6B6B', '#4ECDC4'])
+        df_regional['desalojados'].plot(kind='bar', color=['#FF6B6B', '#4ECDC4'])
         plt.title('Total de Desalojados por Região')
         plt.ylabel('Número de Desalojados')
         plt.xticks(rotation=45)
@@ -54,5 +80,9 @@ def analise_rapida():
     except Exception as e:
         print(f"❌ Erro: {e}")
 
-if __name__ == "__main__":
+def main():
+    """Função principal"""
     analise_rapida()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Intervalos de Confiança por Bootstrap
+Reamostragem estratificada (cada região ou cidade reamostrada dentro de si) das
+métricas de impacto, com intervalos percentis por grupo e para diferenças entre
+grupos. As reamostras são matrizes de índices geradas em blocos — ou contagens
+multinomiais sobre os valores distintos, quando eles se repetem muito — e são
+distribuídas por um pool de processos, com sementes que não dependem do número
+de processos.
+"""
+
+import os
+import sys
+import time
+import argparse
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+if not __package__:
+    # Executado como script (python src/bootstrap.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+N_REAMOSTRAS = 10_000
+CONFIANCA = 0.95
+ESTATISTICAS = ('mean', 'sum')
+
+# Reamostras por tarefa do pool (cada tarefa tem sua própria semente)
+REAMOSTRAS_POR_TAREFA = 2_500
+
+# Elementos por bloco de reamostras (matriz de índices de ~32 MB)
+ELEMENTOS_POR_BLOCO = 4_000_000
+
+# Com até esta fração de valores distintos, a reamostra sorteia contagens por valor
+FRACAO_DISTINTOS = 0.25
+
+# Diferenças entre todos os pares só até este número de grupos
+MAXIMO_GRUPOS_PARES = 10
+
+COLUNAS_INTERVALOS = ['estimativa', 'ic_inferior', 'ic_superior', 'erro_padrao', 'registros']
+COLUNAS_DIFERENCAS = ['estimativa', 'ic_inferior', 'ic_superior', 'prob_positiva', 'significativa']
+
+# Amostras do processo trabalhador (recebidas uma vez, no initializer do pool)
+_AMOSTRAS = {}
+
+def _preparar(valores):
+    """('contagens', distintos, contagens) se os valores se repetem muito; senão ('indices', valores, None)"""
+    valores = valores[~np.isnan(valores)]
+    distintos, contagens = np.unique(valores, return_counts=True)
+    if len(distintos) <= FRACAO_DISTINTOS * len(valores):
+        return 'contagens', distintos, contagens
+    return 'indices', valores, None
+
+def _replicas(amostra, n_reamostras, estatistica, semente):
+    """Estatística de `n_reamostras` reamostras com reposição, calculadas em blocos vetorizados"""
+    modo, valores, contagens = amostra
+    n = int(contagens.sum()) if modo == 'contagens' else len(valores)
+    if n == 0:
+        return np.full(n_reamostras, np.nan)
+    rng = np.random.default_rng(semente)
+    bloco = max(1, ELEMENTOS_POR_BLOCO // len(valores))
+    medias = np.empty(n_reamostras)
+    for inicio in range(0, n_reamostras, bloco):
+        tamanho = min(bloco, n_reamostras - inicio)
+        if modo == 'contagens':
+            # Mesma distribuição da matriz de índices: quantas vezes cada valor distinto é sorteado
+            pesos = rng.multinomial(n, contagens / n, size=tamanho)
+            medias[inicio:inicio + tamanho] = pesos @ valores / n
+        else:
+            indices = rng.integers(0, n, size=(tamanho, n))
+            medias[inicio:inicio + tamanho] = valores[indices].mean(axis=1)
+    return medias * n if estatistica == 'sum' else medias
+
+def _iniciar_processo(amostras):
+    global _AMOSTRAS
+    _AMOSTRAS = amostras
+
+def _executar_tarefa(chave, n_reamostras, estatistica, semente):
+    return _replicas(_AMOSTRAS[chave], n_reamostras, estatistica, semente)
+
+def reamostrar(df, grupo, metricas, estatistica='mean', n_reamostras=N_REAMOSTRAS, semente=0, workers=None):
+    """
+    Réplicas bootstrap da estatística de cada métrica em cada grupo:
+    {(grupo, métrica): array de n_reamostras}. workers=1 executa no próprio processo.
+    """
+    if estatistica not in ESTATISTICAS:
+        raise ValueError(f"Estatística desconhecida: {estatistica!r} (opções: {', '.join(ESTATISTICAS)})")
+    amostras = {(str(nome), metrica): _preparar(parte[metrica].to_numpy(dtype=np.float64))
+                for nome, parte in df.groupby(grupo, observed=True) for metrica in metricas}
+
+    tarefas = [(chave, min(REAMOSTRAS_POR_TAREFA, n_reamostras - inicio))
+               for chave in amostras for inicio in range(0, n_reamostras, REAMOSTRAS_POR_TAREFA)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tarefas))
+    argumentos = [(chave, tamanho, estatistica, s) for (chave, tamanho), s in zip(tarefas, sementes)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tarefas) == 1:
+        partes = [_replicas(amostras[chave], *resto) for chave, *resto in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo,
+                                 initargs=(amostras,)) as executor:
+            partes = list(executor.map(_executar_tarefa, *zip(*argumentos)))
+
+    replicas = {chave: [] for chave in amostras}
+    for (chave, _), parte in zip(tarefas, partes):
+        replicas[chave].append(parte)
+    return {chave: np.concatenate(blocos) for chave, blocos in replicas.items()}
+
+def _percentis(replicas, confianca):
+    alfa = (1 - confianca) / 2
+    return np.nanquantile(replicas, [alfa, 1 - alfa])
+
+def intervalos(df, grupo, metricas, replicas, estatistica='mean', confianca=CONFIANCA):
+    """Estimativa pontual, intervalo percentil e erro padrão de cada (grupo, métrica)"""
+    agrupado = df.groupby(grupo, observed=True)
+    pontuais = agrupado[list(metricas)].agg(estatistica)
+    registros = agrupado.size()
+    linhas = []
+    for (nome, metrica), valores in replicas.items():
+        inferior, superior = _percentis(valores, confianca)
+        linhas.append((nome, metrica, pontuais.loc[nome, metrica], inferior, superior,
+                       np.nanstd(valores, ddof=1), registros.loc[nome]))
+    tabela = pd.DataFrame(linhas, columns=[grupo, 'metrica'] + COLUNAS_INTERVALOS)
+    return tabela.set_index([grupo, 'metrica']).sort_index()
+
+def diferencas(replicas, pares, metricas, estimativas, confianca=CONFIANCA):
+    """
+    Intervalo da diferença A − B entre grupos reamostrados de forma independente;
+    `significativa` quando o intervalo não contém zero
+    """
+    linhas = []
+    for a, b in pares:
+        for metrica in metricas:
+            diferenca = replicas[(a, metrica)] - replicas[(b, metrica)]
+            inferior, superior = _percentis(diferenca, confianca)
+            estimativa = estimativas.loc[(a, metrica), 'estimativa'] - estimativas.loc[(b, metrica), 'estimativa']
+            linhas.append((f'{a} − {b}', metrica, estimativa, inferior, superior,
+                           float(np.nanmean(diferenca > 0)), not (inferior <= 0 <= superior)))
+    tabela = pd.DataFrame(linhas, columns=['comparacao', 'metrica'] + COLUNAS_DIFERENCAS)
+    return tabela.set_index(['comparacao', 'metrica'])
+
+def intervalos_confianca(df, grupo, metricas, estatistica='mean', n_reamostras=N_REAMOSTRAS,
+                         confianca=CONFIANCA, pares=None, semente=0, workers=None):
+    """
+    Intervalos por grupo e pelas diferenças de `pares` (todos os pares se None e houver
+    até MAXIMO_GRUPOS_PARES grupos). Retorna (intervalos, diferencas).
+    """
+    replicas = reamostrar(df, grupo, metricas, estatistica, n_reamostras, semente, workers)
+    tabela = intervalos(df, grupo, metricas, replicas, estatistica, confianca)
+    grupos = sorted({nome for nome, _ in replicas})
+    if pares is None:
+        pares = list(combinations(grupos, 2)) if len(grupos) <= MAXIMO_GRUPOS_PARES else []
+    desconhecidos = sorted({g for par in pares for g in par} - set(grupos))
+    if desconhecidos:
+        raise ValueError(f"Grupos sem dados: {', '.join(desconhecidos)}")
+    return tabela, diferencas(replicas, pares, metricas, tabela, confianca)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Intervalos de confiança por bootstrap por região ou cidade')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--por', choices=['regiao', 'cidade'], default='regiao', help='grupos reamostrados')
+    parser.add_argument('--metricas', nargs='+', default=['mortes', 'feridos', 'desalojados', 'prejuizo_milhoes'])
+    parser.add_argument('--estatistica', choices=ESTATISTICAS, default='sum', help='total ou média por grupo')
+    parser.add_argument('--reamostras', type=int, default=N_REAMOSTRAS)
+    parser.add_argument('--confianca', type=float, default=CONFIANCA)
+    parser.add_argument('--comparar', nargs=2, action='append', metavar=('A', 'B'),
+                        help='par de grupos comparados (repetível; padrão: todos os pares, se poucos)')
+    parser.add_argument('--workers', type=int, help='processos (padrão: número de CPUs)')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        from .leitura import ler_dataset
+
+        df = ler_dataset(args.dados, 'enchentes_rs.csv')
+        inicio = time.perf_counter()
+        tabela, tabela_diferencas = intervalos_confianca(df, args.por, args.metricas, args.estatistica,
+                                                         args.reamostras, args.confianca, args.comparar,
+                                                         args.semente, args.workers)
+        duracao = time.perf_counter() - inicio
+        print(f"🎲 BOOTSTRAP POR {args.por.upper()} ({args.reamostras:,} reamostras, IC {args.confianca:.0%}, "
+              f"{args.estatistica}) em {duracao:.2f}s")
+        print("=" * 50)
+        print(tabela.round(2).to_string())
+        if not tabela_diferencas.empty:
+            print("\n📊 Diferenças entre grupos:")
+            print(tabela_diferencas.round(3).to_string())
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache Persistente de Resultados
+Guarda em disco resultados de análises, identificados pela impressão digital dos
+dados, pelo método e pelos parâmetros; descarta os menos usados quando a pasta
+passa do limite de tamanho e pode ser compartilhado por vários processos
+"""
+
+import os
+import sys
+import pickle
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos, as escritas continuam atômicas
+    fcntl = None
+
+PASTA_CACHE = os.path.join('outputs', 'cache')
+
+# Tamanho máximo padrão da pasta do cache
+LIMITE_CACHE_BYTES = 256 * 1024 * 1024
+
+EXTENSAO = '.pkl'
+ARQUIVO_TRAVA = '.trava'
+
+def impressao_digital(caminhos, *extras):
+    """Identifica a versão de arquivos (caminho, tamanho e data de modificação) e de valores extras"""
+    h = hashlib.sha1()
+    for extra in extras:
+        h.update(repr(extra).encode())
+    for caminho in caminhos:
+        if os.path.exists(caminho):
+            st = os.stat(caminho)
+            h.update(f"{os.path.abspath(caminho)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+class CacheResultados:
+    """
+    Um arquivo pickle por resultado. Escritas vão para um temporário e são publicadas
+    com os.replace (leitores nunca veem arquivos pela metade); a data de acesso de cada
+    arquivo é atualizada a cada acerto e a remoção por tamanho segue a ordem LRU
+    sob uma trava de arquivo compartilhada entre processos.
+    """
+
+    def __init__(self, pasta=PASTA_CACHE, limite_bytes=LIMITE_CACHE_BYTES):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+
+    def chave(self, impressao, metodo, parametros=None):
+        """Nome do arquivo de um resultado: método legível + hash dos dados e dos parâmetros"""
+        parametros = sorted((parametros or {}).items())
+        h = hashlib.sha1(f"{impressao}|{metodo}|{parametros!r}".encode()).hexdigest()[:20]
+        prefixo = ''.join(c if c.isalnum() or c in '-_' else '_' for c in metodo)
+        return f"{prefixo}-{h}"
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave + EXTENSAO)
+
+    @contextmanager
+    def _trava(self):
+        """Trava exclusiva entre processos (no-op onde fcntl não existe)"""
+        os.makedirs(self.pasta, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.pasta, ARQUIVO_TRAVA), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def obter(self, chave):
+        """
+        Retorna (encontrado, valor); arquivos ausentes, removidos ou corrompidos contam
+        como falta, assim como os que citam classes que não existem mais onde estavam
+        """
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                valor = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ImportError, AttributeError):
+            self.faltas += 1
+            return False, None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        self.acertos += 1
+        return True, valor
+
+    def guardar(self, chave, valor):
+        """Grava um resultado de forma atômica e aplica o limite de tamanho"""
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho)
+        self.despejar()
+        return caminho
+
+    def em_cache(self, impressao, metodo, parametros, calcular):
+        """Devolve o resultado guardado ou o calcula e guarda"""
+        chave = self.chave(impressao, metodo, parametros)
+        encontrado, valor = self.obter(chave)
+        if not encontrado:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def _entradas(self):
+        """(data de acesso, tamanho, caminho) de cada resultado guardado"""
+        entradas = []
+        try:
+            nomes = os.listdir(self.pasta)
+        except FileNotFoundError:
+            return entradas
+        for nome in nomes:
+            if not nome.endswith(EXTENSAO):
+                continue
+            caminho = os.path.join(self.pasta, nome)
+            try:
+                st = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            entradas.append((st.st_mtime_ns, st.st_size, caminho))
+        return entradas
+
+    def tamanho(self):
+        return sum(tamanho for _, tamanho, _ in self._entradas())
+
+    def despejar(self):
+        """Remove os resultados usados há mais tempo até a pasta caber no limite"""
+        removidos = 0
+        with self._trava():
+            entradas = sorted(self._entradas())
+            total = sum(tamanho for _, tamanho, _ in entradas)
+            for _, tamanho, caminho in entradas:
+                if total <= self.limite_bytes:
+                    break
+                try:
+                    os.remove(caminho)
+                    removidos += 1
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+        return removidos
+
+    def limpar(self):
+        """Remove todos os resultados guardados"""
+        with self._trava():
+            for _, _, caminho in self._entradas():
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Inspeção e limpeza do cache de resultados')
+    parser.add_argument('--pasta', default=PASTA_CACHE, help=f'pasta do cache (padrão: {PASTA_CACHE})')
+    parser.add_argument('--limpar', action='store_true', help='remove todos os resultados guardados')
+    args = parser.parse_args()
+
+    try:
+        cache = CacheResultados(args.pasta)
+        if args.limpar:
+            cache.limpar()
+            print(f"🧹 Cache em '{args.pasta}' limpo")
+            return
+        entradas = cache._entradas()
+        print(f"💾 Cache em '{args.pasta}': {len(entradas)} resultados, "
+              f"{cache.tamanho() / 2**20:.1f} MB de {cache.limite_bytes / 2**20:.0f} MB")
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
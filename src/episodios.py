@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Segmentação de Episódios de Enchente
+Divide a série de cada cidade em episódios contíguos acima do limiar
+(run-length sobre datas e cruzamentos de limiar), para todas as cidades de uma vez
+"""
+
+import numpy as np
+import pandas as pd
+
+from .leitura import COLUNA_PREJUIZO_FIXO, ESCALAS_PREJUIZO
+
+# Altura do rio a partir da qual um registro conta como cheia
+LIMIAR_ALTURA_METROS = 4.0
+
+# Maior intervalo entre registros em cheia ainda considerado o mesmo episódio
+INTERVALO_MAXIMO_DIAS = 1
+
+COLUNAS_EPISODIO = ['cidade', 'regiao', 'inicio', 'pico', 'fim', 'duracao_dias', 'registros',
+                    'altura_pico_metros', 'chuva_maxima_mm', 'mortes', 'feridos',
+                    'desalojados', 'prejuizo_milhoes']
+
+def marcar_episodios(df, limiar_altura=LIMIAR_ALTURA_METROS, limiar_chuva=None,
+                     intervalo_maximo_dias=INTERVALO_MAXIMO_DIAS):
+    """
+    Retorna um array com o número do episódio de cada linha de `df` (-1 fora de cheia).
+    Um episódio começa quando a cidade entra em cheia, muda de cidade ou há um
+    intervalo maior que `intervalo_maximo_dias` desde o registro anterior.
+    """
+    codigos = pd.factorize(df['cidade'])[0]
+    ordem = np.lexsort((df['data'].to_numpy(), codigos))
+    cidades = codigos[ordem]
+    dias = df['data'].to_numpy().astype('datetime64[D]').astype(np.int64)[ordem]
+
+    em_cheia = df['altura_rio_metros'].to_numpy()[ordem] >= limiar_altura
+    if limiar_chuva is not None:
+        em_cheia |= df['chuva_24h_mm'].to_numpy()[ordem] >= limiar_chuva
+
+    anterior_em_cheia = np.r_[False, em_cheia[:-1]]
+    mesma_cidade = np.r_[False, cidades[1:] == cidades[:-1]]
+    continuo = np.r_[False, np.diff(dias) <= intervalo_maximo_dias]
+    inicio = em_cheia & ~(anterior_em_cheia & mesma_cidade & continuo)
+
+    numeros = np.cumsum(inicio) - 1
+    numeros[~em_cheia] = -1
+
+    episodio = np.empty(len(df), dtype=np.int64)
+    episodio[ordem] = numeros
+    return episodio
+
+def _colunas_episodio(escala_prejuizo):
+    return COLUNAS_EPISODIO if escala_prejuizo is None else COLUNAS_EPISODIO + [COLUNA_PREJUIZO_FIXO]
+
+def _prejuizo_em_milhoes(tabela, escala_prejuizo):
+    """prejuizo_milhoes derivado do total int64 em ponto fixo (a única conversão para float)"""
+    tabela['prejuizo_milhoes'] = tabela[COLUNA_PREJUIZO_FIXO] / ESCALAS_PREJUIZO[escala_prejuizo]
+    return tabela
+
+def segmentar_episodios(df, limiar_altura=LIMIAR_ALTURA_METROS, limiar_chuva=None,
+                        intervalo_maximo_dias=INTERVALO_MAXIMO_DIAS, acumulados=False, escala_prejuizo=None):
+    """
+    Tabela de episódios (início, pico, fim, duração, altura de pico e impactos totais).
+    Com `acumulados=True` desalojados e prejuízo são séries acumuladas (como na base
+    detalhada de 2024) e o total do episódio é o máximo, não a soma. Com `escala_prejuizo`
+    o total do prejuízo vem da coluna em ponto fixo e a tabela a mantém, para mesclas exatas.
+    """
+    episodio = marcar_episodios(df, limiar_altura, limiar_chuva, intervalo_maximo_dias)
+    em_cheia = df[episodio >= 0].assign(episodio=episodio[episodio >= 0])
+    if em_cheia.empty:
+        return pd.DataFrame(columns=_colunas_episodio(escala_prejuizo)).rename_axis('episodio')
+
+    total = 'max' if acumulados else 'sum'
+    prejuizo = 'prejuizo_milhoes' if escala_prejuizo is None else COLUNA_PREJUIZO_FIXO
+    grupos = em_cheia.groupby('episodio')
+    tabela = grupos.agg(
+        cidade=('cidade', 'first'),
+        regiao=('regiao', 'first'),
+        inicio=('data', 'min'),
+        fim=('data', 'max'),
+        registros=('data', 'size'),
+        altura_pico_metros=('altura_rio_metros', 'max'),
+        chuva_maxima_mm=('chuva_24h_mm', 'max'),
+        mortes=('mortes', 'sum'),
+        feridos=('feridos', 'sum'),
+        desalojados=('desalojados', total),
+        **{prejuizo: (prejuizo, total)},
+    )
+    if escala_prejuizo is not None:
+        _prejuizo_em_milhoes(tabela, escala_prejuizo)
+    tabela['pico'] = em_cheia.loc[grupos['altura_rio_metros'].idxmax(), 'data'].to_numpy()
+    tabela['duracao_dias'] = (tabela['fim'] - tabela['inicio']).dt.days + 1
+    tabela['cidade'] = tabela['cidade'].astype(str)
+    return tabela[_colunas_episodio(escala_prejuizo)]
+
+def mesclar_episodios(tabela, intervalo_maximo_dias=INTERVALO_MAXIMO_DIAS, acumulados=False, escala_prejuizo=None):
+    """
+    Junta episódios da mesma cidade que se tocam (intervalo entre o fim de um e o
+    início do próximo de até `intervalo_maximo_dias`), como os segmentados em lotes
+    separados de um mesmo arquivo. Supõe no máximo um registro por cidade e dia.
+    Com `escala_prejuizo` soma a coluna em ponto fixo de segmentar_episodios.
+    """
+    if tabela.empty:
+        return tabela
+    tabela = tabela.sort_values(['cidade', 'inicio'], kind='stable').reset_index(drop=True)
+    mesma_cidade = tabela['cidade'].eq(tabela['cidade'].shift()).to_numpy()
+    fim_anterior = tabela.groupby('cidade', sort=False)['fim'].cummax().shift()
+    continuo = ((tabela['inicio'] - fim_anterior).dt.days <= intervalo_maximo_dias).to_numpy()
+    grupo = np.cumsum(~(mesma_cidade & continuo)) - 1
+
+    total = 'max' if acumulados else 'sum'
+    prejuizo = 'prejuizo_milhoes' if escala_prejuizo is None else COLUNA_PREJUIZO_FIXO
+    grupos = tabela.groupby(grupo)
+    mescladas = grupos.agg(
+        cidade=('cidade', 'first'),
+        regiao=('regiao', 'first'),
+        inicio=('inicio', 'min'),
+        fim=('fim', 'max'),
+        registros=('registros', 'sum'),
+        altura_pico_metros=('altura_pico_metros', 'max'),
+        chuva_maxima_mm=('chuva_maxima_mm', 'max'),
+        mortes=('mortes', 'sum'),
+        feridos=('feridos', 'sum'),
+        desalojados=('desalojados', total),
+        **{prejuizo: (prejuizo, total)},
+    )
+    if escala_prejuizo is not None:
+        _prejuizo_em_milhoes(mescladas, escala_prejuizo)
+    mescladas['pico'] = tabela.loc[grupos['altura_pico_metros'].idxmax(), 'pico'].to_numpy()
+    mescladas['duracao_dias'] = (mescladas['fim'] - mescladas['inicio']).dt.days + 1
+    return mescladas[_colunas_episodio(escala_prejuizo)].rename_axis('episodio')
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada Espacial dos Municípios
+Carrega geometrias municipais (GeoJSON), indexa em grade regular para consultas
+por raio e por polígono e desenha mapas coropléticos com geometrias simplificadas
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
+
+if not __package__:
+    # Executado como script (python src/espacial.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+ARQUIVO_MUNICIPIOS = 'data/municipios_rs.geojson'
+
+# Propriedades aceitas como nome do município (a malha do IBGE usa NM_MUN)
+PROPRIEDADES_NOME = ('nome', 'NM_MUN', 'name')
+
+# Pontos de referência (latitude, longitude)
+PONTOS_REFERENCIA = {
+    'Guaíba': (-30.10, -51.25),
+}
+
+RAIO_TERRA_KM = 6371.0
+
+def distancia_km(lat, lon, lats, lons):
+    """Distância de haversine entre um ponto e vetores de pontos"""
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = (np.sin((lats - lat) / 2) ** 2
+         + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(a))
+
+def simplificar(anel, tolerancia):
+    """Douglas-Peucker iterativo: mantém os vértices que se afastam mais que `tolerancia`"""
+    if len(anel) <= 4 or tolerancia <= 0:
+        return anel
+    manter = np.zeros(len(anel), dtype=bool)
+    manter[0] = manter[-1] = True
+    pilha = [(0, len(anel) - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        if fim - inicio < 2:
+            continue
+        a, b = anel[inicio], anel[fim]
+        meio = anel[inicio + 1:fim]
+        segmento = b - a
+        comprimento = np.hypot(*segmento)
+        if comprimento == 0:
+            distancias = np.hypot(*(meio - a).T)
+        else:
+            distancias = np.abs(segmento[0] * (meio[:, 1] - a[1]) - segmento[1] * (meio[:, 0] - a[0])) / comprimento
+        indice = int(np.argmax(distancias))
+        if distancias[indice] > tolerancia:
+            divisao = inicio + 1 + indice
+            manter[divisao] = True
+            pilha.append((inicio, divisao))
+            pilha.append((divisao, fim))
+    simplificado = anel[manter]
+    # Um anel precisa de ao menos um triângulo
+    return simplificado if len(simplificado) >= 4 else anel
+
+def pontos_no_poligono(xs, ys, poligono):
+    """Ray casting vetorizado: quais pontos (xs, ys) estão dentro do polígono (N x 2, lon/lat)"""
+    dentro = np.zeros(len(xs), dtype=bool)
+    x1, y1 = poligono[:, 0], poligono[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    for ax, ay, bx, by in zip(x1, y1, x2, y2):
+        cruza = (ay > ys) != (by > ys)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_corte = ax + (ys - ay) * (bx - ax) / (by - ay)
+        dentro ^= cruza & (xs < x_corte)
+    return dentro
+
+class CamadaMunicipios:
+    """Geometrias municipais com índice em grade sobre os retângulos envolventes"""
+
+    def __init__(self, nomes, aneis, tamanho_celula=0.25, tolerancia_simplificacao=0.005):
+        self.nomes = np.asarray(nomes, dtype=object)
+        self.aneis = aneis
+        self.tamanho_celula = tamanho_celula
+
+        # Retângulos envolventes e centroides (média dos vértices de todos os anéis)
+        self.bbox = np.array([[min(a[:, 0].min() for a in partes), min(a[:, 1].min() for a in partes),
+                               max(a[:, 0].max() for a in partes), max(a[:, 1].max() for a in partes)]
+                              for partes in aneis])
+        centros = np.array([np.vstack(partes).mean(axis=0) for partes in aneis])
+        self.lons, self.lats = centros[:, 0], centros[:, 1]
+
+        # Geometrias simplificadas uma única vez, usadas em todos os mapas
+        self.aneis_simplificados = [[simplificar(a, tolerancia_simplificacao) for a in partes]
+                                    for partes in aneis]
+
+        self._grade = self._construir_grade()
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def _celula(self, lon, lat):
+        return int(np.floor(lon / self.tamanho_celula)), int(np.floor(lat / self.tamanho_celula))
+
+    def _construir_grade(self):
+        grade = defaultdict(list)
+        for i, (x0, y0, x1, y1) in enumerate(self.bbox):
+            cx0, cy0 = self._celula(x0, y0)
+            cx1, cy1 = self._celula(x1, y1)
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    grade[(cx, cy)].append(i)
+        return {celula: np.array(indices, dtype=np.intp) for celula, indices in grade.items()}
+
+    def _candidatos(self, x0, y0, x1, y1):
+        """Índices dos municípios cujas células tocam o retângulo dado"""
+        cx0, cy0 = self._celula(x0, y0)
+        cx1, cy1 = self._celula(x1, y1)
+        partes = [self._grade[(cx, cy)]
+                  for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)
+                  if (cx, cy) in self._grade]
+        return np.unique(np.concatenate(partes)) if partes else np.array([], dtype=np.intp)
+
+    def no_raio(self, lat, lon, raio_km):
+        """Municípios com centroide a até `raio_km` do ponto, com a distância"""
+        dlat = raio_km / 111.0
+        dlon = raio_km / (111.0 * max(np.cos(np.radians(lat)), 1e-6))
+        candidatos = self._candidatos(lon - dlon, lat - dlat, lon + dlon, lat + dlat)
+        distancias = distancia_km(lat, lon, self.lats[candidatos], self.lons[candidatos])
+        dentro = distancias <= raio_km
+        return pd.Series(distancias[dentro].round(1), index=self.nomes[candidatos[dentro]],
+                         name='distancia_km').sort_values()
+
+    def no_poligono(self, poligono):
+        """Municípios com centroide dentro do polígono (lista de pares lon/lat)"""
+        poligono = np.asarray(poligono, dtype=np.float64)
+        x0, y0 = poligono.min(axis=0)
+        x1, y1 = poligono.max(axis=0)
+        candidatos = self._candidatos(x0, y0, x1, y1)
+        dentro = pontos_no_poligono(self.lons[candidatos], self.lats[candidatos], poligono)
+        return list(self.nomes[candidatos[dentro]])
+
+    def mapa_coropletico(self, valores, titulo, caminho=None, cmap='Reds', ax=None):
+        """Desenha todos os municípios em uma única coleção, coloridos por `valores` (Series por nome)"""
+        poligonos, cores = [], []
+        valores = valores.reindex(self.nomes)
+        for partes, valor in zip(self.aneis_simplificados, valores.to_numpy(dtype=np.float64)):
+            for anel in partes:
+                poligonos.append(anel)
+                cores.append(valor)
+
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(10, 8))
+        else:
+            fig = ax.figure
+        colecao = PolyCollection(poligonos, array=np.ma.masked_invalid(cores), cmap=cmap,
+                                 edgecolors='gray', linewidths=0.3)
+        colecao.cmap.set_bad('#EEEEEE')
+        ax.add_collection(colecao)
+        ax.autoscale_view()
+        ax.set_aspect(1 / np.cos(np.radians(self.lats.mean())))
+        ax.set_title(titulo, fontweight='bold')
+        ax.set_xlabel('Longitude')
+        ax.set_ylabel('Latitude')
+        fig.colorbar(colecao, ax=ax, shrink=0.8, label=valores.name)
+
+        if caminho:
+            fig.savefig(caminho, dpi=300, bbox_inches='tight')
+        return fig
+
+def carregar_municipios(caminho=ARQUIVO_MUNICIPIOS, **kwargs):
+    """Lê um GeoJSON de municípios (Polygon ou MultiPolygon, coordenadas lon/lat)"""
+    with open(caminho, encoding='utf-8') as f:
+        colecao = json.load(f)
+
+    nomes, aneis = [], []
+    for feicao in colecao['features']:
+        propriedades = feicao.get('properties') or {}
+        nome = next((propriedades[p] for p in PROPRIEDADES_NOME if p in propriedades), None)
+        geometria = feicao.get('geometry') or {}
+        if nome is None or geometria.get('type') not in ('Polygon', 'MultiPolygon'):
+            continue
+        poligonos = geometria['coordinates']
+        if geometria['type'] == 'Polygon':
+            poligonos = [poligonos]
+        # Apenas os anéis externos; buracos não alteram centroides nem o mapa nesta escala
+        nomes.append(nome)
+        aneis.append([np.asarray(p[0], dtype=np.float64)[:, :2] for p in poligonos])
+
+    return CamadaMunicipios(nomes, aneis, **kwargs)
+
+def impactos_no_raio(camada, df_cidades, lat, lon, raio_km, coluna='Desalojados', minimo=0):
+    """Junta a consulta por raio à tabela de impactos por cidade e filtra por `coluna` >= `minimo`"""
+    proximos = camada.no_raio(lat, lon, raio_km)
+    resultado = df_cidades.join(proximos, how='inner')
+    return resultado[resultado[coluna] >= minimo].sort_values('distancia_km')
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Consultas espaciais sobre os impactos por município')
+    parser.add_argument('--municipios', default=ARQUIVO_MUNICIPIOS, help='GeoJSON dos municípios')
+    parser.add_argument('--referencia', default='Guaíba', choices=sorted(PONTOS_REFERENCIA))
+    parser.add_argument('--raio', type=float, default=50.0, help='raio da consulta em km')
+    parser.add_argument('--minimo', type=int, default=0, help='mínimo de desalojados')
+    parser.add_argument('--mapa', default='outputs/mapa_desalojados.png', help='arquivo do mapa coroplético')
+    args = parser.parse_args()
+
+    try:
+        from .analise_enchentes import AnalisadorEnchentes
+
+        camada = carregar_municipios(args.municipios)
+        print(f"🗺️ {len(camada)} municípios carregados de '{args.municipios}'")
+
+        analisador = AnalisadorEnchentes(exibir_graficos=False)
+        df_cidades = analisador.agregado('cidades')
+
+        lat, lon = PONTOS_REFERENCIA[args.referencia]
+        resultado = impactos_no_raio(camada, df_cidades, lat, lon, args.raio, minimo=args.minimo)
+        print(f"\n📍 Municípios a até {args.raio:.0f} km de {args.referencia} com ao menos {args.minimo:,} desalojados:")
+        print(resultado.to_string())
+
+        os.makedirs(os.path.dirname(args.mapa) or '.', exist_ok=True)
+        camada.mapa_coropletico(df_cidades['Desalojados'], 'Desalojados por Município (2020-2024)', args.mapa)
+        print(f"\n✅ Mapa salvo em '{args.mapa}'")
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gráficos por Município em Lote
+Um gráfico de evolução (chuva, altura do rio e desalojados) por cidade. Cada
+processo monta uma única figura-modelo e, para cada cidade, só troca os dados das
+linhas, os limites dos eixos e o título antes de salvar — sem recriar figura,
+eixos e textos. As cidades são repartidas entre processos e a vazão é medida em
+gráficos por segundo.
+"""
+
+import os
+import sys
+import time
+import argparse
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.dates as mdates
+from matplotlib.ticker import MaxNLocator
+
+if not __package__:
+    # Executado como script (python src/graficos_cidades.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+COLUNAS_GRAFICO = ['chuva_24h_mm', 'altura_rio_metros', 'desalojados']
+TITULOS = {'chuva_24h_mm': 'Chuva em 24h (mm)', 'altura_rio_metros': 'Altura do rio (m)',
+           'desalojados': 'Desalojados'}
+CORES = {'chuva_24h_mm': 'green', 'altura_rio_metros': 'blue', 'desalojados': 'red'}
+
+PASTA_GRAFICOS_CIDADES = 'cidades'
+DPI = 100
+TAMANHO_FIGURA = (8, 6)
+COMPRESSAO_PNG = 1
+
+# Cidades por tarefa do pool (uma figura-modelo por processo, reaproveitada entre tarefas)
+CIDADES_POR_TAREFA = 25
+
+# Figura-modelo do processo trabalhador
+_MODELO = None
+
+def nome_arquivo(cidade):
+    """Nome de arquivo ASCII estável para uma cidade ('São Leopoldo' → 'sao_leopoldo.png')"""
+    ascii_ = unicodedata.normalize('NFKD', str(cidade)).encode('ascii', 'ignore').decode()
+    return ''.join(c if c.isalnum() else '_' for c in ascii_.lower()).strip('_') + '.png'
+
+def series_por_cidade(df, colunas=COLUNAS_GRAFICO):
+    """
+    {cidade: (datas como números do matplotlib, {coluna: valores})}, ordenadas por data,
+    com uma ordenação da tabela inteira em vez de um filtro por cidade
+    """
+    validos = df[df['data'].notna()]
+    codigos, cidades = pd.factorize(validos['cidade'], sort=True)
+    datas = mdates.date2num(validos['data'].to_numpy())
+    ordem = np.lexsort((datas, codigos))
+    codigos, datas = codigos[ordem], datas[ordem]
+    valores = {coluna: validos[coluna].to_numpy(dtype=np.float64)[ordem] for coluna in colunas}
+    limites = np.searchsorted(codigos, np.arange(len(cidades) + 1))
+    return {str(cidade): (datas[a:b], {coluna: v[a:b] for coluna, v in valores.items()})
+            for cidade, a, b in zip(cidades, limites[:-1], limites[1:]) if b > a}
+
+class ModeloGrafico:
+    """Figura de três painéis (chuva, rio, desalojados) criada uma vez e redesenhada por cidade"""
+
+    def __init__(self, colunas=COLUNAS_GRAFICO, dpi=DPI, tamanho=TAMANHO_FIGURA):
+        self.colunas = list(colunas)
+        self.dpi = dpi
+        # Figura sem pyplot: não entra no gerenciador de janelas nem precisa da thread principal
+        self.figura = Figure(figsize=tamanho, dpi=dpi)
+        FigureCanvasAgg(self.figura)
+        self.eixos = self.figura.subplots(len(self.colunas), 1, sharex=True)
+        self.linhas = {}
+        for eixo, coluna in zip(self.eixos, self.colunas):
+            estilo = 'steps-mid' if coluna == 'chuva_24h_mm' else 'default'
+            self.linhas[coluna], = eixo.plot([], [], color=CORES.get(coluna), linewidth=1.2, drawstyle=estilo)
+            eixo.set_ylabel(TITULOS.get(coluna, coluna))
+            eixo.yaxis.set_major_locator(MaxNLocator(4))
+            eixo.grid(True, alpha=0.3)
+        localizador = mdates.AutoDateLocator(maxticks=8)
+        self.eixos[-1].xaxis.set_major_locator(localizador)
+        self.eixos[-1].xaxis.set_major_formatter(mdates.ConciseDateFormatter(localizador))
+        self.titulo = self.figura.suptitle('', fontsize=13, fontweight='bold')
+        self.figura.subplots_adjust(left=0.1, right=0.97, top=0.93, bottom=0.08, hspace=0.12)
+
+    def desenhar(self, cidade, datas, valores, caminho):
+        """Troca os dados das linhas pelos da cidade e salva o PNG em `caminho`"""
+        self.titulo.set_text(f'Evolução em {cidade}')
+        inicio, fim = datas[0], datas[-1]
+        margem = max((fim - inicio) * 0.02, 0.5)
+        for eixo, coluna in zip(self.eixos, self.colunas):
+            y = valores[coluna]
+            self.linhas[coluna].set_data(datas, y)
+            finitos = y[np.isfinite(y)]
+            baixo, alto = (finitos.min(), finitos.max()) if len(finitos) else (0.0, 1.0)
+            folga = (alto - baixo) * 0.05 or max(abs(alto) * 0.05, 0.5)
+            eixo.set_ylim(min(baixo - folga, 0.0) if coluna != 'altura_rio_metros' else baixo - folga, alto + folga)
+        self.eixos[-1].set_xlim(inicio - margem, fim + margem)
+        # Compressão rápida do PNG: a codificação zlib padrão custa quase um terço do gráfico
+        self.figura.savefig(caminho, dpi=self.dpi, pil_kwargs={'compress_level': COMPRESSAO_PNG})
+
+def _iniciar_processo(dpi):
+    global _MODELO
+    matplotlib.use('Agg')
+    _MODELO = ModeloGrafico(dpi=dpi)
+
+def _renderizar_tarefa(itens, pasta):
+    for cidade, datas, valores in itens:
+        _MODELO.desenhar(cidade, datas, valores, os.path.join(pasta, nome_arquivo(cidade)))
+    return len(itens)
+
+def renderizar_cidades(series, pasta, workers=None, dpi=DPI):
+    """
+    Um PNG por cidade de `series` (series_por_cidade) em `pasta`, com uma figura-modelo
+    por processo. Retorna (gráficos, segundos, gráficos por segundo).
+    """
+    os.makedirs(pasta, exist_ok=True)
+    itens = [(cidade, datas, valores) for cidade, (datas, valores) in series.items()]
+    tarefas = [itens[i:i + CIDADES_POR_TAREFA] for i in range(0, len(itens), CIDADES_POR_TAREFA)]
+    workers = min(workers or os.cpu_count() or 1, max(len(tarefas), 1))
+    inicio = time.perf_counter()
+    if workers == 1:
+        _iniciar_processo(dpi)
+        total = sum(_renderizar_tarefa(tarefa, pasta) for tarefa in tarefas)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo, initargs=(dpi,)) as executor:
+            total = sum(executor.map(_renderizar_tarefa, tarefas, [pasta] * len(tarefas)))
+    duracao = time.perf_counter() - inicio
+    return total, duracao, total / duracao if duracao > 0 else float('inf')
+
+def renderizar_ingenuo(series, pasta, dpi=DPI):
+    """Referência: uma figura nova com plt.subplots por cidade, como nos gráficos da análise"""
+    import matplotlib.pyplot as plt
+
+    os.makedirs(pasta, exist_ok=True)
+    inicio = time.perf_counter()
+    for cidade, (datas, valores) in series.items():
+        fig, eixos = plt.subplots(len(COLUNAS_GRAFICO), 1, sharex=True, figsize=TAMANHO_FIGURA)
+        fig.suptitle(f'Evolução em {cidade}', fontsize=13, fontweight='bold')
+        for eixo, coluna in zip(eixos, COLUNAS_GRAFICO):
+            eixo.plot(mdates.num2date(datas), valores[coluna], color=CORES[coluna], linewidth=1.2)
+            eixo.set_ylabel(TITULOS[coluna])
+        plt.tight_layout()
+        fig.savefig(os.path.join(pasta, nome_arquivo(cidade)), dpi=dpi)
+        plt.close(fig)
+    duracao = time.perf_counter() - inicio
+    return len(series), duracao, len(series) / duracao if duracao > 0 else float('inf')
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Um gráfico de evolução por município, em lote')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--arquivo', default='enchentes_rs.csv', help='dataset dos gráficos')
+    parser.add_argument('--saida', default=os.path.join('outputs', PASTA_GRAFICOS_CIDADES))
+    parser.add_argument('--workers', type=int, help='processos (padrão: número de CPUs)')
+    parser.add_argument('--dpi', type=int, default=DPI)
+    parser.add_argument('--limite', type=int, help='só as primeiras N cidades')
+    parser.add_argument('--comparar', type=int, metavar='N',
+                        help='mede também N cidades com uma figura nova por gráfico')
+    args = parser.parse_args()
+
+    try:
+        from .leitura import ler_dataset
+
+        df = ler_dataset(args.dados, args.arquivo)
+        df['data'] = pd.to_datetime(df['data'], errors='coerce')
+        series = series_por_cidade(df)
+        if args.limite:
+            series = dict(list(series.items())[:args.limite])
+
+        print(f"🖼️ GRÁFICOS POR MUNICÍPIO ({len(series)} cidades)")
+        print("=" * 50)
+        total, duracao, vazao = renderizar_cidades(series, args.saida, args.workers, args.dpi)
+        print(f"⚡ Figura reaproveitada: {total} gráficos em {duracao:.2f}s ({vazao:.1f} gráficos/s) → {args.saida}/")
+        if args.comparar:
+            amostra = dict(list(series.items())[:args.comparar])
+            total, duracao, referencia = renderizar_ingenuo(amostra, os.path.join(args.saida, 'ingenuo'), args.dpi)
+            print(f"🐢 Figura nova por gráfico: {total} gráficos em {duracao:.2f}s ({referencia:.1f} gráficos/s); "
+                  f"{vazao / referencia:.1f}x mais rápido com a figura-modelo")
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
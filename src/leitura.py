@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura dos Datasets de Enchentes
+Esquema das colunas e leitura dos CSVs, inteira, em lotes ou particionada
+(layout estilo Hive: <dataset>/ano=2024/regiao=Metropolitana/dados.csv),
+com motores de leitura intercambiáveis (C, pyarrow ou faixas de bytes em paralelo)
+e descompressão em fluxo de exports .csv.gz, .csv.xz e .csv.zst
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+# Tipos explícitos das colunas dos arquivos de dados
+TIPOS_COLUNAS = {
+    'cidade': 'object',
+    'regiao': 'object',
+    'mortes': 'int64',
+    'feridos': 'int64',
+    'desalojados': 'int64',
+    'prejuizo_milhoes': 'float64',
+    'altura_rio_metros': 'float64',
+    'chuva_24h_mm': 'float64',
+    'status_emergencia': 'object',
+}
+
+COLUNAS_DATA = ['data']
+
+# Prejuízo em ponto fixo: unidades inteiras por R$ 1 milhão. Somas de int64 são exatas e
+# não dependem da ordem, então lotes, partições e threads chegam ao mesmo total
+ESCALAS_PREJUIZO = {'milhares': 1_000, 'centavos': 100_000_000}
+COLUNA_PREJUIZO_FIXO = 'prejuizo_fixo'
+
+def prejuizo_ponto_fixo(df, escala):
+    """
+    Acrescenta a `df` o prejuízo em int64 na `escala` de ESCALAS_PREJUIZO e arredonda
+    prejuizo_milhoes ao mesmo passo, para os dois sempre concordarem (ausentes valem 0
+    na soma inteira e continuam NaN na coluna em milhões)
+    """
+    fator = ESCALAS_PREJUIZO[escala]
+    valores = df['prejuizo_milhoes'].to_numpy(dtype=np.float64)
+    ausentes = np.isnan(valores)
+    fixo = np.rint(np.where(ausentes, 0.0, valores) * fator).astype(np.int64)
+    df[COLUNA_PREJUIZO_FIXO] = fixo
+    df['prejuizo_milhoes'] = np.where(ausentes, np.nan, fixo / fator)
+    return df
+
+# Regiões do RS reconhecidas pelas análises e modelos
+REGIOES = ('Metropolitana', 'Serra', 'Centro Ocidental', 'Centro Oriental',
+           'Noroeste', 'Sudeste', 'Sudoeste')
+
+def _argumentos_leitura(colunas):
+    """Monta os argumentos de pd.read_csv para o subconjunto de colunas pedido"""
+    tipos = TIPOS_COLUNAS if colunas is None else {c: t for c, t in TIPOS_COLUNAS.items() if c in colunas}
+    datas = COLUNAS_DATA if colunas is None else [c for c in COLUNAS_DATA if c in colunas]
+    return {'usecols': colunas, 'dtype': tipos, 'parse_dates': datas}
+
+# Compressões aceitas nos exports (o pandas descomprime em fluxo, com buffers limitados;
+# .zst requer o pacote opcional zstandard)
+EXTENSOES_COMPRIMIDAS = ('.gz', '.xz', '.zst')
+
+def comprimido(caminho):
+    return str(caminho).endswith(EXTENSOES_COMPRIMIDAS)
+
+def localizar_csv(pasta_dados, arquivo):
+    """Caminho do CSV plano ou, se ele não existir, da sua versão comprimida"""
+    caminho = os.path.join(pasta_dados, arquivo)
+    if not os.path.exists(caminho):
+        for extensao in EXTENSOES_COMPRIMIDAS:
+            if os.path.exists(caminho + extensao):
+                return caminho + extensao
+    return caminho
+
+# Motores de leitura: 'c' (padrão do pandas, um núcleo), 'pyarrow' (multithread,
+# dependência opcional) e 'paralelo' (faixas de bytes do arquivo lidas por várias threads)
+MOTORES_LEITURA = ('c', 'pyarrow', 'paralelo')
+
+def pyarrow_disponivel():
+    return importlib.util.find_spec('pyarrow') is not None
+
+def _faixas_de_bytes(caminho, partes):
+    """
+    Divide o corpo do CSV em até `partes` faixas de bytes que terminam em quebra de linha.
+    Pressupõe que nenhum campo contenha quebras de linha entre aspas (caso dos nossos exports).
+    """
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, 'rb') as f:
+        cabecalho = f.readline()
+        limites = [f.tell()]
+        for i in range(1, partes):
+            f.seek(max(limites[0] + (tamanho - limites[0]) * i // partes, limites[-1]))
+            f.readline()
+            limites.append(min(f.tell(), tamanho))
+        limites.append(tamanho)
+    return cabecalho, [(a, b) for a, b in zip(limites[:-1], limites[1:]) if b > a]
+
+def _filtrar(df, filtro, colunas=None):
+    """Linhas aceitas por `filtro`, só com `colunas` (as do filtro podem ter sido lidas a mais)"""
+    if filtro is None:
+        return df
+    df = filtro.aplicar(df).reset_index(drop=True)
+    return df if colunas is None else df[list(colunas)]
+
+def _com_colunas_filtro(colunas, filtro):
+    """Colunas a ler para também avaliar o filtro"""
+    if colunas is None or filtro is None:
+        return colunas
+    return list(dict.fromkeys(list(colunas) + filtro.colunas))
+
+def _ler_faixa(caminho, cabecalho, inicio, fim, argumentos, filtro=None, colunas=None):
+    with open(caminho, 'rb') as f:
+        f.seek(inicio)
+        dados = f.read(fim - inicio)
+    return _filtrar(pd.read_csv(io.BytesIO(cabecalho + dados), **argumentos), filtro, colunas)
+
+def _ler_csv_paralelo(caminho, argumentos, workers=None, filtro=None, colunas=None):
+    """
+    Lê as faixas de bytes em threads (o tokenizador do pandas libera o GIL) e concatena
+    na ordem; com `filtro`, cada faixa é filtrada antes da concatenação
+    """
+    if comprimido(caminho):
+        # Faixas de bytes não existem no fluxo comprimido: descomprime em fluxo, em série
+        if filtro is not None:
+            return ler_filtrado(caminho, filtro, colunas, 'c')
+        return pd.read_csv(caminho, **argumentos)
+    workers = workers or os.cpu_count() or 1
+    cabecalho, faixas = _faixas_de_bytes(caminho, workers)
+    if len(faixas) <= 1:
+        if filtro is not None:
+            return ler_filtrado(caminho, filtro, colunas, 'c')
+        return pd.read_csv(caminho, **argumentos)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        partes = list(executor.map(lambda faixa: _ler_faixa(caminho, cabecalho, *faixa, argumentos, filtro, colunas),
+                                   faixas))
+    return pd.concat(partes, ignore_index=True)
+
+def ler_csv(caminho, colunas=None, motor='c', workers=None, filtro=None):
+    """
+    Lê um CSV de enchentes inteiro com os tipos do esquema. Todos os motores devolvem
+    o mesmo DataFrame; sem pyarrow instalado, 'pyarrow' recorre a 'paralelo'.
+    Com `filtro` (FiltroLinhas), devolve só as linhas aceitas.
+    """
+    if motor not in MOTORES_LEITURA:
+        raise ValueError(f"Motor de leitura desconhecido: {motor!r} (opções: {', '.join(MOTORES_LEITURA)})")
+    if filtro is not None and not filtro.ativo:
+        filtro = None
+    if filtro is not None and motor == 'c':
+        return ler_filtrado(caminho, filtro, colunas, motor)
+    argumentos = _argumentos_leitura(_com_colunas_filtro(colunas, filtro))
+    if motor == 'pyarrow' and pyarrow_disponivel():
+        if filtro is not None:
+            return _ler_pyarrow_filtrado(caminho, filtro, colunas)
+        return pd.read_csv(caminho, engine='pyarrow', **argumentos)
+    if motor in ('pyarrow', 'paralelo'):
+        return _ler_csv_paralelo(caminho, argumentos, workers, filtro, colunas)
+    return pd.read_csv(caminho, **argumentos)
+
+def ler_em_lotes(caminho, colunas=None, tamanho_lote=100_000):
+    """Lê um CSV de enchentes (plano ou comprimido) em lotes de `tamanho_lote` linhas, sem carregá-lo inteiro"""
+    with pd.read_csv(caminho, chunksize=tamanho_lote, **_argumentos_leitura(colunas)) as leitor:
+        for lote in leitor:
+            yield lote
+
+# Tabela de referência de população (IBGE), uma linha por município
+ARQUIVO_POPULACAO = 'populacao_ibge.csv'
+
+def ler_populacao(caminho):
+    """Lê a tabela de região, população e domicílios por município, indexada por cidade"""
+    return pd.read_csv(caminho, dtype={'cidade': 'object', 'regiao': 'object', 'codigo_ibge': 'int64',
+                                       'populacao': 'int64', 'domicilios': 'int64'}).set_index('cidade')
+
+# ----------------------------------------------------------------------
+# Layout particionado
+# ----------------------------------------------------------------------
+
+COLUNAS_PARTICAO = ('ano', 'regiao')
+ARQUIVO_PARTICAO = 'dados.csv'
+
+def pasta_particionada(pasta_dados, arquivo):
+    """Pasta do dataset particionado correspondente a um CSV (enchentes_rs.csv → enchentes_rs/)"""
+    return os.path.join(pasta_dados, os.path.splitext(arquivo)[0])
+
+def listar_particoes(raiz):
+    """Lista (valores, caminho) de cada arquivo sob diretórios `chave=valor`"""
+    particoes = []
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        subpastas.sort()
+        relativo = os.path.relpath(pasta, raiz)
+        valores = {}
+        if relativo != os.curdir:
+            for parte in relativo.split(os.sep):
+                chave, _, valor = parte.partition('=')
+                valores[chave] = unquote(valor)
+        for arquivo in sorted(arquivos):
+            if arquivo.endswith('.csv') or (comprimido(arquivo) and '.csv.' in arquivo):
+                particoes.append((valores, os.path.join(pasta, arquivo)))
+    return particoes
+
+def _aceita(valores, anos, regioes):
+    """Poda: a partição só é lida se casar com os filtros informados"""
+    if anos is not None and 'ano' in valores and int(valores['ano']) not in anos:
+        return False
+    if regioes is not None and 'regiao' in valores and valores['regiao'] not in regioes:
+        return False
+    return True
+
+def arquivos_dataset(pasta_dados, arquivo, anos=None, regioes=None, filtro=None):
+    """
+    Arquivos a ler para um dataset: as partições que sobrevivem à poda, se a pasta
+    particionada existir, ou o CSV plano (ou comprimido) caso contrário
+    """
+    raiz = pasta_particionada(pasta_dados, arquivo)
+    if os.path.isdir(raiz):
+        return [caminho for valores, caminho in listar_particoes(raiz)
+                if _aceita(valores, anos, regioes) and (filtro is None or filtro.aceita_particao(valores))]
+    return [localizar_csv(pasta_dados, arquivo)]
+
+def ler_dataset(pasta_dados, arquivo, anos=None, regioes=None, leitor=pd.read_csv, filtro=None, **kwargs):
+    """
+    Lê um dataset (plano ou particionado) arquivo a arquivo com `leitor` (ex.: ler_csv).
+    Com `filtro`, as partições são podadas por ele e cada arquivo é lido com ler_filtrado.
+    """
+    caminhos = arquivos_dataset(pasta_dados, arquivo, anos, regioes, filtro)
+    if not caminhos:
+        # Nenhuma partição casou: DataFrame vazio com as colunas e os tipos do dataset
+        todas = listar_particoes(pasta_particionada(pasta_dados, arquivo))
+        if not todas:
+            return pd.DataFrame()
+        vazio = pd.read_csv(todas[0][1], nrows=0)
+        return vazio.astype({c: t for c, t in TIPOS_COLUNAS.items() if c in vazio.columns})
+    if filtro is not None and filtro.ativo:
+        partes = [ler_filtrado(caminho, filtro, **kwargs) for caminho in caminhos]
+    else:
+        partes = [leitor(caminho, **kwargs) for caminho in caminhos]
+    return partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+
+# ----------------------------------------------------------------------
+# Filtros empurrados para a leitura
+# ----------------------------------------------------------------------
+
+# Linhas por lote na leitura filtrada: só o lote corrente e as linhas aceitas ficam em memória
+TAMANHO_LOTE_FILTRO = 200_000
+
+# Bytes por bloco do leitor em fluxo do pyarrow na leitura filtrada
+TAMANHO_BLOCO_PYARROW = 4 * 1024 * 1024
+
+COLUNAS_LIMITES = tuple(c for c, t in TIPOS_COLUNAS.items() if t in ('int64', 'float64'))
+
+class FiltroLinhas:
+    """
+    Predicados sobre as linhas dos datasets: intervalo de datas, cidades, regiões, anos
+    e faixas [mínimo, máximo] de colunas numéricas (None deixa o lado aberto). Anos,
+    regiões e datas podam partições inteiras; o resto é aplicado lote a lote durante a
+    leitura, de modo que linhas rejeitadas nunca chegam ao DataFrame completo.
+    """
+
+    def __init__(self, inicio=None, fim=None, cidades=None, regioes=None, anos=None, limites=None):
+        self.inicio = None if inicio is None else pd.Timestamp(inicio)
+        self.fim = None if fim is None else pd.Timestamp(fim)
+        if self.inicio is not None and self.fim is not None and self.inicio > self.fim:
+            raise ValueError(f"Início depois do fim: {self.inicio.date()} > {self.fim.date()}")
+        self.cidades = None if cidades is None else sorted(set(cidades))
+        self.regioes = None if regioes is None else sorted(set(regioes))
+        self.anos = None if anos is None else sorted({int(a) for a in anos})
+        self.limites = {}
+        for coluna, (minimo, maximo) in sorted((limites or {}).items()):
+            if coluna not in COLUNAS_LIMITES:
+                raise ValueError(f"Limite em coluna não numérica: {coluna!r} (opções: {', '.join(COLUNAS_LIMITES)})")
+            self.limites[coluna] = (minimo, maximo)
+
+    def __repr__(self):
+        campos = [f'{nome}={valor!r}' for nome, valor in vars(self).items() if valor not in (None, {})]
+        return f"FiltroLinhas({', '.join(campos)})"
+
+    @property
+    def ativo(self):
+        return any(valor not in (None, {}) for valor in vars(self).values())
+
+    @property
+    def colunas(self):
+        """Colunas lidas para avaliar o filtro"""
+        colunas = ['data'] if self.inicio is not None or self.fim is not None or self.anos is not None else []
+        colunas += ['cidade'] if self.cidades is not None else []
+        colunas += ['regiao'] if self.regioes is not None else []
+        return colunas + list(self.limites)
+
+    def aceita_particao(self, valores):
+        """Poda por ano (lista de anos e intervalo de datas) e por região"""
+        if not _aceita(valores, self.anos, self.regioes):
+            return False
+        if 'ano' in valores:
+            ano = int(valores['ano'])
+            if (self.inicio is not None and ano < self.inicio.year) or (self.fim is not None and ano > self.fim.year):
+                return False
+        return True
+
+    def mascara(self, df):
+        """Linhas de `df` que passam por todos os predicados (datas inválidas não passam por filtros de data)"""
+        aceitas = np.ones(len(df), dtype=bool)
+        if 'data' in self.colunas:
+            datas = df['data'] if pd.api.types.is_datetime64_any_dtype(df['data']) else \
+                pd.to_datetime(df['data'], errors='coerce')
+            if self.inicio is not None:
+                aceitas &= (datas >= self.inicio).to_numpy()
+            if self.fim is not None:
+                aceitas &= (datas <= self.fim).to_numpy()
+            if self.anos is not None:
+                aceitas &= datas.dt.year.isin(self.anos).to_numpy()
+        if self.cidades is not None:
+            aceitas &= df['cidade'].isin(self.cidades).to_numpy()
+        if self.regioes is not None:
+            aceitas &= df['regiao'].isin(self.regioes).to_numpy()
+        for coluna, (minimo, maximo) in self.limites.items():
+            valores = pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype=np.float64)
+            if minimo is not None:
+                aceitas &= valores >= minimo
+            if maximo is not None:
+                aceitas &= valores <= maximo
+        return aceitas
+
+    def aplicar(self, df):
+        return df[self.mascara(df)] if self.ativo else df
+
+    def descrever(self):
+        partes = []
+        if self.inicio is not None or self.fim is not None:
+            inicio = self.inicio.date() if self.inicio is not None else '…'
+            fim = self.fim.date() if self.fim is not None else '…'
+            partes.append(f"datas {inicio} a {fim}")
+        if self.anos is not None:
+            partes.append(f"anos {', '.join(map(str, self.anos))}")
+        if self.regioes is not None:
+            partes.append(f"regiões {', '.join(self.regioes)}")
+        if self.cidades is not None:
+            partes.append(f"{len(self.cidades)} cidades")
+        for coluna, (minimo, maximo) in self.limites.items():
+            partes.append(f"{'' if minimo is None else f'{minimo:g} ≤ '}{coluna}{'' if maximo is None else f' ≤ {maximo:g}'}")
+        return f"🔎 Filtro: {'; '.join(partes) if partes else 'nenhum'}"
+
+def limites_por_coluna(minimos=(), maximos=()):
+    """Limites de FiltroLinhas a partir de textos 'coluna=valor' (ex.: --minimo altura_rio_metros=5)"""
+    limites = {}
+    for lado, textos in enumerate((minimos, maximos)):
+        for texto in textos:
+            coluna, separador, valor = texto.partition('=')
+            if not separador:
+                raise ValueError(f"Limite inválido: {texto!r} (use coluna=valor)")
+            faixa = list(limites.get(coluna.strip(), (None, None)))
+            faixa[lado] = float(valor)
+            limites[coluna.strip()] = tuple(faixa)
+    return limites
+
+def _ler_pyarrow_filtrado(caminho, filtro, colunas=None, tamanho_bloco=TAMANHO_BLOCO_PYARROW):
+    """
+    Leitura em fluxo do pyarrow (pyarrow.csv.open_csv) com `filtro` aplicado a cada lote
+    de registros ao chegar, com os tipos do esquema fixados para todos os blocos
+    """
+    if comprimido(caminho):
+        # O leitor em fluxo do pyarrow não descomprime .xz: usa os lotes do motor C
+        return ler_filtrado(caminho, filtro, colunas, 'c')
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    leitura = _com_colunas_filtro(colunas, filtro)
+    argumentos = _argumentos_leitura(leitura)
+    tipos_arrow = {'int64': pa.int64(), 'float64': pa.float64(), 'object': pa.string()}
+    # Datas chegam como texto e são convertidas como no motor C
+    tipos = {coluna: tipos_arrow[tipo] for coluna, tipo in argumentos['dtype'].items()}
+    tipos.update({coluna: pa.string() for coluna in argumentos['parse_dates']})
+    conversao = pa_csv.ConvertOptions(column_types=tipos, include_columns=list(leitura or []))
+    partes = []
+    with pa_csv.open_csv(caminho, read_options=pa_csv.ReadOptions(block_size=tamanho_bloco),
+                         convert_options=conversao) as leitor:
+        for registros in leitor:
+            lote = registros.to_pandas()
+            for coluna in argumentos['parse_dates']:
+                lote[coluna] = pd.to_datetime(lote[coluna])
+            # Como no pd.read_csv, tipos de colunas que o arquivo não tem são ignorados
+            lote = lote.astype({coluna: tipo for coluna, tipo in argumentos['dtype'].items() if coluna in lote.columns})
+            partes.append(_filtrar(lote, filtro, colunas))
+    if not partes:
+        return _filtrar(pd.read_csv(caminho, nrows=0, **argumentos), filtro, colunas)
+    return partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+
+def ler_filtrado(caminho, filtro, colunas=None, motor=None, tamanho_lote=TAMANHO_LOTE_FILTRO, workers=None):
+    """
+    Lê só as linhas de um CSV que passam por `filtro`. Com motor None lê sem tipos
+    forçados, como pd.read_csv; o motor paralelo filtra cada faixa de bytes na sua
+    thread e o pyarrow filtra cada lote do seu leitor em fluxo.
+    """
+    if motor in ('pyarrow', 'paralelo'):
+        return ler_csv(caminho, colunas, motor, workers, filtro)
+    if motor is not None and motor not in MOTORES_LEITURA:
+        raise ValueError(f"Motor de leitura desconhecido: {motor!r} (opções: {', '.join(MOTORES_LEITURA)})")
+    leitura = _com_colunas_filtro(colunas, filtro)
+    argumentos = {'usecols': leitura} if motor is None else _argumentos_leitura(leitura)
+    with pd.read_csv(caminho, chunksize=tamanho_lote, **argumentos) as leitor:
+        partes = [_filtrar(lote, filtro, colunas) for lote in leitor]
+    if not partes:
+        return _filtrar(pd.read_csv(caminho, nrows=0, **argumentos), filtro, colunas)
+    return partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+
+def particionar_csv(caminho, destino, tamanho_lote=100_000):
+    """
+    Converte um CSV (plano ou comprimido) para o layout particionado por ano e região, lendo em lotes.
+    O conteúdo anterior de `destino` é substituído.
+    """
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    com_cabecalho = set()
+    linhas = 0
+    with pd.read_csv(caminho, chunksize=tamanho_lote) as leitor:
+        for lote in leitor:
+            anos = pd.to_datetime(lote['data']).dt.year
+            for (ano, regiao), parte in lote.groupby([anos, lote['regiao']], sort=False):
+                pasta = os.path.join(destino, f'ano={ano}', f"regiao={quote(str(regiao), safe='')}")
+                arquivo = os.path.join(pasta, ARQUIVO_PARTICAO)
+                if arquivo not in com_cabecalho:
+                    os.makedirs(pasta, exist_ok=True)
+                parte.to_csv(arquivo, mode='a', index=False, header=arquivo not in com_cabecalho)
+                com_cabecalho.add(arquivo)
+            linhas += len(lote)
+    return linhas, len(com_cabecalho)
+
+def csv_sintetico(caminho, n_registros, n_cidades=497, semente=0):
+    """Grava um CSV com o esquema dos dados de enchentes e `n_registros` linhas fictícias"""
+    rng = np.random.default_rng(semente)
+    indices = np.arange(n_registros) % n_cidades
+    regioes = np.array(REGIOES, dtype=object)
+    pd.DataFrame({
+        'data': pd.Timestamp('2000-01-01') + pd.to_timedelta(np.arange(n_registros) // n_cidades, unit='D'),
+        'regiao': regioes[indices % len(REGIOES)],
+        'cidade': np.char.add('Cidade ', indices.astype(str)).astype(object),
+        'mortes': rng.poisson(0.01, n_registros),
+        'feridos': rng.poisson(0.2, n_registros),
+        'desalojados': rng.poisson(30, n_registros),
+        'prejuizo_milhoes': rng.gamma(1.0, 2.0, n_registros).round(2),
+        'altura_rio_metros': rng.uniform(1.0, 9.0, n_registros).round(2),
+        'chuva_24h_mm': rng.gamma(0.6, 25.0, n_registros).round(1),
+        'status_emergencia': np.where(rng.random(n_registros) < 0.05, 'Emergência', 'Normal'),
+    }).to_csv(caminho, index=False)
+
+def benchmark_leitura(n_registros=2_000_000, workers=None, caminho=None):
+    """
+    Compara a vazão dos motores de leitura sobre um CSV grande (sintético, se `caminho`
+    não for informado) e confere se todos devolvem o mesmo DataFrame que o motor C
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        if caminho is None:
+            caminho = os.path.join(pasta, 'sintetico.csv')
+            csv_sintetico(caminho, n_registros)
+        megabytes = os.path.getsize(caminho) / 1e6
+
+        resultados, referencia = [], None
+        for motor in MOTORES_LEITURA:
+            inicio = time.perf_counter()
+            df = ler_csv(caminho, motor=motor, workers=workers)
+            duracao = time.perf_counter() - inicio
+            if referencia is None:
+                referencia = df
+            resultados.append({
+                'motor': motor if motor != 'pyarrow' or pyarrow_disponivel() else 'pyarrow→paralelo',
+                'registros': len(df),
+                'segundos': duracao,
+                'mb_por_segundo': megabytes / duracao,
+                'registros_por_segundo': len(df) / duracao,
+                'identico': df.equals(referencia) and (df.dtypes == referencia.dtypes).all(),
+            })
+    return pd.DataFrame(resultados)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Ferramentas de leitura dos datasets de enchentes')
+    parser.add_argument('--particionar', action='store_true',
+                        help='converte os CSVs planos para o layout particionado por ano e região')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='compara a vazão dos motores de leitura em um CSV grande')
+    parser.add_argument('--registros', type=int, default=2_000_000, help='linhas do CSV sintético do benchmark')
+    parser.add_argument('--workers', type=int, default=None, help='threads do motor paralelo')
+    parser.add_argument('--dados', default='data', help='pasta dos CSVs (padrão: data)')
+    parser.add_argument('arquivos', nargs='*', default=['enchentes_rs.csv', 'enchente_2024_detalhado.csv'])
+    args = parser.parse_args()
+
+    if not (args.particionar or args.benchmark):
+        parser.print_help()
+        return
+
+    try:
+        if args.benchmark:
+            print("⏱️ BENCHMARK DOS MOTORES DE LEITURA")
+            print("=" * 50)
+            resultado = benchmark_leitura(args.registros, args.workers)
+            print(resultado.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+            return
+
+        print("🗂️ PARTICIONANDO DATASETS POR ANO E REGIÃO")
+        print("=" * 50)
+        for arquivo in args.arquivos:
+            destino = pasta_particionada(args.dados, arquivo)
+            linhas, particoes = particionar_csv(localizar_csv(args.dados, arquivo), destino)
+            print(f"   ✅ {arquivo}: {linhas} registros em {particoes} partições → {destino}/")
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mapa de Calor Cidade × Dia
+Chuva, altura do rio e desalojados de todos os municípios em um período, com a base
+pivotada uma única vez em matrizes cidade × dia e cada painel desenhado por uma só
+imagem (imshow): o custo do gráfico não cresce com o número de cidades como o de
+uma linha por cidade
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.dates as mdates
+
+if not __package__:
+    # Executado como script (python src/mapa_calor.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+from .defasagem import grade_diaria
+
+COLUNAS_MAPA = ['altura_rio_metros', 'chuva_24h_mm', 'desalojados']
+TITULOS = {'altura_rio_metros': 'Altura do rio (m)', 'chuva_24h_mm': 'Chuva em 24h (mm)',
+           'desalojados': 'Desalojados'}
+MAPAS_CORES = {'altura_rio_metros': 'YlGnBu', 'chuva_24h_mm': 'Blues', 'desalojados': 'Reds'}
+
+# Cor das células sem registro
+COR_AUSENTE = '#eeeeee'
+
+# Percentil usado como topo da escala de cores (um pico isolado não apaga o resto do mapa)
+PERCENTIL_ESCALA = 99
+
+# Acima deste número de cidades só parte dos nomes é escrita no eixo
+MAXIMO_ROTULOS = 60
+
+TAMANHO_FIGURA = (18, 10)
+
+def matrizes_periodo(df, inicio=None, fim=None, colunas=COLUNAS_MAPA, ordenar_por='altura_rio_metros'):
+    """
+    Matrizes cidade × dia de `colunas` entre `inicio` e `fim` (datas inclusivas), com as
+    cidades ordenadas pelo máximo de `ordenar_por` (decrescente) ou por nome (None).
+    Retorna (cidades, dias, {coluna: matriz}).
+    """
+    datas = df['data']
+    selecao = datas.notna()
+    if inicio is not None:
+        selecao &= datas >= pd.Timestamp(inicio)
+    if fim is not None:
+        selecao &= datas <= pd.Timestamp(fim)
+    cidades, dias, matrizes = grade_diaria(df[selecao], colunas)
+    if ordenar_por is not None and len(cidades) and len(dias):
+        matriz = matrizes[ordenar_por]
+        picos = np.where(np.isnan(matriz), -np.inf, matriz).max(axis=1)
+        ordem = np.argsort(-picos, kind='stable')
+        cidades = cidades[ordem]
+        matrizes = {coluna: m[ordem] for coluna, m in matrizes.items()}
+    return cidades, dias, matrizes
+
+def desenhar_mapa_calor(figura, cidades, dias, matrizes, titulo=None):
+    """Um painel por coluna de `matrizes` em `figura`, cada um com uma única imagem; retorna os eixos"""
+    colunas = list(matrizes)
+    eixos = figura.subplots(1, len(colunas), sharey=True, squeeze=False)[0]
+    if titulo:
+        figura.suptitle(titulo, fontsize=16, fontweight='bold')
+    if len(cidades) == 0 or len(dias) == 0:
+        eixos[0].text(0.5, 0.5, 'Sem registros no período', ha='center', va='center', transform=eixos[0].transAxes)
+        return eixos
+
+    # Células centradas nos dias (datas do matplotlib) e nas linhas das cidades
+    numeros = mdates.date2num(dias.to_numpy())
+    extensao = (numeros[0] - 0.5, numeros[-1] + 0.5, len(cidades) - 0.5, -0.5)
+    for eixo, coluna in zip(eixos, colunas):
+        matriz = matrizes[coluna]
+        validos = matriz[~np.isnan(matriz)]
+        base, topo = 0.0, 1.0
+        if len(validos):
+            # Contagens e chuva partem do zero; o rio, do menor nível observado
+            base = validos.min() if coluna == 'altura_rio_metros' else min(validos.min(), 0.0)
+            topo = np.percentile(validos, PERCENTIL_ESCALA)
+        mapa = matplotlib.colormaps[MAPAS_CORES.get(coluna, 'viridis')].with_extremes(bad=COR_AUSENTE)
+        imagem = eixo.imshow(matriz, aspect='auto', interpolation='nearest', cmap=mapa, extent=extensao,
+                             vmin=base, vmax=max(topo, base + 1e-9))
+        figura.colorbar(imagem, ax=eixo, orientation='horizontal', pad=0.08, fraction=0.04)
+        eixo.set_title(TITULOS.get(coluna, coluna))
+        eixo.xaxis_date()
+        localizador = mdates.AutoDateLocator(maxticks=8)
+        eixo.xaxis.set_major_locator(localizador)
+        eixo.xaxis.set_major_formatter(mdates.ConciseDateFormatter(localizador))
+
+    passo = max(1, int(np.ceil(len(cidades) / MAXIMO_ROTULOS)))
+    posicoes = np.arange(0, len(cidades), passo)
+    eixos[0].set_yticks(posicoes)
+    eixos[0].set_yticklabels([str(cidades[i]) for i in posicoes], fontsize=8 if passo == 1 else 7)
+    eixos[0].set_ylabel('Cidade' if passo == 1 else f'Cidade (1 a cada {passo} nomes)')
+    return eixos
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Mapa de calor cidade × dia de chuva, rio e desalojados')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--arquivo', default='enchente_2024_detalhado.csv', help='dataset do mapa')
+    parser.add_argument('--inicio', help='primeiro dia (AAAA-MM-DD)')
+    parser.add_argument('--fim', help='último dia (AAAA-MM-DD)')
+    parser.add_argument('--ordenar', default='altura_rio_metros', choices=COLUNAS_MAPA + ['nome'],
+                        help='ordem das cidades: pelo pico da coluna ou por nome')
+    parser.add_argument('--saida', default='outputs/mapa_calor.png')
+    parser.add_argument('--dpi', type=int, default=150)
+    args = parser.parse_args()
+
+    try:
+        from .leitura import ler_dataset
+
+        df = ler_dataset(args.dados, args.arquivo)
+        df['data'] = pd.to_datetime(df['data'], errors='coerce')
+
+        inicio = time.perf_counter()
+        cidades, dias, matrizes = matrizes_periodo(df, args.inicio, args.fim,
+                                                   ordenar_por=None if args.ordenar == 'nome' else args.ordenar)
+        pivo = time.perf_counter() - inicio
+
+        figura = Figure(figsize=TAMANHO_FIGURA)
+        FigureCanvasAgg(figura)
+        desenhar_mapa_calor(figura, cidades, dias, matrizes, f'Cidades × dias ({len(cidades)} municípios)')
+        os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+        inicio = time.perf_counter()
+        figura.savefig(args.saida, dpi=args.dpi)
+        renderizacao = time.perf_counter() - inicio
+
+        print(f"🗓️ MAPA DE CALOR ({len(cidades):,} cidades × {len(dias):,} dias)")
+        print("=" * 50)
+        print(f"⚡ Matrizes em {pivo * 1000:.0f} ms, figura em {renderizacao * 1000:.0f} ms → {args.saida}")
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orçamento de Memória
+Estima a memória que os dados ocuparão (tamanho dos arquivos e esquema de uma
+amostra) antes de carregá-los e escolhe entre a carga inteira e a leitura em lotes,
+com o tamanho de lote que cabe no orçamento. Em lotes, a base geral é resumida em
+um estado compacto do qual saem os mesmos agregados da carga em memória.
+"""
+
+import os
+import sys
+import re
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: sem medição do pico
+    resource = None
+
+if not __package__:
+    # Executado como script (python src/memoria.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+from .leitura import COLUNA_PREJUIZO_FIXO, comprimido, prejuizo_ponto_fixo
+from .episodios import segmentar_episodios, mesclar_episodios
+from .ranking import METRICAS_PLACAR, TAMANHO_PLACAR, Placar
+from .validacao import COLUNAS_RELATORIO, LINHAS_EXEMPLO, validar_dataframe
+
+# Linhas lidas do início dos arquivos para medir bytes por linha no CSV e em memória
+LINHAS_AMOSTRA = 10_000
+
+# Razão de descompressão suposta para .gz/.xz/.zst (texto CSV numérico comprime ~5x)
+FATOR_COMPRESSAO = 5.0
+
+# Memória de trabalho sobre os dados: cópias de groupby, colunas de população, datas
+FATOR_TRABALHO = 2.5
+
+# Por lote o trabalho é maior: validação, cubo, episódios e amostra sobre cada lote
+FATOR_TRABALHO_LOTE = 4.0
+
+# Folga para o estado da leitura em lotes (cubo, placar, episódios, amostra)
+RESERVA_ESTADO_BYTES = 64 * 2**20
+
+# Renderizar uma figura (pyplot, PNG em alta resolução) custa o mesmo com qualquer volume de dados
+RESERVA_GRAFICOS_BYTES = 128 * 2**20
+
+LOTE_MINIMO = 10_000
+LOTE_MAXIMO = 1_000_000
+
+UNIDADES = {'': 2**20, 'K': 2**10, 'M': 2**20, 'G': 2**30, 'T': 2**40}
+
+def interpretar_tamanho(texto):
+    """'512' (MB), '512M', '1.5G', '2GB' → bytes"""
+    casamento = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?)i?B?\s*', str(texto), re.IGNORECASE)
+    if not casamento:
+        raise ValueError(f"Tamanho inválido: {texto!r} (ex.: 512M, 2G)")
+    return int(float(casamento.group(1)) * UNIDADES[casamento.group(2).upper()])
+
+def formatar_bytes(n):
+    return f"{n / 2**20:,.0f} MB" if n < 2**30 else f"{n / 2**30:,.2f} GB"
+
+def memoria_atual():
+    """Memória residente do processo agora (None fora do Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def pico_memoria():
+    """Maior memória residente do processo até agora (None onde não há `resource`)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+class Estimativa(namedtuple('Estimativa', ['arquivos', 'bytes_arquivos', 'linhas', 'bytes_por_linha'])):
+    """Tamanho previsto de um dataset carregado inteiro"""
+
+    @property
+    def bytes_memoria(self):
+        return int(self.linhas * self.bytes_por_linha)
+
+def estimar_dataset(caminhos, linhas_amostra=LINHAS_AMOSTRA):
+    """
+    Estima linhas e memória de um dataset sem lê-lo: uma amostra do início dos
+    arquivos dá os bytes por linha no CSV e em memória (com a data convertida), e o
+    tamanho dos arquivos (descomprimido, por estimativa) dá o número de linhas
+    """
+    caminhos = [c for c in caminhos if os.path.exists(c)]
+    texto = sum(os.path.getsize(c) * (FATOR_COMPRESSAO if comprimido(c) else 1) for c in caminhos)
+    amostras, lidos = [], 0
+    for caminho in caminhos:
+        if lidos >= linhas_amostra:
+            break
+        amostra = pd.read_csv(caminho, nrows=linhas_amostra - lidos)
+        amostras.append(amostra)
+        lidos += len(amostra)
+    if not lidos:
+        return Estimativa(len(caminhos), int(texto), 0, 0.0)
+
+    amostra = pd.concat(amostras, ignore_index=True)
+    bytes_texto = len(amostra.to_csv(index=False, header=False).encode()) / lidos
+    if 'data' in amostra.columns:
+        amostra['data'] = pd.to_datetime(amostra['data'], errors='coerce')
+    bytes_memoria = amostra.memory_usage(deep=True).sum() / lidos
+    # A amostra cobriu todos os arquivos: a contagem é exata
+    completa = len(amostras) == len(caminhos) and lidos < linhas_amostra
+    linhas = lidos if completa else int(texto / bytes_texto)
+    return Estimativa(len(caminhos), int(texto), linhas, bytes_memoria)
+
+class Plano(namedtuple('Plano', ['modo', 'tamanho_lote', 'necessario_bytes', 'disponivel_bytes',
+                                 'orcamento_bytes', 'estimativa'])):
+    """Como a base geral será processada: 'memoria' (inteira) ou 'lotes'"""
+
+    def descrever(self):
+        linhas = f"~{self.estimativa.linhas:,} linhas em {self.estimativa.arquivos} arquivo(s)"
+        cabe = (f"precisa de ~{formatar_bytes(self.necessario_bytes)}, "
+                f"disponível {formatar_bytes(max(self.disponivel_bytes, 0))} "
+                f"do orçamento de {formatar_bytes(self.orcamento_bytes)}")
+        if self.modo == 'memoria':
+            return f"🧠 Plano de memória: carga inteira ({linhas}; {cabe})"
+        texto = f"🧠 Plano de memória: lotes de {self.tamanho_lote:,} linhas ({linhas}; {cabe})"
+        minimo = RESERVA_ESTADO_BYTES + LOTE_MINIMO * self.estimativa.bytes_por_linha * FATOR_TRABALHO_LOTE
+        if self.disponivel_bytes < minimo:
+            texto += "\n⚠️ Orçamento abaixo do necessário até para o menor lote: o pico deve ultrapassá-lo"
+        return texto
+
+def planejar(estimativa, orcamento_bytes, fixo_bytes=0, base_bytes=0):
+    """
+    Escolhe o modo e o tamanho do lote da base geral. `fixo_bytes` é o que fica em
+    memória de qualquer forma (base de 2024) e `base_bytes` o que o processo já ocupa.
+    """
+    disponivel = orcamento_bytes - base_bytes - fixo_bytes
+    necessario = int(estimativa.bytes_memoria * FATOR_TRABALHO)
+    if necessario <= disponivel:
+        return Plano('memoria', None, necessario, disponivel, orcamento_bytes, estimativa)
+    por_linha = max(estimativa.bytes_por_linha, 1.0) * FATOR_TRABALHO_LOTE
+    lote = int((disponivel - RESERVA_ESTADO_BYTES) / por_linha)
+    lote = min(max(lote, LOTE_MINIMO), LOTE_MAXIMO)
+    return Plano('lotes', lote, necessario, disponivel, orcamento_bytes, estimativa)
+
+# ----------------------------------------------------------------------
+# Estado da leitura em lotes
+# ----------------------------------------------------------------------
+
+CHAVES_CUBO = ['ano', 'mes', 'regiao', 'cidade']
+EPOCA = pd.Timestamp('1970-01-01')
+
+class AcumuladorLotes:
+    """
+    Resumo da base geral alimentado lote a lote, de tamanho independente do número
+    de linhas: um cubo (ano, mês, região, cidade) com contagem, somas, máximos e
+    datas extremas; momentos por coluna (descrição) e das linhas completas (correlação); uma amostra uniforme
+    (reservatório por chaves aleatórias); o placar top-K; a tabela de episódios,
+    mesclada entre lotes; e o relatório de validação. Com `escala_prejuizo` o cubo
+    também soma o prejuízo em ponto fixo (int64), com totais iguais aos da carga inteira.
+    """
+
+    def __init__(self, colunas_numericas, referencia=None, validar=True, tamanho_amostra=5000, semente=0,
+                 escala_prejuizo=None):
+        self.colunas_numericas = list(colunas_numericas)
+        self.escala_prejuizo = escala_prejuizo
+        self.referencia = referencia
+        self.validar = validar
+        self.tamanho_amostra = tamanho_amostra
+        self.registros = 0
+        self.lotes = 0
+        self.colunas = None
+        self.cubo = None
+        self.amostra = None
+        self.episodios = None
+        self.placar = Placar(TAMANHO_PLACAR, METRICAS_PLACAR, escala_prejuizo)
+        k = len(self.colunas_numericas)
+        self.n_momentos = 0
+        self.somas = np.zeros(k)
+        self.produtos = np.zeros((k, k))
+        # Por coluna, ignorando só os NaN da própria coluna, como DataFrame.describe()
+        self.contagens = np.zeros(k)
+        self.somas_colunas = np.zeros(k)
+        self.quadrados = np.zeros(k)
+        self.minimos = np.full(k, np.inf)
+        self.maximos = np.full(k, -np.inf)
+        # Datas em segundos desde a época (exatos em float64 para datas inteiras)
+        self.datas_validas = 0
+        self.soma_datas = 0.0
+        self.registros_cidade = None
+        self._relatorios = []
+        self._com_erros = False
+        self._rng = np.random.default_rng(semente)
+
+    def adicionar(self, lote):
+        """Incorpora um lote (com `data` já convertida para datetime)"""
+        lote = lote.reset_index(drop=True)
+        if self.colunas is None:
+            self.colunas = list(lote.columns)
+        if self.validar:
+            relatorio = validar_dataframe(lote, self.referencia)
+            # Posições de exemplo relativas ao arquivo inteiro, não ao lote
+            relatorio['linhas_exemplo'] = [[self.registros + i for i in exemplos]
+                                           for exemplos in relatorio['linhas_exemplo']]
+            self._relatorios.append(relatorio)
+            if (relatorio['severidade'] == 'erro').any():
+                # A carga vai falhar com ErroValidacao; só falta reunir o relatório
+                self._com_erros = True
+        if not self._com_erros:
+            # Depois da validação: valores inválidos no prejuízo já foram relatados
+            if self.escala_prejuizo is not None:
+                lote = prejuizo_ponto_fixo(lote, self.escala_prejuizo)
+            self._acumular_cubo(lote)
+            self._acumular_momentos(lote)
+            self._acumular_amostra(lote)
+            self.placar.adicionar_lote(lote)
+            episodios = segmentar_episodios(lote, escala_prejuizo=self.escala_prejuizo)
+            if self.episodios is None or self.episodios.empty:
+                self.episodios = episodios
+            elif not episodios.empty:
+                self.episodios = mesclar_episodios(pd.concat([self.episodios, episodios], ignore_index=True),
+                                                   escala_prejuizo=self.escala_prejuizo)
+        self.registros += len(lote)
+        self.lotes += 1
+        return self
+
+    def _acumular_cubo(self, lote):
+        datas = lote['data']
+        chaves = [datas.dt.year.rename('ano'), datas.dt.month.rename('mes'), lote['regiao'], lote['cidade']]
+        colunas = {'registros': ('data', 'size'), 'data_min': ('data', 'min'), 'data_max': ('data', 'max')}
+        for coluna in self.colunas_numericas:
+            colunas[f'{coluna}_soma'] = (coluna, 'sum')
+            colunas[f'{coluna}_n'] = (coluna, 'count')
+            colunas[f'{coluna}_max'] = (coluna, 'max')
+        if self.escala_prejuizo is not None:
+            colunas[f'{COLUNA_PREJUIZO_FIXO}_soma'] = (COLUNA_PREJUIZO_FIXO, 'sum')
+        cubo = lote.groupby(chaves, sort=False, observed=True).agg(**colunas)
+        if self.cubo is not None:
+            cubo = pd.concat([self.cubo, cubo]).groupby(level=CHAVES_CUBO, sort=False).agg(
+                {coluna: self._combinacao(coluna) for coluna in cubo.columns})
+        self.cubo = cubo
+
+    @staticmethod
+    def _combinacao(coluna):
+        return 'min' if coluna.endswith('_min') else 'max' if coluna.endswith('_max') else 'sum'
+
+    def _acumular_momentos(self, lote):
+        valores = lote[self.colunas_numericas].to_numpy(dtype=np.float64)
+        ausentes = np.isnan(valores)
+        self.contagens += (~ausentes).sum(axis=0)
+        self.somas_colunas += np.where(ausentes, 0.0, valores).sum(axis=0)
+        self.quadrados += np.where(ausentes, 0.0, valores * valores).sum(axis=0)
+        # Com `initial`, coluna só com NaN no lote deixa o extremo acumulado como está
+        self.minimos = np.fmin(self.minimos, np.nanmin(valores, axis=0, initial=np.inf))
+        self.maximos = np.fmax(self.maximos, np.nanmax(valores, axis=0, initial=-np.inf))
+        cidades = lote['cidade'].value_counts()
+        self.registros_cidade = cidades if self.registros_cidade is None else \
+            self.registros_cidade.add(cidades, fill_value=0)
+        datas = lote['data'].dropna()
+        self.datas_validas += len(datas)
+        self.soma_datas += (datas - EPOCA).dt.total_seconds().sum()
+
+        completas = valores[~ausentes.any(axis=1)]
+        self.n_momentos += len(completas)
+        self.somas += completas.sum(axis=0)
+        self.produtos += completas.T @ completas
+
+    def _acumular_amostra(self, lote):
+        # As `tamanho_amostra` menores chaves uniformes formam uma amostra uniforme sem reposição
+        candidatos = lote[['data', 'cidade'] + self.colunas_numericas].assign(_chave=self._rng.random(len(lote)))
+        candidatos = candidatos.nsmallest(self.tamanho_amostra, '_chave')
+        if self.amostra is not None:
+            candidatos = pd.concat([self.amostra, candidatos]).nsmallest(self.tamanho_amostra, '_chave')
+        self.amostra = candidatos
+
+    # ------------------------------------------------------------------
+    # Agregados a partir do estado
+    # ------------------------------------------------------------------
+
+    def agrupar(self, chaves, funcoes):
+        """
+        Equivalente a df.groupby(chaves).agg(funcoes) na base inteira, para chaves entre
+        ano, mês, região e cidade e funções sum, max, mean ou first. Colunas fora do
+        cubo (população, domicílios) vêm da tabela de referência por cidade.
+        """
+        cubo = self.cubo.reset_index()
+        colunas = {}
+        for coluna, funcao in funcoes.items():
+            if funcao == 'first':
+                if coluna not in cubo.columns:
+                    origem = self.referencia[coluna] if self.referencia is not None else pd.Series(dtype='float64')
+                    cubo[coluna] = cubo['cidade'].map(origem)
+                colunas[coluna] = (coluna, 'first')
+            elif funcao == 'max':
+                colunas[coluna] = (f'{coluna}_max', 'max')
+            else:
+                colunas[coluna] = (f'{coluna}_soma', 'sum')
+            if funcao == 'mean':
+                # Média sobre os valores presentes, como em pandas: a soma já ignora os NaN
+                colunas[f'{coluna}_n'] = (f'{coluna}_n', 'sum')
+        agrupado = cubo.groupby(chaves).agg(**colunas)
+        contagens = [f'{coluna}_n' for coluna, funcao in funcoes.items() if funcao == 'mean']
+        for coluna in contagens:
+            agrupado[coluna[:-2]] = agrupado[coluna[:-2]] / agrupado[coluna]
+        return agrupado.drop(columns=contagens)
+
+    def resumo(self):
+        """Mesmo dicionário do agregado 'resumo' da carga em memória"""
+        cubo = self.cubo.reset_index()
+        return {
+            'inicio': cubo['data_min'].min(),
+            'fim': cubo['data_max'].max(),
+            'registros': self.registros,
+            'colunas': list(self.colunas or []),
+            'cidades': cubo['cidade'].nunique(),
+            'regioes': list(cubo['regiao'].unique()),
+            'mortes': cubo['mortes_soma'].sum(),
+            'feridos': cubo['feridos_soma'].sum(),
+            'desalojados': cubo['desalojados_soma'].sum(),
+            'prejuizo_milhoes': cubo['prejuizo_milhoes_soma'].sum(),
+            'altura_maxima': cubo['altura_rio_metros_max'].max(),
+            'chuva_maxima': cubo['chuva_24h_mm_max'].max(),
+        }
+
+    def _covariancia(self):
+        n = self.n_momentos
+        media = self.somas / n
+        return media, (self.produtos - n * np.outer(media, media)) / (n - 1)
+
+    def correlacao(self):
+        """Correlação de Pearson exata a partir dos momentos (linhas completas)"""
+        _, covariancia = self._covariancia()
+        desvio = np.sqrt(np.diag(covariancia))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlacao = covariancia / np.outer(desvio, desvio)
+        return pd.DataFrame(correlacao, index=self.colunas_numericas, columns=self.colunas_numericas)
+
+    def descricao(self):
+        """
+        Como DataFrame.describe() na base com população anexada: contagem, média, desvio
+        e extremos exatos por coluna (cada uma sem os próprios NaN); quartis da amostra.
+        Colunas da referência são pesadas pelo número de registros de cada cidade.
+        """
+        quartis = [0.25, 0.5, 0.75]
+        n = self.contagens
+        with np.errstate(divide='ignore', invalid='ignore'):
+            media = self.somas_colunas / n
+            desvio = np.sqrt(np.maximum(self.quadrados - n * media * media, 0.0) / (n - 1))
+        vazias = n == 0
+        estatisticas = {
+            coluna: [n[i], media[i], *([np.nan] * 5 if vazias[i] else [self.minimos[i], *valores, self.maximos[i]]),
+                     desvio[i]]
+            for i, (coluna, valores) in enumerate(
+                zip(self.colunas_numericas, self.amostra[self.colunas_numericas].quantile(quartis).T.to_numpy()))
+        }
+
+        if self.referencia is not None:
+            pesos = self.registros_cidade
+            for coluna in ('populacao', 'domicilios'):
+                if coluna not in self.referencia.columns:
+                    continue
+                valores = self.referencia[coluna].reindex(pesos.index).astype('float64')
+                presentes = valores.notna()
+                w, v = pesos[presentes].to_numpy(dtype=np.float64), valores[presentes].to_numpy()
+                total = w.sum()
+                if total == 0:
+                    estatisticas[coluna] = [0.0] + [np.nan] * 7
+                    continue
+                m = (w * v).sum() / total
+                s = np.sqrt(max((w * v * v).sum() - total * m * m, 0.0) / (total - 1)) if total > 1 else np.nan
+                amostra = self.amostra['cidade'].map(self.referencia[coluna]).astype('float64')
+                estatisticas[coluna] = [total, m, v.min(), *amostra.quantile(quartis), v.max(), s]
+
+        indice = ['count', 'mean', 'min', '25%', '50%', '75%', 'max', 'std']
+        tabela = pd.DataFrame(estatisticas, index=indice)
+        if not self.colunas or 'data' not in self.colunas:
+            return tabela.reindex(['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+        # Com a data (datetime) o describe() do pandas põe o desvio por último
+        cubo = self.cubo
+        datas = [self.datas_validas,
+                 EPOCA + pd.to_timedelta(self.soma_datas / self.datas_validas, unit='s') if self.datas_validas else pd.NaT,
+                 cubo['data_min'].min(), *self.amostra['data'].quantile(quartis), cubo['data_max'].max(), np.nan]
+        return pd.concat([pd.DataFrame({'data': datas}, index=indice), tabela], axis=1)
+
+    def amostra_dispersao(self, colunas):
+        return self.amostra[colunas].reset_index(drop=True)
+
+    def tabela_episodios(self):
+        if self.episodios is None:
+            return segmentar_episodios(pd.DataFrame(columns=['cidade', 'data', 'altura_rio_metros']))
+        # A coluna em ponto fixo só serve às mesclas entre lotes
+        return self.episodios.drop(columns=[COLUNA_PREJUIZO_FIXO], errors='ignore')
+
+    def relatorio_validacao(self):
+        """Relatório de validação do arquivo inteiro: violações somadas, exemplos dos primeiros lotes"""
+        linhas = {}
+        for relatorio in self._relatorios:
+            for severidade, regra, coluna, violacoes, exemplos in relatorio.itertuples(index=False):
+                chave = (severidade, regra, coluna)
+                total, anteriores = linhas.get(chave, (0, []))
+                linhas[chave] = (total + violacoes, (anteriores + list(exemplos))[:LINHAS_EXEMPLO])
+        return pd.DataFrame([(*chave, total, exemplos) for chave, (total, exemplos) in linhas.items()],
+                            columns=COLUNAS_RELATORIO)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Estima a memória da análise e o plano para um orçamento')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--max-memoria', '--max-memory', dest='max_memoria', default='1G',
+                        help='orçamento de memória (ex.: 512M, 2G; número puro em MB)')
+    args = parser.parse_args()
+
+    try:
+        from .leitura import arquivos_dataset
+
+        estimativa = estimar_dataset(arquivos_dataset(args.dados, 'enchentes_rs.csv'))
+        fixo = estimar_dataset(arquivos_dataset(args.dados, 'enchente_2024_detalhado.csv'))
+        print(f"📏 Base geral: {formatar_bytes(estimativa.bytes_arquivos)} de CSV, ~{estimativa.linhas:,} linhas, "
+              f"{estimativa.bytes_por_linha:.0f} bytes/linha em memória")
+        plano = planejar(estimativa, interpretar_tamanho(args.max_memoria),
+                         int(fixo.bytes_memoria * FATOR_TRABALHO) + RESERVA_GRAFICOS_BYTES, memoria_atual() or 0)
+        print(plano.descrever())
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
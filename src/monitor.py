@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo de Observação
+Acompanha a pasta de dados e, quando arquivos mudam, identifica as linhas novas
+e removidas, relê só as entradas alteradas e refaz apenas os agregados, gráficos
+e seções que dependem delas, medindo a latência da gravação à saída atualizada
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import Pipeline
+from .validacao import ErroValidacao
+
+INTERVALO_SEGUNDOS = 1.0
+
+# Linhas por lote ao calcular os hashes de um arquivo
+TAMANHO_LOTE_HASH = 200_000
+
+SEM_HASHES = np.empty(0, dtype=np.uint64)
+
+def hashes_linhas(caminho, tamanho_lote=TAMANHO_LOTE_HASH):
+    """Hash do texto de cada linha de dados de um CSV, na ordem do arquivo (ausente conta como vazio)"""
+    if not os.path.exists(caminho):
+        return SEM_HASHES
+    with pd.read_csv(caminho, dtype=str, keep_default_na=False, chunksize=tamanho_lote) as leitor:
+        partes = [pd.util.hash_pandas_object(lote, index=False).to_numpy() for lote in leitor]
+    return np.concatenate(partes) if partes else SEM_HASHES
+
+def diferenca_linhas(anteriores, atuais):
+    """
+    Diferença como multiconjunto: a k-ésima ocorrência de uma linha é nova se a versão
+    anterior tinha menos de k cópias dela. Retorna (máscara das linhas novas, quantidade
+    de linhas removidas).
+    """
+    valores, copias = np.unique(anteriores, return_counts=True)
+    ordem = np.argsort(atuais, kind='stable')
+    ordenados = atuais[ordem]
+    inicio_grupo = np.r_[True, ordenados[1:] != ordenados[:-1]]
+    primeira = np.maximum.accumulate(np.where(inicio_grupo, np.arange(len(ordenados)), 0))
+    ocorrencia = np.empty(len(atuais), dtype=np.int64)
+    ocorrencia[ordem] = np.arange(len(ordenados)) - primeira
+
+    posicao = np.searchsorted(valores, atuais)
+    existe = posicao < len(valores)
+    existe[existe] = valores[posicao[existe]] == atuais[existe]
+    copias_anteriores = np.zeros(len(atuais), dtype=np.int64)
+    copias_anteriores[existe] = copias[posicao[existe]]
+    novas = ocorrencia >= copias_anteriores
+    # Cada linha que não é nova consome uma cópia da versão anterior
+    return novas, len(anteriores) - int(np.count_nonzero(~novas))
+
+def linhas_por_posicao(caminho, mascara, colunas=('cidade', 'data'), tamanho_lote=TAMANHO_LOTE_HASH):
+    """Colunas `colunas` (as que existirem) das linhas marcadas em `mascara`, lidas em lotes"""
+    partes, inicio = [], 0
+    with pd.read_csv(caminho, dtype=str, keep_default_na=False, chunksize=tamanho_lote,
+                     usecols=lambda c: c in colunas) as leitor:
+        for lote in leitor:
+            partes.append(lote[mascara[inicio:inicio + len(lote)]])
+            inicio += len(lote)
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+def _descrever_mudanca(caminho, adicionadas, novas, removidas):
+    texto = f"📝 {os.path.basename(os.path.dirname(caminho))}/{os.path.basename(caminho)}: " \
+            f"+{adicionadas:,} linhas, −{removidas:,} linhas"
+    if len(novas) and 'cidade' in novas.columns:
+        cidades = sorted(novas['cidade'].unique())
+        texto += f" ({len(cidades)} cidades: {', '.join(cidades[:5])}{', …' if len(cidades) > 5 else ''}"
+        if 'data' in novas.columns:
+            texto += f"; {novas['data'].min()} a {novas['data'].max()}"
+        texto += ")"
+    return texto
+
+class MonitorDados:
+    """
+    Observação por varredura (tamanho e data de modificação a cada `intervalo`
+    segundos, sem dependências extras). Um arquivo só é processado depois de ficar
+    igual por um ciclo inteiro, para não ler gravações pela metade.
+    """
+
+    def __init__(self, analisador, intervalo=INTERVALO_SEGUNDOS, max_workers=1):
+        self.analisador = analisador
+        self.intervalo = intervalo
+        self.max_workers = max_workers
+        self.pipeline = Pipeline(analisador.etapas())
+        self.estados = {}
+        self.hashes = {}
+        self.latencias = []
+        self._anterior = {}
+
+    def _estado(self):
+        """caminho → (entrada, tamanho, data de modificação) de cada arquivo existente"""
+        estado = {}
+        for entrada, caminhos in self.analisador.arquivos_por_entrada().items():
+            for caminho in caminhos:
+                try:
+                    st = os.stat(caminho)
+                except FileNotFoundError:
+                    continue
+                estado[caminho] = (entrada, st.st_size, st.st_mtime_ns)
+        return estado
+
+    def iniciar(self):
+        """Registra a versão atual dos arquivos (estado e hashes das linhas)"""
+        self.estados = self._anterior = self._estado()
+        self.hashes = {caminho: hashes_linhas(caminho) for caminho in self.estados}
+
+    def verificar(self):
+        """Um ciclo de observação; retorna o resumo da atualização feita ou None"""
+        estado = self._estado()
+        alterados = sorted(c for c in estado.keys() | self.estados.keys() if estado.get(c) != self.estados.get(c))
+        estavel = all(estado.get(c) == self._anterior.get(c) for c in alterados)
+        self._anterior = estado
+        if not alterados or not estavel:
+            return None
+        return self._atualizar(estado, alterados)
+
+    def _atualizar(self, estado, alterados):
+        inicio = time.perf_counter()
+        entradas, mudancas = set(), []
+        # Hashes novos só substituem os aceitos depois que a recarga passa pela validação:
+        # se ela rejeitar os dados, a correção do arquivo é comparada com a última versão válida
+        hashes_novos = {}
+        for caminho in alterados:
+            entrada = (estado.get(caminho) or self.estados[caminho])[0]
+            hashes = hashes_linhas(caminho)
+            mascara, removidas = diferenca_linhas(self.hashes.get(caminho, SEM_HASHES), hashes)
+            novas = linhas_por_posicao(caminho, mascara) if mascara.any() else pd.DataFrame()
+            hashes_novos[caminho] = hashes if caminho in estado else None
+            if mascara.any() or removidas:
+                entradas.add(entrada)
+                mudancas.append((caminho, int(np.count_nonzero(mascara)), novas, removidas))
+        self.estados = estado
+        gravacao = max((estado[c][2] for c in alterados if c in estado), default=time.time_ns()) / 1e9
+
+        if not entradas:
+            self._aceitar_hashes(hashes_novos)
+            print(f"👀 {len(alterados)} arquivo(s) regravado(s) sem mudança nas linhas: nada a refazer")
+            return None
+        print("\n" + "=" * 60)
+        for mudanca in mudancas:
+            print(_descrever_mudanca(*mudanca))
+        deteccao = time.perf_counter() - inicio
+
+        # Depois de uma carga rejeitada nenhuma etapa tem saída válida: todas são refeitas
+        if self.analisador.dados_rejeitados:
+            entradas.update(self.analisador.arquivos_por_entrada())
+        try:
+            descartados = self.analisador.recarregar(entradas)
+        except ErroValidacao as e:
+            print(f"❌ Dados alterados rejeitados pela validação: {e}; saídas anteriores mantidas")
+            return None
+        self._aceitar_hashes(hashes_novos)
+        etapas = self.pipeline.afetadas(entradas)
+        self.analisador.executar_etapas(etapas, self.max_workers)
+
+        latencia = time.time() - gravacao
+        self.latencias.append(latencia)
+        print(f"⚡ Atualizado: {len(descartados)} agregados e {len(etapas)} etapas refeitos "
+              f"({', '.join(etapas)})")
+        print(f"⏱️ Detecção {deteccao * 1000:.0f} ms, recálculo {(time.perf_counter() - inicio - deteccao) * 1000:.0f} ms; "
+              f"{latencia * 1000:.0f} ms da gravação à saída atualizada")
+        return {'entradas': sorted(entradas), 'agregados': descartados, 'etapas': etapas, 'latencia': latencia}
+
+    def _aceitar_hashes(self, hashes_novos):
+        for caminho, hashes in hashes_novos.items():
+            if hashes is None:
+                self.hashes.pop(caminho, None)
+            else:
+                self.hashes[caminho] = hashes
+
+    def observar(self, max_atualizacoes=None):
+        """Observa até Ctrl+C (ou até `max_atualizacoes` atualizações)"""
+        self.iniciar()
+        print(f"\n👀 Observando '{self.analisador.pasta_dados}' ({len(self.estados)} arquivos) "
+              f"a cada {self.intervalo:g}s — Ctrl+C para encerrar")
+        try:
+            while max_atualizacoes is None or len(self.latencias) < max_atualizacoes:
+                time.sleep(self.intervalo)
+                self.verificar()
+        except KeyboardInterrupt:
+            pass
+        if self.latencias:
+            print(f"\n⚡ {len(self.latencias)} atualizações; latência mediana {np.median(self.latencias) * 1000:.0f} ms, "
+                  f"máxima {max(self.latencias) * 1000:.0f} ms")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Execução em Etapas (DAG)
+Cada etapa declara os artefatos que lê e os que produz; as dependências saem
+dessas declarações. Só as etapas necessárias para os alvos pedidos são executadas,
+e etapas independentes rodam ao mesmo tempo em threads ou processos.
+"""
+
+import io
+import sys
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# `principal=True` marca etapas que precisam da thread principal (ex.: pyplot)
+Etapa = namedtuple('Etapa', ['nome', 'entradas', 'saidas', 'executar', 'principal'])
+Etapa.__new__.__defaults__ = (False,)
+
+class _SaidaPorThread(io.TextIOBase):
+    """Substituto de sys.stdout que desvia a saída de cada thread para o seu próprio buffer"""
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def write(self, texto):
+        return (getattr(self.local, 'buffer', None) or self.original).write(texto)
+
+    def flush(self):
+        self.original.flush()
+
+def _executar_capturando(executar):
+    """Executa uma etapa guardando o que ela imprime; retorna (texto, segundos, erro)"""
+    saida = sys.stdout
+    instalada = not isinstance(saida, _SaidaPorThread)
+    if instalada:
+        # Processo filho: cada processo instala o próprio desvio
+        saida = sys.stdout = _SaidaPorThread(sys.stdout)
+    saida.local.buffer = io.StringIO()
+    inicio = time.perf_counter()
+    erro = None
+    try:
+        executar()
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    finally:
+        texto = saida.local.buffer.getvalue()
+        saida.local.buffer = None
+        if instalada:
+            sys.stdout = saida.original
+    return texto, time.perf_counter() - inicio, erro
+
+class Pipeline:
+    """Grafo de etapas com ordem topológica estável (respeita a ordem de declaração)"""
+
+    def __init__(self, etapas):
+        self.etapas = {}
+        produtor = {}
+        for etapa in etapas:
+            if etapa.nome in self.etapas:
+                raise ValueError(f"Etapa duplicada: {etapa.nome!r}")
+            self.etapas[etapa.nome] = etapa
+            for saida in etapa.saidas:
+                if saida in produtor:
+                    raise ValueError(f"Saída {saida!r} declarada por {produtor[saida]!r} e {etapa.nome!r}")
+                produtor[saida] = etapa.nome
+
+        # Entradas sem produtor são externas (arquivos de dados)
+        declaradas = list(self.etapas)
+        self.dependencias = {
+            etapa.nome: sorted({produtor[e] for e in etapa.entradas if e in produtor}, key=declaradas.index)
+            for etapa in etapas
+        }
+        self.ordem = self._ordenar(declaradas)
+
+    def _ordenar(self, declaradas):
+        ordem, feitas = [], set()
+        pendentes = list(declaradas)
+        while pendentes:
+            pronta = next((n for n in pendentes if feitas.issuperset(self.dependencias[n])), None)
+            if pronta is None:
+                raise ValueError(f"Ciclo entre as etapas: {', '.join(pendentes)}")
+            ordem.append(pronta)
+            feitas.add(pronta)
+            pendentes.remove(pronta)
+        return ordem
+
+    def selecionar(self, alvos=None):
+        """Etapas necessárias para produzir os alvos (eles e suas dependências), em ordem topológica"""
+        if alvos is None:
+            return list(self.ordem)
+        desconhecidas = [a for a in alvos if a not in self.etapas]
+        if desconhecidas:
+            raise ValueError(f"Etapas desconhecidas: {', '.join(desconhecidas)}")
+        necessarias, pilha = set(), list(alvos)
+        while pilha:
+            nome = pilha.pop()
+            if nome not in necessarias:
+                necessarias.add(nome)
+                pilha.extend(self.dependencias[nome])
+        return [n for n in self.ordem if n in necessarias]
+
+    def afetadas(self, artefatos):
+        """Etapas que leem algum dos `artefatos`, direta ou indiretamente, em ordem topológica"""
+        alterados, afetadas = set(artefatos), []
+        for nome in self.ordem:
+            etapa = self.etapas[nome]
+            if alterados.intersection(etapa.entradas):
+                afetadas.append(nome)
+                alterados.update(etapa.saidas)
+        return afetadas
+
+    def executar(self, alvos=None, max_workers=1, processos=False):
+        """
+        Executa as etapas selecionadas. Com max_workers > 1 as etapas prontas rodam em
+        paralelo (threads ou processos) e a saída de cada uma é impressa inteira, na
+        ordem topológica. Uma etapa com erro faz suas dependentes serem ignoradas.
+        Retorna {nome: {'status': 'ok' | 'erro' | 'ignorada', 'segundos': float}}.
+        """
+        selecionadas = self.selecionar(alvos)
+        if max_workers == 1:
+            return self._executar_em_serie(selecionadas)
+
+        resultados, textos = {}, {}
+        pendentes, em_execucao = list(selecionadas), {}
+        impressas = 0
+        destino = sys.stdout
+        if not processos:
+            sys.stdout = _SaidaPorThread(destino)
+
+        def registrar(nome, texto, segundos, erro):
+            if erro:
+                texto += f"❌ Etapa '{nome}' falhou: {erro}\n"
+            resultados[nome] = {'status': 'erro' if erro else 'ok', 'segundos': segundos}
+            textos[nome] = texto
+
+        Executor = ProcessPoolExecutor if processos else ThreadPoolExecutor
+        try:
+            with Executor(max_workers=max_workers) as executor:
+                while pendentes or em_execucao:
+                    for nome in list(pendentes):
+                        dependencias = [resultados.get(d, {}).get('status') for d in self.dependencias[nome]]
+                        if any(s in ('erro', 'ignorada') for s in dependencias):
+                            pendentes.remove(nome)
+                            resultados[nome] = {'status': 'ignorada', 'segundos': 0.0}
+                            textos[nome] = f"⏭️ Etapa '{nome}' ignorada: uma dependência falhou\n"
+                        elif all(s == 'ok' for s in dependencias):
+                            pendentes.remove(nome)
+                            etapa = self.etapas[nome]
+                            if etapa.principal and not processos:
+                                registrar(nome, *_executar_capturando(etapa.executar))
+                            else:
+                                em_execucao[executor.submit(_executar_capturando, etapa.executar)] = nome
+
+                    # Saída na ordem topológica, assim que as etapas anteriores terminam
+                    while impressas < len(selecionadas) and selecionadas[impressas] in textos:
+                        destino.write(textos.pop(selecionadas[impressas]))
+                        impressas += 1
+
+                    if em_execucao:
+                        concluidas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                        for futuro in concluidas:
+                            registrar(em_execucao.pop(futuro), *futuro.result())
+        finally:
+            sys.stdout = destino
+
+        for nome in selecionadas[impressas:]:
+            destino.write(textos.get(nome, ''))
+        return resultados
+
+    def _executar_em_serie(self, selecionadas):
+        resultados = {}
+        for nome in selecionadas:
+            if any(resultados[d]['status'] != 'ok' for d in self.dependencias[nome]):
+                print(f"⏭️ Etapa '{nome}' ignorada: uma dependência falhou")
+                resultados[nome] = {'status': 'ignorada', 'segundos': 0.0}
+                continue
+            inicio = time.perf_counter()
+            try:
+                self.etapas[nome].executar()
+                status = 'ok'
+            except Exception as e:
+                print(f"❌ Etapa '{nome}' falhou: {type(e).__name__}: {e}")
+                status = 'erro'
+            resultados[nome] = {'status': status, 'segundos': time.perf_counter() - inicio}
+        return resultados
+
+    def descrever(self):
+        """Lista as etapas com suas dependências, em ordem topológica"""
+        for nome in self.ordem:
+            dependencias = ', '.join(self.dependencias[nome]) or '—'
+            print(f"   • {nome} ← {dependencias}")
@@ -25,6 +25,7 @@ def criar_estrutura_kaggle():
     os.makedirs(pasta_kaggle)
     os.makedirs(f"{pasta_kaggle}/data")
     os.makedirs(f"{pasta_kaggle}/notebooks")
+    os.makedirs(f"{pasta_kaggle}/src")
     
     print(f"✅ Pasta '{pasta_kaggle}' criada com sucesso!")
     
@@ -59,6 +60,13 @@ def copiar_arquivos(pasta_kaggle):
                     f"{pasta_kaggle}/notebooks/analise_enchentes_kaggle.ipynb")
         print("   ✅ Notebook copiado")
     
+    # Copiar script do notebook e o pacote src com o motor de análise que ele utiliza
+    modulos = sorted(os.path.join("src", nome) for nome in os.listdir("src") if nome.endswith(".py"))
+    for arquivo in ["notebooks/analise_enchentes_kaggle.py"] + modulos:
+        if os.path.exists(arquivo):
+            shutil.copy2(arquivo, f"{pasta_kaggle}/{arquivo}")
+            print(f"   ✅ {arquivo} copiado")
+    
     # Copiar metadados
     if os.path.exists("kaggle_metadata.json"):
         shutil.copy2("kaggle_metadata.json", f"{pasta_kaggle}/metadata.json")
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Previsão de Curto Prazo da Altura do Rio
+Modelo autorregressivo com a chuva como entrada exógena (ARX) ajustado para cada
+cidade: as equações normais de todas as cidades são acumuladas em um único tensor
+e resolvidas em lote, e novos registros só somam sua contribuição antes de uma nova
+resolução, sem reprocessar o histórico. Previsões de 1 a N dias para todas as
+cidades de uma vez.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+if not __package__:
+    # Executado como script (python src/previsao_rio.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+from .defasagem import grade_diaria
+
+# rio[t] = c + Σ a_i·rio[t-i] (i = 1..ORDEM_RIO) + Σ b_j·chuva[t-j] (j = 0..ORDEM_CHUVA-1)
+ORDEM_RIO = 2
+ORDEM_CHUVA = 2
+HORIZONTE = 3
+
+# Dias ajustáveis por parâmetro exigidos para o modelo próprio da cidade; abaixo disso ela
+# usa o modelo conjunto (equações de todas as cidades somadas) e, sem ele, a persistência
+RAZAO_MINIMA_DIAS = 3
+
+# Regularização relativa ao traço das equações normais (cidades com rio constante)
+REGULARIZACAO = 1e-8
+
+# Cidades por bloco ao montar as equações (limita a memória do tensor cidade × dia × atributo)
+CIDADES_POR_BLOCO = 256
+
+def _defasadas(rio, chuva, ordem_rio, ordem_chuva):
+    """Atributos (n, dias, k) e alvo (n, dias) dos dias com todas as defasagens disponíveis"""
+    contexto = max(ordem_rio, ordem_chuva - 1, 1)
+    dias = rio.shape[1]
+    colunas = [np.ones((rio.shape[0], dias - contexto))]
+    colunas += [rio[:, contexto - i:dias - i] for i in range(1, ordem_rio + 1)]
+    colunas += [chuva[:, contexto - j:dias - j] for j in range(ordem_chuva)]
+    return np.stack(colunas, axis=-1), rio[:, contexto:]
+
+def equacoes_normais(rio, chuva, ordem_rio=ORDEM_RIO, ordem_chuva=ORDEM_CHUVA):
+    """
+    X'X (n, k, k), X'y (n, k), y'y e número de dias usados por cidade, para os alvos
+    a partir da coluna `contexto` das matrizes cidade × dia (dias com algum valor
+    ausente na linha ficam de fora)
+    """
+    k = 1 + ordem_rio + ordem_chuva
+    n = rio.shape[0]
+    XtX, Xty = np.zeros((n, k, k)), np.zeros((n, k))
+    yy, linhas = np.zeros(n), np.zeros(n, dtype=np.int64)
+    for inicio in range(0, n, CIDADES_POR_BLOCO):
+        bloco = slice(inicio, inicio + CIDADES_POR_BLOCO)
+        X, y = _defasadas(rio[bloco], chuva[bloco], ordem_rio, ordem_chuva)
+        validos = ~np.isnan(X).any(axis=-1) & ~np.isnan(y)
+        X = np.where(validos[..., None], X, 0.0)
+        y = np.where(validos, y, 0.0)
+        XtX[bloco] = np.einsum('ntk,ntl->nkl', X, X)
+        Xty[bloco] = np.einsum('ntk,nt->nk', X, y)
+        yy[bloco] = np.einsum('nt,nt->n', y, y)
+        linhas[bloco] = validos.sum(axis=1)
+    return XtX, Xty, yy, linhas
+
+class ModeloNivelRio:
+    """ARX por cidade mantido como equações normais acumuladas, resolvidas em lote"""
+
+    def __init__(self, ordem_rio=ORDEM_RIO, ordem_chuva=ORDEM_CHUVA):
+        self.ordem_rio = ordem_rio
+        self.ordem_chuva = ordem_chuva
+        self.contexto = max(ordem_rio, ordem_chuva - 1, 1)
+        self.k = 1 + ordem_rio + ordem_chuva
+        self.cidades = pd.Index([], dtype=object, name='cidade')
+        self.ultimo_dia = None
+        self._XtX = np.zeros((0, self.k, self.k))
+        self._Xty = np.zeros((0, self.k))
+        self._yy = np.zeros(0)
+        self._linhas = np.zeros(0, dtype=np.int64)
+        # Últimos `contexto` dias de cada cidade: defasagens dos próximos registros e da previsão
+        self._cauda_rio = np.empty((0, self.contexto))
+        self._cauda_chuva = np.empty((0, self.contexto))
+        self.coeficientes = np.zeros((0, self.k))
+        self.modelo = np.array([], dtype=object)
+        self.erro_padrao = np.zeros(0)
+        self.metricas = {}
+
+    @property
+    def nomes_coeficientes(self):
+        return (['constante'] + [f'rio_t-{i}' for i in range(1, self.ordem_rio + 1)]
+                + [f'chuva_t-{j}' if j else 'chuva_t' for j in range(self.ordem_chuva)])
+
+    def _incluir_cidades(self, cidades):
+        """Acrescenta cidades ainda desconhecidas, com equações zeradas e sem histórico"""
+        novas = pd.Index(cidades).difference(self.cidades)
+        if len(novas) == 0:
+            return
+        n = len(novas)
+        self.cidades = self.cidades.append(pd.Index(np.asarray(novas, dtype=object), name='cidade'))
+        self._XtX = np.concatenate([self._XtX, np.zeros((n, self.k, self.k))])
+        self._Xty = np.concatenate([self._Xty, np.zeros((n, self.k))])
+        self._yy = np.concatenate([self._yy, np.zeros(n)])
+        self._linhas = np.concatenate([self._linhas, np.zeros(n, dtype=np.int64)])
+        self._cauda_rio = np.concatenate([self._cauda_rio, np.full((n, self.contexto), np.nan)])
+        self._cauda_chuva = np.concatenate([self._cauda_chuva, np.full((n, self.contexto), np.nan)])
+
+    def ajustar(self, df):
+        """Ajusta do zero com o histórico de `df` (data, cidade, altura_rio_metros, chuva_24h_mm)"""
+        self.__init__(self.ordem_rio, self.ordem_chuva)
+        return self.atualizar(df)
+
+    def atualizar(self, df):
+        """
+        Incorpora os registros de `df` posteriores ao último dia já visto: só os dias novos
+        entram nas equações (com as defasagens vindas da cauda guardada) e todas as
+        cidades são resolvidas de novo. Registros de dias já incorporados são ignorados.
+        """
+        inicio = time.perf_counter()
+        novos = df[df['data'].notna()]
+        if self.ultimo_dia is not None:
+            novos = novos[novos['data'] > self.ultimo_dia]
+        if len(novos) == 0:
+            return self
+        cidades, dias, matrizes = grade_diaria(novos, ('altura_rio_metros', 'chuva_24h_mm'))
+        self._incluir_cidades(cidades)
+
+        # Dias novos alinhados logo após o último visto (lacunas ficam NaN) e às cidades do modelo
+        primeiro = dias[0] if self.ultimo_dia is None else self.ultimo_dia + pd.Timedelta(days=1)
+        deslocamento = (dias[0] - primeiro).days
+        total = deslocamento + len(dias)
+        posicoes = self.cidades.get_indexer(cidades)
+        blocos = {}
+        for coluna, cauda in (('altura_rio_metros', self._cauda_rio), ('chuva_24h_mm', self._cauda_chuva)):
+            matriz = np.full((len(self.cidades), total), np.nan)
+            matriz[posicoes, deslocamento:] = matrizes[coluna]
+            blocos[coluna] = np.concatenate([cauda, matriz], axis=1)
+        rio, chuva = blocos['altura_rio_metros'], blocos['chuva_24h_mm']
+
+        XtX, Xty, yy, linhas = equacoes_normais(rio, chuva, self.ordem_rio, self.ordem_chuva)
+        self._XtX += XtX
+        self._Xty += Xty
+        self._yy += yy
+        self._linhas += linhas
+        self._cauda_rio = rio[:, -self.contexto:]
+        self._cauda_chuva = chuva[:, -self.contexto:]
+        self.ultimo_dia = dias[-1]
+        self._resolver()
+        self.metricas['atualizacao_segundos'] = time.perf_counter() - inicio
+        self.metricas['dias_incorporados'] = total
+        return self
+
+    def _resolver(self):
+        """Coeficientes de todas as cidades em uma resolução em lote das equações normais"""
+        minimo = RAZAO_MINIMA_DIAS * self.k
+        identidade = np.eye(self.k)
+
+        def resolver(XtX, Xty):
+            escala = np.trace(XtX, axis1=-2, axis2=-1)[..., None, None] / self.k
+            A = XtX + REGULARIZACAO * np.maximum(escala, 1.0) * identidade
+            return np.linalg.solve(A, Xty[..., None])[..., 0]
+
+        persistencia = np.zeros(self.k)
+        persistencia[1] = 1.0
+        proprios = self._linhas >= minimo
+        conjunto = persistencia
+        if self._linhas.sum() >= minimo:
+            conjunto = resolver(self._XtX.sum(axis=0), self._Xty.sum(axis=0))
+            nome_conjunto = 'conjunto'
+        else:
+            nome_conjunto = 'persistência'
+
+        coeficientes = np.tile(conjunto, (len(self.cidades), 1))
+        if proprios.any():
+            coeficientes[proprios] = resolver(self._XtX[proprios], self._Xty[proprios])
+        self.coeficientes = coeficientes
+        self.modelo = np.where(proprios, 'ARX', nome_conjunto).astype(object)
+
+        # Resíduo pelas próprias equações: y'y - 2β'X'y + β'X'Xβ
+        sse = (self._yy - 2 * np.einsum('nk,nk->n', coeficientes, self._Xty)
+               + np.einsum('nk,nkl,nl->n', coeficientes, self._XtX, coeficientes))
+        graus = self._linhas - np.where(proprios, self.k, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.erro_padrao = np.where(graus > 0, np.sqrt(np.maximum(sse, 0.0) / graus), np.nan)
+
+    def prever(self, horizonte=HORIZONTE, chuva_prevista=None):
+        """
+        Altura do rio nos próximos `horizonte` dias de todas as cidades, aplicando o modelo
+        em sequência sobre as próprias previsões. `chuva_prevista` (mm por dia) é um valor
+        único ou uma matriz cidade × dia; sem ela, repete a chuva do último dia de cada cidade.
+        """
+        inicio = time.perf_counter()
+        n = len(self.cidades)
+        # Dias ausentes na cauda: último nível conhecido e chuva zero
+        rio = pd.DataFrame(self._cauda_rio).ffill(axis=1).to_numpy()
+        chuva = np.nan_to_num(self._cauda_chuva)
+        if chuva_prevista is None:
+            chuva_prevista = chuva[:, -1:]
+        chuva_futura = np.broadcast_to(np.asarray(chuva_prevista, dtype=np.float64), (n, horizonte))
+        for passo in range(horizonte):
+            chuva = np.concatenate([chuva, chuva_futura[:, passo:passo + 1]], axis=1)
+            X = np.column_stack([np.ones(n)]
+                                + [rio[:, -i] for i in range(1, self.ordem_rio + 1)]
+                                + [chuva[:, -1 - j] for j in range(self.ordem_chuva)])
+            # Nível negativo não existe: o piso evita que um ajuste ruim se propague no passo seguinte
+            previsto = np.maximum(np.einsum('nk,nk->n', X, self.coeficientes), 0.0)
+            rio = np.concatenate([rio, previsto[:, None]], axis=1)
+        previsoes = rio[:, -horizonte:]
+
+        tabela = pd.DataFrame({'nivel_atual': self._cauda_rio[:, -1]}, index=self.cidades)
+        for passo in range(horizonte):
+            tabela[f'previsao_{passo + 1}d'] = previsoes[:, passo]
+        tabela['modelo'] = self.modelo
+        tabela['dias_ajuste'] = self._linhas
+        tabela['erro_padrao'] = self.erro_padrao
+        duracao = time.perf_counter() - inicio
+        self.metricas['previsao_cidades'] = n
+        self.metricas['previsao_segundos'] = duracao
+        return tabela
+
+def retroteste(df, horizonte=HORIZONTE, ordem_rio=ORDEM_RIO, ordem_chuva=ORDEM_CHUVA):
+    """
+    Ajusta sem os últimos `horizonte` dias e compara a previsão (com a chuva observada
+    como prevista) e a persistência do último nível com o rio real: erro absoluto médio
+    por dia de antecedência
+    """
+    corte = df['data'].max() - pd.Timedelta(days=horizonte)
+    modelo = ModeloNivelRio(ordem_rio, ordem_chuva).ajustar(df[df['data'] <= corte])
+    cidades, dias, matrizes = grade_diaria(df[df['data'] > corte], ('altura_rio_metros', 'chuva_24h_mm'))
+    posicoes = modelo.cidades.get_indexer(cidades)
+    conhecidas = posicoes >= 0
+    chuva = np.zeros((len(modelo.cidades), horizonte))
+    real = np.full((len(modelo.cidades), horizonte), np.nan)
+    deslocamento = (dias[0] - corte).days - 1
+    chuva[posicoes[conhecidas], deslocamento:] = np.nan_to_num(matrizes['chuva_24h_mm'][conhecidas])
+    real[posicoes[conhecidas], deslocamento:] = matrizes['altura_rio_metros'][conhecidas]
+
+    tabela = modelo.prever(horizonte, chuva)
+    previsto = tabela[[f'previsao_{p + 1}d' for p in range(horizonte)]].to_numpy()
+    persistencia = tabela[['nivel_atual']].to_numpy()
+    return pd.DataFrame({
+        'erro_modelo': np.nanmean(np.abs(previsto - real), axis=0),
+        'erro_persistencia': np.nanmean(np.abs(persistencia - real), axis=0),
+    }, index=pd.Index(range(1, horizonte + 1), name='dias_a_frente'))
+
+def series_sinteticas(n_cidades, n_dias, semente=0):
+    """Séries diárias fictícias geradas por um ARX(2, 2) estável com coeficientes próprios por cidade"""
+    rng = np.random.default_rng(semente)
+    a1 = rng.uniform(0.5, 0.9, n_cidades)
+    a2 = rng.uniform(-0.2, 0.0, n_cidades) * (1 - a1)
+    b0, b1 = rng.uniform(0.005, 0.02, (2, n_cidades))
+    nivel = rng.uniform(1.0, 4.0, n_cidades)
+    chuva = rng.gamma(0.6, 25.0, (n_cidades, n_dias))
+    rio = np.empty((n_cidades, n_dias))
+    rio[:, :2] = nivel[:, None]
+    ruido = rng.normal(0, 0.05, (n_cidades, n_dias))
+    for t in range(2, n_dias):
+        rio[:, t] = (nivel * (1 - a1 - a2) + a1 * rio[:, t - 1] + a2 * rio[:, t - 2]
+                     + b0 * chuva[:, t] + b1 * chuva[:, t - 1] + ruido[:, t])
+    dias = pd.date_range('2015-01-01', periods=n_dias, freq='D')
+    return pd.DataFrame({
+        'data': np.tile(dias, n_cidades),
+        'cidade': np.repeat(np.array([f'Cidade {i:04d}' for i in range(n_cidades)], dtype=object), n_dias),
+        'altura_rio_metros': rio.ravel(),
+        'chuva_24h_mm': chuva.ravel(),
+    })
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Previsão da altura do rio de 1 a N dias por cidade (ARX em lote)')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--arquivo', default='enchente_2024_detalhado.csv', help='histórico usado no ajuste')
+    parser.add_argument('--horizonte', type=int, default=HORIZONTE, help='dias à frente')
+    parser.add_argument('--chuva-prevista', type=float,
+                        help='chuva em mm por dia à frente (padrão: a do último dia de cada cidade)')
+    parser.add_argument('--top', type=int, default=10, help='cidades exibidas, pela maior previsão')
+    parser.add_argument('--benchmark', type=int, metavar='CIDADES',
+                        help='usa séries ARX fictícias de CIDADES cidades em vez dos dados')
+    parser.add_argument('--dias', type=int, default=365, help='dias de histórico no --benchmark')
+    args = parser.parse_args()
+
+    try:
+        if args.benchmark:
+            df = series_sinteticas(args.benchmark, args.dias)
+        else:
+            from .leitura import ler_dataset
+
+            df = ler_dataset(args.dados, args.arquivo)
+            df['data'] = pd.to_datetime(df['data'], errors='coerce')
+
+        # Ajuste com todos os dias menos o último, que chega depois como atualização
+        ultimo = df['data'].max()
+        inicio = time.perf_counter()
+        modelo = ModeloNivelRio().ajustar(df[df['data'] < ultimo])
+        ajuste = time.perf_counter() - inicio
+        modelo.atualizar(df[df['data'] == ultimo])
+        tabela = modelo.prever(args.horizonte, args.chuva_prevista)
+
+        print(f"🌊 PREVISÃO DA ALTURA DO RIO ({len(tabela):,} cidades, {args.horizonte} dias à frente)")
+        print("=" * 50)
+        print(f"⚡ Ajuste: {ajuste * 1000:.0f} ms; atualização com o último dia: "
+              f"{modelo.metricas['atualizacao_segundos'] * 1000:.1f} ms; "
+              f"previsão: {modelo.metricas['previsao_segundos'] * 1000:.1f} ms")
+        print(f"📊 Modelos: {pd.Series(modelo.modelo).value_counts().to_dict()}")
+        erros = retroteste(df, args.horizonte)
+        print("\n🎯 Erro absoluto médio (m) nos últimos dias, contra a persistência do último nível:")
+        print(erros.round(3).to_string())
+        print()
+        print(tabela.nlargest(args.top, f'previsao_{args.horizonte}d').round(2).to_string())
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
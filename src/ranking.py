@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rankings de Cidades (Top-K)
+Placar das K cidades mais atingidas por métrica (prejuízo, desalojados, feridos,
+altura do rio), mantido com heaps de tamanho K à medida que chegam registros ou
+partições, sem ordenar a tabela inteira de cidades
+"""
+
+import os
+import sys
+import heapq
+import argparse
+from functools import total_ordering
+
+import numpy as np
+import pandas as pd
+
+if not __package__:
+    # Executado como script (python src/ranking.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+from .leitura import COLUNA_PREJUIZO_FIXO, ESCALAS_PREJUIZO, ler_em_lotes
+
+# Métricas do placar e como cada uma acumula por cidade (ambas nunca diminuem)
+METRICAS_PLACAR = {
+    'prejuizo_milhoes': 'sum',
+    'desalojados': 'sum',
+    'feridos': 'sum',
+    'altura_rio_metros': 'max',
+}
+
+# Na base detalhada de 2024 desalojados e prejuízo são séries acumuladas
+METRICAS_PLACAR_2024 = {
+    'prejuizo_milhoes': 'max',
+    'desalojados': 'max',
+    'feridos': 'sum',
+    'altura_rio_metros': 'max',
+}
+
+TAMANHO_PLACAR = 50
+
+@total_ordering
+class _Invertida:
+    """Chave com a ordem invertida: no heap mínimo, entre valores iguais sai primeiro a maior chave"""
+    __slots__ = ('chave',)
+
+    def __init__(self, chave):
+        self.chave = chave
+
+    def __eq__(self, outra):
+        return self.chave == outra.chave
+
+    def __lt__(self, outra):
+        return self.chave > outra.chave
+
+class TopK:
+    """
+    As K chaves de maior valor, para valores que só aumentam (somas de não negativos,
+    máximos). Heap mínimo com entradas obsoletas descartadas de forma preguiçosa:
+    cada atualização custa O(log K) amortizado. Empates são decididos pela chave
+    (a menor fica), como em uma ordenação estável da tabela inteira por nome.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.membros = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self.membros)
+
+    def _descartar_obsoletas(self):
+        while self._heap and self.membros.get(self._heap[0][1].chave) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def atualizar(self, chave, valor):
+        """Informa o valor atual (acumulado) de `chave`"""
+        if chave in self.membros:
+            if valor > self.membros[chave]:
+                self.membros[chave] = valor
+                heapq.heappush(self._heap, (valor, _Invertida(chave)))
+                if len(self._heap) > 2 * self.k:
+                    # Compacta: reconstrói o heap só com as entradas atuais
+                    self._heap = [(v, _Invertida(c)) for c, v in self.membros.items()]
+                    heapq.heapify(self._heap)
+            return
+        if len(self.membros) < self.k:
+            self.membros[chave] = valor
+            heapq.heappush(self._heap, (valor, _Invertida(chave)))
+            return
+        self._descartar_obsoletas()
+        entrada = (valor, _Invertida(chave))
+        if entrada > self._heap[0]:
+            _, removida = heapq.heapreplace(self._heap, entrada)
+            del self.membros[removida.chave]
+            self.membros[chave] = valor
+
+    def minimo(self):
+        """Menor valor ainda no placar (None se incompleto)"""
+        if len(self.membros) < self.k:
+            return None
+        self._descartar_obsoletas()
+        return self._heap[0][0]
+
+    def ordenados(self, n=None):
+        """(chave, valor) do maior para o menor; ordena só os K membros"""
+        return sorted(self.membros.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+class Placar:
+    """
+    Top-K por métrica sobre os totais por cidade, alimentado por registros, lotes ou outros
+    placares. Com `escala_prejuizo` o prejuízo é acumulado em inteiros na escala de
+    ESCALAS_PREJUIZO (a coluna em ponto fixo dos lotes) e convertido para milhões só no ranking.
+    """
+
+    def __init__(self, k=TAMANHO_PLACAR, metricas=METRICAS_PLACAR, escala_prejuizo=None):
+        self.k = k
+        self.metricas = dict(metricas)
+        self.escala_prejuizo = escala_prejuizo
+        self._fator = None if escala_prejuizo is None else ESCALAS_PREJUIZO[escala_prejuizo]
+        self.totais = {metrica: {} for metrica in self.metricas}
+        self.topos = {metrica: TopK(k) for metrica in self.metricas}
+        self.registros = 0
+
+    def _acumular(self, metrica, cidade, valor):
+        totais = self.totais[metrica]
+        atual = totais.get(cidade)
+        if atual is not None:
+            valor = atual + valor if self.metricas[metrica] == 'sum' else max(atual, valor)
+        totais[cidade] = valor
+        self.topos[metrica].atualizar(cidade, valor)
+
+    def adicionar(self, cidade, **valores):
+        """Um registro (ex.: adicionar('Canoas', desalojados=120, prejuizo_milhoes=3.5))"""
+        for metrica, valor in valores.items():
+            if metrica in self.metricas:
+                if metrica == 'prejuizo_milhoes' and self._fator is not None:
+                    valor = int(np.rint(valor * self._fator))
+                self._acumular(metrica, cidade, valor)
+        self.registros += 1
+        return self
+
+    def adicionar_lote(self, df):
+        """Um lote de registros: agrega por cidade e atualiza cada placar uma vez por cidade"""
+        metricas = {m: f for m, f in self.metricas.items() if m in df.columns}
+        if self._fator is not None and 'prejuizo_milhoes' in metricas:
+            # Soma int64 da coluna em ponto fixo: o total não depende da ordem dos lotes
+            agregacoes = {m: (COLUNA_PREJUIZO_FIXO if m == 'prejuizo_milhoes' else m, f) for m, f in metricas.items()}
+        else:
+            agregacoes = {m: (m, f) for m, f in metricas.items()}
+        por_cidade = df.groupby('cidade', observed=True, sort=False).agg(**agregacoes)
+        cidades = por_cidade.index.astype(str).tolist()
+        for metrica in metricas:
+            for cidade, valor in zip(cidades, por_cidade[metrica].tolist()):
+                self._acumular(metrica, cidade, valor)
+        self.registros += len(df)
+        return self
+
+    def mesclar(self, outro):
+        """Incorpora o placar de outra partição (as métricas precisam coincidir)"""
+        if outro.metricas != self.metricas or outro.escala_prejuizo != self.escala_prejuizo:
+            raise ValueError("Placares com métricas ou escalas diferentes não podem ser mesclados")
+        for metrica, totais in outro.totais.items():
+            for cidade, valor in totais.items():
+                self._acumular(metrica, cidade, valor)
+        self.registros += outro.registros
+        return self
+
+    def cidades(self, metrica, n=None):
+        """Cidades do topo de `metrica`, da mais à menos atingida"""
+        return [cidade for cidade, _ in self.topos[metrica].ordenados(n)]
+
+    def ranking(self, metrica, n=None):
+        """Placar de `metrica` como Series indexada por cidade"""
+        pares = self.topos[metrica].ordenados(n)
+        valores = [v for _, v in pares]
+        if metrica == 'prejuizo_milhoes' and self._fator is not None:
+            valores = [v / self._fator for v in valores]
+        return pd.Series(valores, index=pd.Index([c for c, _ in pares], name='cidade'), name=metrica)
+
+def placar_de_arquivos(caminhos, k=TAMANHO_PLACAR, metricas=METRICAS_PLACAR, tamanho_lote=100_000):
+    """Um placar por arquivo (partição), lido em lotes, mesclados no final"""
+    colunas = ['cidade'] + list(metricas)
+    total = Placar(k, metricas)
+    for caminho in caminhos:
+        parcial = Placar(k, metricas)
+        for lote in ler_em_lotes(caminho, colunas, tamanho_lote):
+            parcial.adicionar_lote(lote)
+        total.mesclar(parcial)
+    return total
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Placar das cidades mais atingidas por métrica')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--k', type=int, default=10, help='cidades por placar')
+    args = parser.parse_args()
+
+    try:
+        from .leitura import arquivos_dataset
+
+        caminhos = arquivos_dataset(args.dados, 'enchentes_rs.csv')
+        placar = placar_de_arquivos(caminhos, k=args.k)
+        print(f"🏆 PLACAR DAS CIDADES ({placar.registros:,} registros, {len(caminhos)} arquivos)")
+        print("=" * 50)
+        for metrica in placar.metricas:
+            print(f"\n📊 {metrica}:")
+            print(placar.ranking(metrica).to_string())
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Saída das Tabelas no Console
+Modos de exibição com custo limitado para tabelas grandes: completo, primeiras N
+linhas, paginado, em fluxo (blocos de linhas, sem montar a tabela inteira em texto)
+e silencioso
+"""
+
+import sys
+import math
+
+MODOS_SAIDA = ('completo', 'topo', 'paginado', 'fluxo', 'silencioso')
+
+# Linhas formatadas por vez no modo em fluxo e na escrita de relatórios
+TAMANHO_BLOCO = 1000
+
+def escrever_tabela(df, destino, index=True, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Escreve `df` em `destino` bloco a bloco: a memória usada depende do bloco, não da
+    tabela. As larguras das colunas vêm do primeiro bloco (valores mais largos depois
+    apenas empurram a linha).
+    """
+    if index:
+        df = df.reset_index()
+    larguras = _larguras_colunas(df.iloc[:tamanho_bloco])
+    for inicio in range(0, max(len(df), 1), tamanho_bloco):
+        bloco = df.iloc[inicio:inicio + tamanho_bloco]
+        destino.write(bloco.to_string(index=False, header=inicio == 0, col_space=larguras) + '\n')
+
+def _larguras_colunas(df):
+    """Largura de cada coluna na formatação do pandas (cabeçalho ou maior valor)"""
+    return {coluna: max(map(len, df[[coluna]].to_string(index=False).split('\n')))
+            for coluna in df.columns}
+
+class FormatoSaida:
+    """Como as análises exibem tabelas no console"""
+
+    def __init__(self, modo='completo', linhas=20, pagina=1, tamanho_bloco=TAMANHO_BLOCO):
+        if modo not in MODOS_SAIDA:
+            raise ValueError(f"Modo de saída desconhecido: {modo!r} (opções: {', '.join(MODOS_SAIDA)})")
+        self.modo = modo
+        self.linhas = linhas
+        self.pagina = pagina
+        self.tamanho_bloco = tamanho_bloco
+
+    @property
+    def silencioso(self):
+        return self.modo == 'silencioso'
+
+    def escrever(self, *partes, **kwargs):
+        """print que respeita o modo silencioso"""
+        if not self.silencioso:
+            print(*partes, **kwargs)
+
+    def limite_linhas(self):
+        """Quantas primeiras linhas de uma tabela o modo exibe (None: todas ou nenhuma)"""
+        if self.modo == 'topo':
+            return self.linhas
+        if self.modo == 'paginado':
+            return max(1, self.pagina) * self.linhas
+        return None
+
+    def tabela(self, df, index=True, total=None):
+        """
+        Exibe `df` conforme o modo; o custo no console é limitado exceto no modo completo.
+        `total` é o tamanho da tabela inteira quando `df` traz só as primeiras linhas dela.
+        """
+        if self.silencioso:
+            return
+        total = len(df) if total is None else total
+        if self.modo == 'completo':
+            print(df.to_string(index=index))
+        elif self.modo == 'fluxo':
+            escrever_tabela(df, sys.stdout, index, self.tamanho_bloco)
+        elif self.modo == 'topo':
+            print(df.head(self.linhas).to_string(index=index))
+            if total > self.linhas:
+                print(f"   … mais {total - self.linhas:,} linhas (de {total:,})")
+        else:
+            paginas = max(1, math.ceil(total / self.linhas))
+            pagina = min(max(1, self.pagina), paginas)
+            inicio = (pagina - 1) * self.linhas
+            print(df.iloc[inicio:inicio + self.linhas].to_string(index=index))
+            print(f"   Página {pagina}/{paginas} ({total:,} linhas)")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulação de Cenários de Danos (Monte Carlo)
+Sorteia cenários de chuva e altura do rio por cidade a partir do histórico e os
+propaga por uma relação de impacto ajustada na base geral (regressão por região
+em escala log1p, com resíduos reamostrados), obtendo a distribuição de
+desalojados e prejuízo por cidade, por região e no estado. Os sorteios são
+vetorizados por cidade e distribuídos por um pool de processos, com uma semente
+por cidade que não depende do número de processos.
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+if not __package__:
+    # Executado como script (python src/simulacao.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+N_SIMULACOES = 100_000
+QUANTIS = (0.5, 0.9, 0.99)
+ALVOS = ['desalojados', 'prejuizo_milhoes']
+ATRIBUTOS = ['chuva_24h_mm', 'altura_rio_metros']
+
+# Cidades por tarefa do pool (cada cidade tem sua própria semente)
+CIDADES_POR_TAREFA = 16
+
+# Registros mínimos para ajustar a relação de impacto de uma região (senão usa a do estado)
+MINIMO_REGISTROS_REGIAO = 10
+
+TOTAL_ESTADO = 'Total RS'
+
+# Pools e relação de impacto do processo trabalhador (recebidos uma vez, no initializer do pool)
+_DADOS = {}
+
+def _colunas_estatisticas():
+    return [f'{alvo}_{nome}' for alvo in ALVOS
+            for nome in ['media'] + [f'p{round(q * 100)}' for q in QUANTIS]]
+
+def _minimos_quadrados(df, coeficientes=None):
+    """
+    Coeficientes (3 × 2: intercepto, chuva, altura) e resíduos (n × 2) em escala log1p;
+    com `coeficientes` dados, só os resíduos deles
+    """
+    X = np.column_stack([np.ones(len(df)), df[ATRIBUTOS].to_numpy(dtype=np.float64)])
+    Y = np.log1p(df[ALVOS].to_numpy(dtype=np.float64))
+    if coeficientes is None:
+        coeficientes = np.linalg.lstsq(X, Y, rcond=None)[0]
+    return coeficientes, Y - X @ coeficientes
+
+def ajustar_impacto(df, minimo_registros=MINIMO_REGISTROS_REGIAO):
+    """
+    Relação de impacto por região: {regiao: (coeficientes, resíduos)}. Regiões com
+    menos de `minimo_registros` registros usam os coeficientes do estado inteiro.
+    """
+    completos = df.dropna(subset=ATRIBUTOS + ALVOS)
+    if completos.empty:
+        raise ValueError("Sem registros completos de chuva, altura do rio e impactos para ajustar a relação")
+    coeficientes_estado, _ = _minimos_quadrados(completos)
+    return {str(regiao): _minimos_quadrados(parte, coeficientes_estado if len(parte) < minimo_registros else None)
+            for regiao, parte in completos.groupby('regiao', observed=True)}
+
+def qualidade_ajuste(relacao, df):
+    """R² de cada alvo (escala log1p) por região"""
+    linhas = {}
+    for regiao, parte in df.dropna(subset=ATRIBUTOS + ALVOS).groupby('regiao', observed=True):
+        _, residuos = relacao[str(regiao)]
+        Y = np.log1p(parte[ALVOS].to_numpy(dtype=np.float64))
+        total = ((Y - Y.mean(axis=0)) ** 2).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            linhas[str(regiao)] = 1 - (residuos ** 2).sum(axis=0) / total
+    return pd.DataFrame.from_dict(linhas, orient='index', columns=ALVOS).rename_axis('regiao')
+
+def _pools(df):
+    """{cidade: (regiao, pares (chuva, altura) históricos ordenados por chuva e altura)}"""
+    pools = {}
+    for (cidade, regiao), parte in df.dropna(subset=ATRIBUTOS).groupby(['cidade', 'regiao'], observed=True):
+        pares = parte[ATRIBUTOS].to_numpy(dtype=np.float64)
+        pools[str(cidade)] = (str(regiao), pares[np.lexsort((pares[:, 1], pares[:, 0]))])
+    return pools
+
+def _severidades(sementes_regioes, regiao, n):
+    """Nível de severidade comum à região em cada sorteio (igual em todas as tarefas)"""
+    return np.random.default_rng(sementes_regioes[regiao]).random(n)
+
+def _simular_cidade(pares, coeficientes, residuos, comum, n, cenario, semente):
+    """
+    `n` sorteios de (desalojados, prejuízo) de uma cidade. Cada sorteio escolhe um nível
+    de severidade u em [quantil, 1) — o comum da região com probabilidade `correlacao`,
+    senão um próprio — e toma o dia histórico dessa posição na ordem de chuva.
+    """
+    quantil, correlacao, fator_chuva, acrescimo_rio = cenario
+    rng = np.random.default_rng(semente)
+    u = np.where(rng.random(n) < correlacao, comum, rng.random(n))
+    indices = ((quantil + (1 - quantil) * u) * len(pares)).astype(np.intp)
+    sorteados = pares[np.minimum(indices, len(pares) - 1)]
+    chuva = sorteados[:, 0] * fator_chuva
+    altura = sorteados[:, 1] + acrescimo_rio
+    log_impacto = (coeficientes[0] + np.outer(chuva, coeficientes[1]) + np.outer(altura, coeficientes[2])
+                   + residuos[rng.integers(0, len(residuos), n)])
+    return np.clip(np.expm1(log_impacto), 0, None)
+
+def _simular_tarefa(cidades, n, cenario, sementes):
+    """Estatísticas das `cidades` e a soma dos sorteios por região (n × regiões × alvos)"""
+    pools, relacao, regioes, sementes_regioes = (_DADOS['pools'], _DADOS['relacao'], _DADOS['regioes'],
+                                                 _DADOS['sementes_regioes'])
+    totais = np.zeros((n, len(regioes), len(ALVOS)))
+    comuns = {}
+    linhas = []
+    for cidade, semente in zip(cidades, sementes):
+        regiao, pares = pools[cidade]
+        if regiao not in comuns:
+            comuns[regiao] = _severidades(sementes_regioes, regiao, n)
+        valores = _simular_cidade(pares, *relacao[regiao], comuns[regiao], n, cenario, semente)
+        totais[:, regioes.index(regiao)] += valores
+        linhas.append((cidade, regiao, *_estatisticas(valores)))
+    return linhas, totais
+
+def _estatisticas(valores):
+    quantis = np.quantile(valores, QUANTIS, axis=0)
+    return [v for j in range(len(ALVOS)) for v in (valores[:, j].mean(), *quantis[:, j])]
+
+def _iniciar_processo(dados):
+    global _DADOS
+    _DADOS = dados
+
+def simular_cenarios(df, n_simulacoes=N_SIMULACOES, quantil=0.0, correlacao=0.0, fator_chuva=1.0,
+                     acrescimo_rio=0.0, limiar_prejuizo=None, semente=0, workers=None):
+    """
+    Distribuição de desalojados e prejuízo em `n_simulacoes` cenários por cidade.
+
+    quantil: só dias históricos com chuva a partir deste quantil da cidade (0.9 = 10% mais chuvosos)
+    correlacao: 0 = cidades independentes; 1 = mesma severidade em toda a região a cada sorteio
+    fator_chuva, acrescimo_rio: cenário de chuva multiplicada e rio mais alto (em metros)
+    limiar_prejuizo: acrescenta a probabilidade de o prejuízo passar deste valor (R$ milhões)
+
+    Retorna (por_cidade, por_regiao), com o total do estado na última linha de por_regiao.
+    O resultado não depende de `workers`. workers=1 executa no próprio processo.
+    """
+    if not 0 <= quantil < 1:
+        raise ValueError(f"Quantil deve estar em [0, 1): {quantil}")
+    if not 0 <= correlacao <= 1:
+        raise ValueError(f"Correlação deve estar em [0, 1]: {correlacao}")
+    relacao = ajustar_impacto(df)
+    pools = {cidade: pool for cidade, pool in _pools(df).items() if pool[0] in relacao}
+    if not pools:
+        raise ValueError("Nenhuma cidade com histórico de chuva e altura do rio")
+    cidades = sorted(pools)
+    regioes = sorted({regiao for regiao, _ in pools.values()})
+
+    sequencia = np.random.SeedSequence(semente)
+    sementes_cidades, sementes_regioes = sequencia.spawn(2)
+    sementes = dict(zip(cidades, sementes_cidades.spawn(len(cidades))))
+    dados = {'pools': pools, 'relacao': relacao, 'regioes': regioes,
+             'sementes_regioes': dict(zip(regioes, sementes_regioes.spawn(len(regioes))))}
+    cenario = (quantil, correlacao, fator_chuva, acrescimo_rio)
+
+    grupos = [cidades[i:i + CIDADES_POR_TAREFA] for i in range(0, len(cidades), CIDADES_POR_TAREFA)]
+    argumentos = [(grupo, n_simulacoes, cenario, [sementes[c] for c in grupo]) for grupo in grupos]
+
+    workers = workers or os.cpu_count() or 1
+    linhas, totais = [], np.zeros((n_simulacoes, len(regioes), len(ALVOS)))
+    if workers == 1 or len(grupos) == 1:
+        _iniciar_processo(dados)
+        resultados = (_simular_tarefa(*args) for args in argumentos)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo, initargs=(dados,))
+        resultados = executor.map(_simular_tarefa, *zip(*argumentos))
+    try:
+        # Somas na ordem das tarefas: o total é o mesmo com qualquer número de processos
+        for parte, soma in resultados:
+            linhas.extend(parte)
+            totais += soma
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    colunas = _colunas_estatisticas()
+    por_cidade = pd.DataFrame(linhas, columns=['cidade', 'regiao'] + colunas).set_index('cidade')
+    estado = totais.sum(axis=1)
+    por_regiao = pd.DataFrame([_estatisticas(totais[:, i]) for i in range(len(regioes))] + [_estatisticas(estado)],
+                              index=pd.Index(regioes + [TOTAL_ESTADO], name='regiao'), columns=colunas)
+    if limiar_prejuizo is not None:
+        coluna = f'prob_prejuizo_acima_{limiar_prejuizo:g}'
+        por_regiao[coluna] = np.append((totais[:, :, 1] > limiar_prejuizo).mean(axis=0),
+                                       (estado[:, 1] > limiar_prejuizo).mean())
+    return por_cidade, por_regiao
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Simulação Monte Carlo de desalojados e prejuízo por cenário')
+    parser.add_argument('--dados', default='data', help='pasta dos dados, plana ou particionada (padrão: data)')
+    parser.add_argument('--simulacoes', type=int, default=N_SIMULACOES, help='sorteios por cidade')
+    parser.add_argument('--quantil', type=float, default=0.0,
+                        help='só dias com chuva a partir deste quantil de cada cidade (ex.: 0.9)')
+    parser.add_argument('--correlacao', type=float, default=0.0,
+                        help='0 = cidades independentes, 1 = mesma severidade em toda a região')
+    parser.add_argument('--fator-chuva', type=float, default=1.0, help='multiplica a chuva sorteada (ex.: 1.2)')
+    parser.add_argument('--acrescimo-rio', type=float, default=0.0, help='metros somados à altura do rio sorteada')
+    parser.add_argument('--limiar', type=float, help='probabilidade de o prejuízo (R$ milhões) passar deste valor')
+    parser.add_argument('--top', type=int, default=10, help='cidades exibidas, pelo p99 do prejuízo')
+    parser.add_argument('--workers', type=int, help='processos (padrão: número de CPUs)')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        from .leitura import ler_dataset
+
+        df = ler_dataset(args.dados, 'enchentes_rs.csv')
+        inicio = time.perf_counter()
+        por_cidade, por_regiao = simular_cenarios(df, args.simulacoes, args.quantil, args.correlacao,
+                                                  args.fator_chuva, args.acrescimo_rio, args.limiar,
+                                                  args.semente, args.workers)
+        duracao = time.perf_counter() - inicio
+        sorteios = args.simulacoes * len(por_cidade)
+        print(f"🎲 SIMULAÇÃO DE CENÁRIOS ({args.simulacoes:,} por cidade, {len(por_cidade)} cidades)")
+        print("=" * 50)
+        print(f"⚡ {sorteios:,} sorteios em {duracao:.2f}s ({sorteios / duracao:,.0f} sorteios/s)")
+        print("\n🎯 R² da relação de impacto (escala log):")
+        print(qualidade_ajuste(ajustar_impacto(df), df).round(3).to_string())
+        print("\n📊 Totais por região:")
+        print(por_regiao.round(2).to_string())
+        print("\n🏙️ Cidades com maior prejuízo no cenário extremo (p99):")
+        print(por_cidade.nlargest(args.top, 'prejuizo_milhoes_p99').round(2).to_string())
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
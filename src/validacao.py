@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validação dos Dados de Enchentes
+Verifica esquema, tipos, contagens não negativas, faixas plausíveis de rio e chuva
+e o mapeamento cidade → região com operações vetorizadas por coluna
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+if not __package__:
+    # Executado como script (python src/validacao.py): os módulos irmãos vêm do pacote src
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = 'src'
+
+from .leitura import TIPOS_COLUNAS, COLUNAS_DATA
+
+COLUNAS_OBRIGATORIAS = ['data', 'regiao', 'cidade', 'mortes', 'feridos', 'desalojados',
+                        'prejuizo_milhoes', 'altura_rio_metros', 'chuva_24h_mm']
+
+COLUNAS_NAO_NEGATIVAS = ['mortes', 'feridos', 'desalojados', 'prejuizo_milhoes',
+                         'altura_rio_metros', 'chuva_24h_mm']
+
+# Máximos fisicamente plausíveis (o mínimo, zero, já é coberto por valor_negativo)
+MAXIMOS_PLAUSIVEIS = {
+    'altura_rio_metros': 35.0,
+    'chuva_24h_mm': 600.0,
+}
+
+# Quantas linhas de exemplo guardar por violação
+LINHAS_EXEMPLO = 5
+
+COLUNAS_RELATORIO = ['severidade', 'regra', 'coluna', 'violacoes', 'linhas_exemplo']
+
+class ErroValidacao(ValueError):
+    """Dados com violações graves; o relatório completo fica em `relatorio`"""
+
+    def __init__(self, mensagem, relatorio):
+        super().__init__(mensagem)
+        self.relatorio = relatorio
+
+def _registrar(violacoes, severidade, regra, coluna, mascara=None, total=None):
+    """Acrescenta uma linha ao relatório se a máscara tiver alguma violação"""
+    if mascara is not None:
+        total = int(np.count_nonzero(mascara))
+        exemplos = np.flatnonzero(mascara)[:LINHAS_EXEMPLO].tolist() if total else []
+    else:
+        exemplos = []
+    if total:
+        violacoes.append((severidade, regra, coluna, total, exemplos))
+
+def validar_dataframe(df, referencia=None):
+    """
+    Retorna um relatório compacto de violações (uma linha por regra e coluna).
+    `referencia` é a tabela de municípios indexada por cidade com a coluna `regiao`.
+    Índices em `linhas_exemplo` são posições no DataFrame.
+    """
+    violacoes = []
+
+    # Esquema: colunas obrigatórias
+    for coluna in COLUNAS_OBRIGATORIAS:
+        if coluna not in df.columns:
+            _registrar(violacoes, 'erro', 'coluna_ausente', coluna, total=len(df) or 1)
+    presentes = [c for c in COLUNAS_OBRIGATORIAS if c in df.columns]
+
+    # Tipos: numéricas devem ser numéricas, datas devem ser datas
+    for coluna in presentes:
+        esperado = TIPOS_COLUNAS.get(coluna)
+        tipo = df[coluna].dtype
+        if coluna in COLUNAS_DATA:
+            tipo_ok = pd.api.types.is_datetime64_any_dtype(tipo)
+        elif esperado in ('int64', 'float64'):
+            tipo_ok = pd.api.types.is_numeric_dtype(tipo) and not pd.api.types.is_bool_dtype(tipo)
+            if esperado == 'int64' and pd.api.types.is_float_dtype(tipo):
+                # Inteiros lidos como float (por exemplo, por causa de nulos) precisam ser inteiros
+                valores = df[coluna].to_numpy()
+                _registrar(violacoes, 'erro', 'valor_nao_inteiro', coluna,
+                           np.isfinite(valores) & (valores != np.floor(valores)))
+        else:
+            tipo_ok = True
+        if not tipo_ok:
+            _registrar(violacoes, 'erro', 'tipo_invalido', coluna, total=len(df) or 1)
+    numericas = [c for c in presentes
+                 if c not in COLUNAS_DATA and pd.api.types.is_numeric_dtype(df[c].dtype)]
+
+    # Valores ausentes
+    for coluna in presentes:
+        _registrar(violacoes, 'erro', 'valor_ausente', coluna, df[coluna].isna().to_numpy())
+
+    # Contagens e medidas não negativas
+    for coluna in COLUNAS_NAO_NEGATIVAS:
+        if coluna in numericas:
+            _registrar(violacoes, 'erro', 'valor_negativo', coluna, df[coluna].to_numpy() < 0)
+
+    # Faixas plausíveis de rio e chuva (acima do máximo é suspeito, não necessariamente errado)
+    for coluna, maximo in MAXIMOS_PLAUSIVEIS.items():
+        if coluna in numericas:
+            _registrar(violacoes, 'aviso', 'fora_da_faixa', coluna, df[coluna].to_numpy() > maximo)
+
+    # Datas no futuro
+    if 'data' in presentes and pd.api.types.is_datetime64_any_dtype(df['data'].dtype):
+        _registrar(violacoes, 'aviso', 'data_futura', 'data',
+                   (df['data'] > pd.Timestamp.now()).to_numpy())
+
+    # Mapeamento cidade → região: cidades conhecidas devem estar na região da referência
+    if {'cidade', 'regiao'} <= set(presentes):
+        cidades = df['cidade'].astype('category')
+        codigos = cidades.cat.codes.to_numpy()
+        if referencia is not None and 'regiao' in referencia.columns:
+            esperada = referencia['regiao'].reindex(cidades.cat.categories).to_numpy(dtype=object)
+            esperada = np.append(esperada, None)[codigos]
+            conhecida = pd.notna(esperada)
+            _registrar(violacoes, 'aviso', 'cidade_desconhecida', 'cidade', ~conhecida)
+            _registrar(violacoes, 'erro', 'regiao_divergente', 'regiao',
+                       conhecida & (df['regiao'].to_numpy(dtype=object) != esperada))
+        else:
+            # Sem referência, só a consistência interna: cada cidade em uma única região
+            regioes_por_cidade = df.groupby(cidades, observed=True)['regiao'].nunique()
+            ambiguas = regioes_por_cidade.to_numpy() > 1
+            if ambiguas.any():
+                mapa = np.zeros(len(cidades.cat.categories) + 1, dtype=bool)
+                mapa[cidades.cat.categories.get_indexer(regioes_por_cidade.index[ambiguas])] = True
+                _registrar(violacoes, 'erro', 'regiao_divergente', 'regiao', mapa[codigos])
+
+    return pd.DataFrame(violacoes, columns=COLUNAS_RELATORIO)
+
+def imprimir_relatorio(relatorio, nome='dados'):
+    """Exibe o relatório compacto de violações"""
+    if relatorio.empty:
+        print(f"✅ Validação de {nome}: nenhuma violação")
+        return
+    print(f"⚠️ Validação de {nome}:")
+    print(relatorio.to_string(index=False))
+
+def main():
+    """Função principal"""
+    try:
+        from .leitura import ler_populacao
+
+        caminhos = sys.argv[1:] or ['data/enchentes_rs.csv', 'data/enchente_2024_detalhado.csv']
+        referencia = ler_populacao('data/populacao_ibge.csv')
+        for caminho in caminhos:
+            # Leitura sem tipos forçados, para que valores inválidos apareçam no relatório
+            df = pd.read_csv(caminho)
+            if 'data' in df.columns:
+                df['data'] = pd.to_datetime(df['data'], errors='coerce')
+            imprimir_relatorio(validar_dataframe(df, referencia), caminho)
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
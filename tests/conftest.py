@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures compartilhadas dos testes: uma pasta de dados no formato de data/, com a base
+geral gerada (grande o bastante para a leitura em lotes ter vários lotes) e as bases de
+2024 e de população copiadas do repositório
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PASTA_DADOS_REPO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Acima de LOTE_MINIMO (src/memoria.py): com orçamento mínimo a base é lida em 3 lotes
+LINHAS_BASE_GERAL = 25_000
+
+def gerar_base_geral(caminho, linhas=LINHAS_BASE_GERAL, semente=42):
+    """Grava uma base geral sintética com prejuízos de três casas decimais (milhares de reais)"""
+    rng = np.random.default_rng(semente)
+    cidades = pd.read_csv(os.path.join(PASTA_DADOS_REPO, 'populacao_ibge.csv'))
+    escolhidas = cidades.iloc[rng.integers(0, len(cidades), linhas)]
+    datas = pd.Timestamp('2020-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 5 * 365, linhas)), unit='D')
+    df = pd.DataFrame({
+        'data': datas.strftime('%Y-%m-%d'),
+        'regiao': escolhidas['regiao'].to_numpy(),
+        'cidade': escolhidas['cidade'].to_numpy(),
+        'mortes': rng.integers(0, 3, linhas),
+        'feridos': rng.integers(0, 20, linhas),
+        'desalojados': rng.integers(0, 2_000, linhas),
+        # Texto com 3 casas: a soma exata sai do próprio CSV com Decimal
+        'prejuizo_milhoes': [f'{v:.3f}' for v in rng.uniform(0, 50, linhas)],
+        'altura_rio_metros': rng.uniform(1, 9, linhas).round(2),
+        'chuva_24h_mm': rng.uniform(0, 200, linhas).round(1),
+    })
+    df.to_csv(caminho, index=False)
+    return caminho
+
+@pytest.fixture
+def pasta_dados(tmp_path):
+    """Pasta de dados completa para o AnalisadorEnchentes"""
+    pasta = tmp_path / 'data'
+    pasta.mkdir()
+    gerar_base_geral(pasta / 'enchentes_rs.csv')
+    for nome in ('enchente_2024_detalhado.csv', 'populacao_ibge.csv'):
+        shutil.copy(os.path.join(PASTA_DADOS_REPO, nome), pasta / nome)
+    return pasta
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Invalidação do cache persistente: arquivos alterados ou filtros diferentes não reaproveitam resultados"""
+
+import os
+
+from src.analise_enchentes import AnalisadorEnchentes
+from src.cache import CacheResultados, impressao_digital
+from src.saida import FormatoSaida
+
+def tocar(caminho, segundos=1):
+    """Avança a data de modificação do arquivo sem mudar o conteúdo"""
+    st = os.stat(caminho)
+    os.utime(caminho, ns=(st.st_atime_ns, st.st_mtime_ns + segundos * 1_000_000_000))
+
+def analisador(pasta_dados, cache, **opcoes):
+    return AnalisadorEnchentes(str(pasta_dados), str(pasta_dados.parent / 'outputs'), exibir_graficos=False,
+                               carregar=False, cache=cache, saida=FormatoSaida('silencioso'), **opcoes)
+
+def test_impressao_muda_com_data_tamanho_e_extras(tmp_path):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text('a,b\n1,2\n')
+    original = impressao_digital([caminho], 1)
+    assert impressao_digital([caminho], 1) == original
+
+    tocar(caminho)
+    tocado = impressao_digital([caminho], 1)
+    assert tocado != original
+
+    with open(caminho, 'a') as f:
+        f.write('3,4\n')
+    assert impressao_digital([caminho], 1) not in (original, tocado)
+    assert impressao_digital([caminho], 2) != impressao_digital([caminho], 1)
+
+def test_obter_falta_depois_de_tocar_o_csv(tmp_path):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text('a,b\n1,2\n')
+    cache = CacheResultados(str(tmp_path / 'cache'))
+    cache.guardar(cache.chave(impressao_digital([caminho]), 'resumo'), {'total': 3})
+
+    assert cache.obter(cache.chave(impressao_digital([caminho]), 'resumo')) == (True, {'total': 3})
+    tocar(caminho)
+    assert cache.obter(cache.chave(impressao_digital([caminho]), 'resumo')) == (False, None)
+    assert (cache.acertos, cache.faltas) == (1, 1)
+
+def test_obter_falta_com_arquivo_corrompido(tmp_path):
+    cache = CacheResultados(str(tmp_path / 'cache'))
+    chave = cache.chave('impressao', 'resumo')
+    caminho = cache.guardar(chave, [1, 2, 3])
+    with open(caminho, 'wb') as f:
+        f.write(b'nao e pickle')
+    assert cache.obter(chave) == (False, None)
+
+def test_analisador_reaproveita_enquanto_nada_muda(pasta_dados, tmp_path):
+    cache = CacheResultados(str(tmp_path / 'cache'))
+    resumo = analisador(pasta_dados, cache).agregado('resumo')
+    assert (cache.acertos, cache.faltas) == (0, 1)
+
+    # Outro analisador, sem carregar os dados: o resumo vem do disco
+    assert analisador(pasta_dados, cache).agregado('resumo') == resumo
+    assert (cache.acertos, cache.faltas) == (1, 1)
+
+def test_analisador_falta_com_filtro_diferente(pasta_dados, tmp_path):
+    cache = CacheResultados(str(tmp_path / 'cache'))
+    completo = analisador(pasta_dados, cache).agregado('resumo')
+    filtrado = analisador(pasta_dados, cache, anos=[2022]).agregado('resumo')
+    assert (cache.acertos, cache.faltas) == (0, 2)
+    assert filtrado['registros'] < completo['registros']
+
+    # Cada filtro encontra a própria entrada
+    assert analisador(pasta_dados, cache, anos=[2022]).agregado('resumo') == filtrado
+    assert analisador(pasta_dados, cache, regioes=['Serra']).agregado('resumo')['registros'] < completo['registros']
+    assert (cache.acertos, cache.faltas) == (1, 3)
+
+def test_analisador_falta_depois_de_tocar_o_csv(pasta_dados, tmp_path):
+    cache = CacheResultados(str(tmp_path / 'cache'))
+    analisador(pasta_dados, cache).agregado('resumo')
+    tocar(pasta_dados / 'enchentes_rs.csv')
+    analisador(pasta_dados, cache).agregado('resumo')
+    assert (cache.acertos, cache.faltas) == (0, 2)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Prejuízo em ponto fixo: carga inteira, lotes e partições somam exatamente o que está no CSV"""
+
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from src.analise_enchentes import AnalisadorEnchentes
+from src.leitura import particionar_csv
+from src.saida import FormatoSaida
+
+COLUNA = 'Prejuízo (R$ milhões)'
+
+def analisador(pasta_dados, ponto_fixo, **opcoes):
+    return AnalisadorEnchentes(str(pasta_dados), str(pasta_dados.parent / 'outputs'), exibir_graficos=False,
+                               cache=False, saida=FormatoSaida('silencioso'), ponto_fixo=ponto_fixo, **opcoes)
+
+def somas_exatas(pasta_dados):
+    """Totais do prejuízo somados em Decimal a partir do texto do CSV: (total, por ano, por mês)"""
+    df = pd.read_csv(pasta_dados / 'enchentes_rs.csv', dtype=str)
+    df['prejuizo'] = df['prejuizo_milhoes'].map(Decimal)
+    df['ano'] = df['data'].str[:4].astype(int)
+    df['mes'] = df['data'].str[5:7].astype(int)
+    return (sum(df['prejuizo'], Decimal(0)),
+            {ano: sum(grupo, Decimal(0)) for ano, grupo in df.groupby('ano')['prejuizo']},
+            {mes: sum(grupo, Decimal(0)) for mes, grupo in df.groupby(['ano', 'mes'])['prejuizo']})
+
+def totais(a):
+    """Os mesmos totais lidos dos agregados (anual e mensal não são arredondados)"""
+    anual = a.agregado('anual').set_index('Ano')[COLUNA]
+    mensal = a.agregado('mensal').set_index(['ano', 'mes'])['prejuizo_milhoes']
+    return (a.agregado('resumo')['prejuizo_milhoes'],
+            {int(ano): valor for ano, valor in anual.items()},
+            {(int(ano), int(mes)): valor for (ano, mes), valor in mensal.items()})
+
+def por_nome(serie):
+    return {str(nome): valor for nome, valor in serie.items()}
+
+@pytest.mark.parametrize('escala', ['centavos', 'milhares'])
+def test_memoria_e_lotes_somam_o_valor_exato(pasta_dados, escala):
+    total, por_ano, por_mes = somas_exatas(pasta_dados)
+    esperado = (float(total),
+                {ano: float(v) for ano, v in por_ano.items()},
+                {mes: float(v) for mes, v in por_mes.items()})
+
+    em_memoria = analisador(pasta_dados, escala)
+    # Orçamento mínimo: lotes de LOTE_MINIMO linhas, 3 lotes na base de teste
+    em_lotes = analisador(pasta_dados, escala, max_memoria=1)
+    assert em_memoria._lotes is None and em_lotes._lotes is not None
+
+    assert totais(em_memoria) == esperado
+    assert totais(em_lotes) == esperado
+
+def test_particoes_e_lotes_identicos_a_carga_inteira(pasta_dados):
+    em_memoria = analisador(pasta_dados, 'centavos')
+    esperado = {chave: em_memoria.agregado(chave)[COLUNA] for chave in ('regional', 'cidades')}
+
+    em_lotes = analisador(pasta_dados, 'centavos', max_memoria=1)
+    particionar_csv(str(pasta_dados / 'enchentes_rs.csv'), str(pasta_dados / 'enchentes_rs'))
+    (pasta_dados / 'enchentes_rs.csv').unlink()
+    particionado = analisador(pasta_dados, 'centavos')
+    for a in (em_lotes, particionado):
+        for chave, tabela in esperado.items():
+            # O índice de cidades é categórico em um caminho e texto no outro: compara por nome
+            assert por_nome(a.agregado(chave)[COLUNA]) == por_nome(tabela)